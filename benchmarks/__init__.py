@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+import statistics
+import sys
+import time
+
+# アプリケーションのパッケージ（pkg）を読み込めるようにする
+SRC_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "src",
+    "pirarara",
+)
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+
+def measure(func, repeat: int = 5, setup=None) -> dict:
+    """
+    関数の所要時間を繰り返し計測します。
+
+    Args:
+        func (callable): 計測する関数。
+        repeat (int, optional): 計測回数。
+        setup (callable, optional): 計測ごとに事前に呼び出す関数（計測に含めない）。
+
+    Returns:
+        dict: 最小値と中央値（ミリ秒）。
+    """
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1e3)
+    return {
+        "min_ms": round(min(times), 3),
+        "median_ms": round(statistics.median(times), 3),
+    }
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+ベンチマークをまとめて実行し、結果をJSONで出力します。
+
+コミット間で比較できるように、結果にはコミットのハッシュ値と実行環境を含めます。
+
+実行方法（リポジトリ直下で）:
+    python -m benchmarks --rows 10000,100000 --output result.json
+"""
+
+import argparse
+import datetime
+import importlib
+import json
+import platform
+import subprocess
+import sys
+
+from benchmarks import SRC_DIR
+
+# レコード数ごとに実行するベンチマーク。
+ROW_BENCHMARKS = ["db", "import", "qt"]
+# レコード数に依存しないベンチマーク。
+OTHER_BENCHMARKS = ["translate", "hash"]
+
+
+def _git_commit() -> str:
+    """
+    現在のコミットのハッシュ値を取得します。
+
+    Returns:
+        str: ハッシュ値。取得できない場合は空文字列。
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=SRC_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def main(argv: list | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument(
+        "--rows",
+        default="10000",
+        help="comma separated library sizes (e.g. 10000,100000,1000000)",
+    )
+    parser.add_argument(
+        "--bench",
+        default=",".join(ROW_BENCHMARKS + OTHER_BENCHMARKS),
+        help="comma separated benchmarks to run",
+    )
+    parser.add_argument("--output", help="write the JSON result to a file")
+    args = parser.parse_args(argv)
+
+    rows_list = [int(r) for r in args.rows.split(",") if r]
+    benches = [b for b in args.bench.split(",") if b]
+    unknown = set(benches) - set(ROW_BENCHMARKS + OTHER_BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    results: dict = {}
+    for name in benches:
+        module = importlib.import_module(f"benchmarks.bench_{name}")
+        if name in ROW_BENCHMARKS:
+            results[name] = []
+            for rows in rows_list:
+                print(f"{name}: {rows} rows", file=sys.stderr)
+                results[name].append(module.run(rows=rows))
+        else:
+            print(name, file=sys.stderr)
+            results[name] = module.run()
+
+    output = {
+        "commit": _git_commit(),
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    text = json.dumps(output, indent=4)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+MetaDataDB の主要なクエリのベンチマーク。
+
+合成ライブラリを生成し、insert、exists、get_count、get_all_data、
+get_all_data_by_column の所要時間を計測します。
+検索結果キャッシュが効かない状態（cold）と効く状態（warm）を分けて計測します。
+
+実行方法（リポジトリ直下で）:
+    python -m benchmarks.bench_db
+"""
+
+import hashlib
+import json
+import random
+import time
+
+from benchmarks import generator, measure
+
+# ツリーウィジェットが集計するカラム。
+TREE_COLUMNS = ["author", "brand", "category", "club", "company", "publisher"]
+
+
+def run(rows: int = 10000, repeat: int = 5, inserts: int = 200) -> dict:
+    """
+    ベンチマークを実行します。
+
+    Args:
+        rows (int): 合成ライブラリのレコード数。
+        repeat (int): 各クエリの計測回数。
+        inserts (int): `insert` を1件ずつ呼び出す回数。
+
+    Returns:
+        dict: 計測結果。
+    """
+    from pkg.metadata import MetaDataDB
+
+    with generator.app_environment() as config:
+        db = MetaDataDB()
+        db_path = config.get_db_path()
+
+        start = time.perf_counter()
+        generator.populate_db(db_path, rows)
+        populate_s = time.perf_counter() - start
+
+        # 1件ずつの insert（インポート時と同じ経路）
+        columns = list(generator.COLUMNS)
+        new_rows = list(generator.generate_rows(inserts, 1, rows + 1))
+        start = time.perf_counter()
+        for values in new_rows:
+            db.insert(columns, list(values))
+        insert_ms = (time.perf_counter() - start) * 1e3 / inserts
+
+        # ハッシュ値による重複判定（ヒットとミスを半分ずつ）
+        rng = random.Random(0)
+        samples = [
+            hashlib.sha256(str(rng.randint(1, rows * 2)).encode()).hexdigest()
+            for _ in range(100)
+        ]
+        exists = measure(
+            lambda: [db.exists("file_hash_data", h) for h in samples],
+            repeat,
+        )
+
+        invalidate = db._bump_write_generation
+        count_cold = measure(
+            lambda: [db.get_count(c, c) for c in TREE_COLUMNS],
+            repeat,
+            setup=invalidate,
+        )
+        count_warm = measure(
+            lambda: [db.get_count(c, c) for c in TREE_COLUMNS], repeat
+        )
+        all_cold = measure(db.get_all_data, repeat, setup=invalidate)
+        all_warm = measure(db.get_all_data, repeat)
+
+        # 件数の最も多い作者で検索する
+        author = db.get_count("author", "author")[1][0]
+        by_column_cold = measure(
+            lambda: db.get_all_data_by_column("author", author),
+            repeat,
+            setup=invalidate,
+        )
+        by_column_warm = measure(
+            lambda: db.get_all_data_by_column("author", author), repeat
+        )
+
+    return {
+        "rows": rows,
+        "populate_rows_per_s": round(rows / populate_s),
+        "insert_ms": round(insert_ms, 3),
+        "exists_100": exists,
+        "get_count_tree_cold": count_cold,
+        "get_count_tree_warm": count_warm,
+        "get_all_data_cold": all_cold,
+        "get_all_data_warm": all_warm,
+        "get_all_data_by_column_cold": by_column_cold,
+        "get_all_data_by_column_warm": by_column_warm,
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=4))
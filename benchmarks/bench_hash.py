@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+ファイルのハッシュ計算のベンチマーク。
+
+旧実装（8 KiBの `read()` の繰り返し）、`hash_file`（再利用するバッファへの
+`readinto`）、`hashlib.file_digest` の読み込み速度を比較します。
+計測の前に `posix_fadvise(DONTNEED)` でファイルをページキャッシュから
+破棄するため（対応している環境のみ）、ディスクからの読み込みを含みます。
+
+実行方法（リポジトリ直下で）:
+    python -m benchmarks.bench_hash
+    python -m benchmarks.bench_hash --size-mb 4096
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+
+from benchmarks import measure
+from pkg.metadata.hash import _fadvise, hash_file
+
+# テストファイルを書き込む単位（バイト）。
+WRITE_CHUNK = 16 * 1024 * 1024
+
+
+def _legacy_hash(file_path: str, algo: str = "sha256") -> str:
+    """
+    比較用の旧実装。チャンクごとにbytesオブジェクトを生成する。
+    """
+    h_obj = hashlib.new(algo)
+    with open(file_path, "rb") as file:
+        while chunk := file.read(8192):
+            h_obj.update(chunk)
+    return h_obj.hexdigest()
+
+
+def _file_digest(file_path: str, algo: str = "sha256") -> str:
+    """
+    比較用の `hashlib.file_digest`（Python 3.11以降）。
+    """
+    with open(file_path, "rb") as file:
+        return hashlib.file_digest(file, algo).hexdigest()
+
+
+def _drop_cache(file_path: str) -> None:
+    with open(file_path, "rb") as file:
+        _fadvise(file.fileno(), 0, 0, "POSIX_FADV_DONTNEED")
+
+
+def _make_file(file_path: str, size: int) -> None:
+    chunk = os.urandom(WRITE_CHUNK)
+    with open(file_path, "wb") as file:
+        written = 0
+        while written < size:
+            written += file.write(chunk[: size - written])
+        file.flush()
+        os.fsync(file.fileno())
+
+
+def run(size_mb: int = 1024, repeat: int = 3) -> dict:
+    """
+    ベンチマークを実行します。
+
+    Args:
+        size_mb (int): テストファイルのサイズ（MB）。
+        repeat (int): 計測回数。
+
+    Returns:
+        dict: 実装ごとの所要時間と読み込み速度。
+    """
+    size = size_mb * 1024 * 1024
+    implementations = {
+        "legacy_read_8k": _legacy_hash,
+        "hash_file": lambda path: hash_file(path)["hash"],
+    }
+    if hasattr(hashlib, "file_digest"):
+        implementations["hashlib_file_digest"] = _file_digest
+
+    results: dict = {"size_mb": size_mb}
+    with tempfile.TemporaryDirectory() as work_dir:
+        file_path = os.path.join(work_dir, "hash.bin")
+        _make_file(file_path, size)
+
+        digests = set()
+        for name, func in implementations.items():
+            timing = measure(
+                lambda: digests.add(func(file_path)),
+                repeat=repeat,
+                setup=lambda: _drop_cache(file_path),
+            )
+            timing["mb_per_s"] = round(
+                size / 1e6 / (timing["median_ms"] / 1e3), 1
+            )
+            results[name] = timing
+        # すべての実装で同じハッシュ値になること
+        results["digests_match"] = len(digests) == 1
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_hash")
+    parser.add_argument("--size-mb", type=int, default=1024)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    print(json.dumps(run(args.size_mb, args.repeat), indent=4))
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+インポート処理（set_media_info）のベンチマーク。
+
+ffmpegの `lavfi testsrc` で生成した小さな動画ファイルを、合成ライブラリに
+1件ずつインポートする所要時間を計測します。ffmpegがない場合は計測しません。
+
+実行方法（リポジトリ直下で）:
+    python -m benchmarks.bench_import
+"""
+
+import json
+import os
+import tempfile
+import time
+
+from benchmarks import generator
+
+
+def run(rows: int = 10000, files: int = 20) -> dict:
+    """
+    ベンチマークを実行します。
+
+    Args:
+        rows (int): 合成ライブラリのレコード数。
+        files (int): インポートする動画ファイル数。
+
+    Returns:
+        dict: 計測結果。
+    """
+    if not generator.is_ffmpeg_available():
+        return {"rows": rows, "skipped": "ffmpeg not found"}
+
+    from pkg.metadata import set_media_info
+
+    with tempfile.TemporaryDirectory() as video_dir:
+        paths = generator.make_test_videos(video_dir, files)
+        with generator.app_environment() as config:
+            generator.populate_db(config.get_db_path(), rows)
+
+            imported = 0
+            start = time.perf_counter()
+            for path in paths:
+                if set_media_info(os.path.abspath(path)) > 0:
+                    imported += 1
+            elapsed = time.perf_counter() - start
+
+    return {
+        "rows": rows,
+        "files": files,
+        "imported": imported,
+        "total_s": round(elapsed, 3),
+        "per_file_ms": round(elapsed * 1e3 / files, 3),
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=4))
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+テーブルとツリーの表示のベンチマーク。
+
+Qtのoffscreenプラットフォームで PirararaTableWidget と PirararaTreeWidget を
+生成し、合成ライブラリの全件表示と集計表示の所要時間を計測します。
+
+実行方法（リポジトリ直下で）:
+    python -m benchmarks.bench_qt
+"""
+
+import json
+import os
+
+from benchmarks import generator, measure
+
+
+def run(rows: int = 10000, repeat: int = 3) -> dict:
+    """
+    ベンチマークを実行します。
+
+    Args:
+        rows (int): 合成ライブラリのレコード数。
+        repeat (int): 計測回数。
+
+    Returns:
+        dict: 計測結果。
+    """
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+
+    from pkg.gui.custom import PirararaTableWidget, PirararaTreeWidget
+
+    app = QApplication.instance() or QApplication([])
+
+    with generator.app_environment() as config:
+        generator.populate_db(config.get_db_path(), rows)
+
+        table = PirararaTableWidget()
+        tree = PirararaTreeWidget()
+        invalidate = table.db._bump_write_generation
+
+        table_cold = measure(table.get_form_db, repeat, setup=invalidate)
+        table_warm = measure(table.get_form_db, repeat)
+        tree_cold = measure(tree.refresh_display, repeat, setup=invalidate)
+        tree_warm = measure(tree.refresh_display, repeat)
+
+        # 件数の最も多い作者で検索する
+        author = table.db.get_count("author", "author")[1][0]
+        search = measure(
+            lambda: table.get_form_db("author", author),
+            repeat,
+            setup=invalidate,
+        )
+        table_rows = table.rowCount()
+
+        table.deleteLater()
+        tree.deleteLater()
+        app.processEvents()
+
+    return {
+        "rows": rows,
+        "platform": os.environ["QT_QPA_PLATFORM"],
+        "table_populate_cold": table_cold,
+        "table_populate_warm": table_warm,
+        "table_search_author": search,
+        "table_search_rows": table_rows,
+        "tree_refresh_cold": tree_cold,
+        "tree_refresh_warm": tree_warm,
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=4))
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Translate.tr() のマイクロベンチマーク。
+
+実行方法（リポジトリ直下で）:
+    python -m benchmarks.bench_translate
+"""
+
+import json
+import os
+import tempfile
+import timeit
+
+from benchmarks import SRC_DIR
+from pkg.translation import Translate
+
+
+def _legacy_trans(
+    translate_dic: dict, selected_section: str, text: str
+) -> str:
+    """
+    比較用の旧実装。呼び出しのたびにセクションの辞書を作り直す。
+    """
+    try:
+        section_dic = translate_dic[selected_section]
+        case_insensitive = section_dic.get("#case_insensitive#", 0)
+        if case_insensitive:
+            text = text.lower()
+            section_dic = {
+                k.lower(): v
+                for k, v in section_dic.items()
+                if k != "#case_insensitive#"
+            }
+        return section_dic.get(text, text)
+    except KeyError:
+        return text
+
+
+def run(number: int = 100000, dictionary_size: int = 1000) -> dict:
+    """
+    ベンチマークを実行します。
+
+    大文字小文字を区別しないセクションを持つ言語ファイルを生成し、
+    旧実装と Translate.tr() の1回あたりの所要時間を計測します。
+
+    Args:
+        number (int): 計測する呼び出し回数。
+        dictionary_size (int): セクションあたりの翻訳エントリ数。
+
+    Returns:
+        dict: 計測結果。
+    """
+    section = "PirararaTreeWidget"
+    section_dic: dict = {"#case_insensitive#": 1}
+    for i in range(dictionary_size):
+        section_dic[f"Key{i}"] = f"value{i}"
+    translate_dic = {section: section_dic}
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        lang_dir = os.path.join(work_dir, "lang")
+        os.makedirs(lang_dir)
+        with open(
+            os.path.join(lang_dir, "xx_XX.json"), "w", encoding="utf-8"
+        ) as file:
+            json.dump(translate_dic, file)
+
+        # シングルトンを作り直す
+        Translate._instance = None
+        cache_dir = os.path.join(work_dir, "cache")
+
+        load_cold = timeit.timeit(
+            lambda: Translate(lang_dir, "xx_XX", cache_dir), number=1
+        )
+        tr = Translate()
+        load_cached = timeit.timeit(
+            lambda: tr.change_language("xx_XX"), number=1
+        )
+
+        keys = [f"KEY{i % dictionary_size}" for i in range(number)]
+        it = iter(keys)
+        new_total = timeit.timeit(
+            lambda: tr.tr(section, next(it)), number=number
+        )
+
+        legacy_number = max(1, number // 100)
+        it = iter(keys)
+        legacy_total = timeit.timeit(
+            lambda: _legacy_trans(translate_dic, section, next(it)),
+            number=legacy_number,
+        )
+
+        # 実アプリの言語ファイルでの計測
+        Translate._instance = None
+        tr = Translate(os.path.join(SRC_DIR, "lang"), "ja_JP")
+        real_total = timeit.timeit(
+            lambda: tr.tr("PirararaTableWidget", "title"), number=number
+        )
+        Translate._instance = None
+
+    return {
+        "dictionary_size": dictionary_size,
+        "number": number,
+        "load_json_ms": load_cold * 1e3,
+        "load_cache_ms": load_cached * 1e3,
+        "tr_ns": new_total / number * 1e9,
+        "legacy_tr_ns": legacy_total / legacy_number * 1e9,
+        "tr_real_lang_ns": real_total / number * 1e9,
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=4))
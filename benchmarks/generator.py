@@ -0,0 +1,261 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+ベンチマーク用の合成ライブラリを生成するモジュール。
+
+ファセット（作者、ブランドなど）の値はZipf分布に従って偏らせ、
+実際のライブラリに近い件数の偏りを再現します。
+動画ファイルはffmpegの `lavfi testsrc` で生成します。
+"""
+
+import bisect
+import contextlib
+import hashlib
+import itertools
+import os
+import random
+import shutil
+import sqlite3
+import subprocess
+import tempfile
+
+from benchmarks import SRC_DIR
+
+# ファセットのカラムと値の種類数。
+FACETS = {
+    "author": 5000,
+    "series": 2000,
+    "category": 40,
+    "brand": 300,
+    "publisher": 150,
+    "company": 400,
+    "club": 1500,
+}
+# Zipf分布の指数。
+ZIPF_EXPONENT = 1.1
+# ファセットが空の割合。
+EMPTY_RATIO = 0.2
+
+# 生成するカラム（insert の順序）。
+COLUMNS = (
+    ["title", "media_type", "duration", "file_name"]
+    + list(FACETS)
+    + [
+        "video_codec_name",
+        "video_width",
+        "video_height",
+        "save_dir_path",
+        "file_hash_algorithm",
+        "file_hash_data",
+    ]
+)
+
+_WORDS = (
+    "alpha bravo charlie delta echo foxtrot golf hotel india juliet kilo "
+    "lima mike november oscar papa quebec romeo sierra tango uniform "
+    "victor whiskey xray yankee zulu"
+).split()
+_CODECS = (("h264", 0.7), ("hevc", 0.2), ("mpeg4", 0.07), ("vp9", 0.03))
+_SIZES = (("1920", "1080"), ("1280", "720"), ("3840", "2160"), ("720", "480"))
+
+
+def _zipf_cum_weights(count: int, exponent: float = ZIPF_EXPONENT) -> list:
+    """
+    Zipf分布の累積重みを求めます。
+
+    Args:
+        count (int): 値の種類数。
+        exponent (float, optional): 指数。
+
+    Returns:
+        list: 累積重みのリスト。
+    """
+    return list(
+        itertools.accumulate(1 / (k**exponent) for k in range(1, count + 1))
+    )
+
+
+def generate_rows(count: int, seed: int = 0, start_id: int = 1):
+    """
+    合成レコードを順次生成するジェネレータ。
+
+    Args:
+        count (int): 生成するレコード数。
+        seed (int, optional): 乱数のシード。
+        start_id (int, optional): ファイル名などに使用する最初の番号。
+
+    Yields:
+        tuple: `COLUMNS` の順の値のタプル。
+    """
+    rng = random.Random(seed)
+    facets = {
+        column: (
+            [f"{column}_{i:05d}" for i in range(size)],
+            _zipf_cum_weights(size),
+        )
+        for column, size in FACETS.items()
+    }
+    codec_names = [c for c, _ in _CODECS]
+    codec_weights = list(itertools.accumulate(w for _, w in _CODECS))
+
+    for number in range(start_id, start_id + count):
+        title = " ".join(rng.choices(_WORDS, k=rng.randint(2, 6)))
+        seconds = rng.randint(30, 7200)
+        values = [
+            f"{title} {number}",
+            "movie",
+            f"{seconds // 3600:02}:{seconds // 60 % 60:02}:{seconds % 60:02}",
+            f"clip{number}.mp4",
+        ]
+        for column, (names, cum_weights) in facets.items():
+            if rng.random() < EMPTY_RATIO:
+                values.append("")
+                continue
+            index = bisect.bisect(cum_weights, rng.random() * cum_weights[-1])
+            values.append(names[min(index, len(names) - 1)])
+        codec = rng.choices(codec_names, cum_weights=codec_weights)[0]
+        width, height = rng.choice(_SIZES)
+        values.extend(
+            [
+                codec,
+                width,
+                height,
+                f"id{number}",
+                "sha256",
+                hashlib.sha256(str(number).encode()).hexdigest(),
+            ]
+        )
+        yield tuple(values)
+
+
+def populate_db(
+    db_file_path: str, count: int, seed: int = 0, batch_size: int = 10000
+) -> None:
+    """
+    `MetaDataDB` が作成したテーブルに合成レコードを一括で追加します。
+
+    Args:
+        db_file_path (str): データベースファイルのパス。
+        count (int): 追加するレコード数。
+        seed (int, optional): 乱数のシード。
+        batch_size (int, optional): 1回の `executemany` で追加するレコード数。
+    """
+    sql = (
+        f"INSERT INTO MetaDataTbl ({', '.join(COLUMNS)}) "
+        f"VALUES ({', '.join('?' * len(COLUMNS))});"
+    )
+    rows = generate_rows(count, seed)
+    with sqlite3.connect(db_file_path, isolation_level=None) as conn:
+        cursor = conn.cursor()
+        cursor.execute("BEGIN;")
+        while batch := list(itertools.islice(rows, batch_size)):
+            cursor.executemany(sql, batch)
+        cursor.execute("COMMIT;")
+
+
+def is_ffmpeg_available() -> bool:
+    """
+    ffmpegとffprobeの実行ファイルがあるかを確認します。
+
+    Returns:
+        bool: どちらもある場合はTrue。
+    """
+    return all(shutil.which(name) for name in ("ffmpeg", "ffprobe"))
+
+
+def make_test_videos(
+    out_dir: str,
+    count: int,
+    duration: float = 1.0,
+    size: str = "160x120",
+) -> list:
+    """
+    ffmpegの `lavfi testsrc` で小さな動画ファイルを生成します。
+
+    インポート時の重複判定で除外されないよう、動画ごとに内容を変えます。
+
+    Args:
+        out_dir (str): 出力先ディレクトリ。
+        count (int): 生成するファイル数。
+        duration (float, optional): 再生時間（秒）。
+        size (str, optional): 画面サイズ。
+
+    Returns:
+        list: 生成したファイルのパスのリスト。
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for i in range(count):
+        path = os.path.join(out_dir, f"testsrc{i:04d}.mp4")
+        source = f"testsrc=duration={duration}:size={size}:rate=25"
+        subprocess.run(
+            [
+                "ffmpeg",
+                "-v",
+                "error",
+                "-y",
+                "-f",
+                "lavfi",
+                "-i",
+                source,
+                "-vf",
+                f"hue=h={i * 37 % 360}",
+                "-c:v",
+                "mpeg4",
+                "-metadata",
+                f"title=testsrc{i}",
+                path,
+            ],
+            check=True,
+        )
+        paths.append(path)
+    return paths
+
+
+@contextlib.contextmanager
+def app_environment():
+    """
+    一時ディレクトリにアプリケーションの設定とライブラリを用意するコンテキストマネージャ。
+
+    設定ファイルを作業ディレクトリに作るため `AppConfig` をデバッグモードで生成し、
+    シングルトンはすべて作り直します。終了時には作業ディレクトリを元に戻し、
+    シングルトンを破棄します。
+
+    Yields:
+        AppConfig: 生成した設定クラスのインスタンス。
+    """
+    from pkg.config import AppConfig, app_config
+    from pkg.metadata import MetaDataDB
+    from pkg.translation import Translate
+
+    prev_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.chdir(work_dir)
+        app_config.DEBUG = True
+        reset_singletons()
+        try:
+            config = AppConfig()
+            os.makedirs(config.get_db_dir(), exist_ok=True)
+            Translate(
+                os.path.join(SRC_DIR, "lang"),
+                config.get_language(),
+                config.get_cache_dir(),
+            )
+            MetaDataDB(config.get_db_path())
+            yield config
+        finally:
+            reset_singletons()
+            os.chdir(prev_dir)
+
+
+def reset_singletons() -> None:
+    """
+    アプリケーションのシングルトンを破棄します。
+    """
+    from pkg.config import AppConfig
+    from pkg.metadata import MetaDataDB
+    from pkg.translation import Translate
+
+    AppConfig._instance = None
+    MetaDataDB._instance = None
+    Translate._instance = None
@@ -1,13 +1,27 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
+import json
 import logging
+import multiprocessing
 import os
+import queue
 import sys
 from logging import Formatter, StreamHandler
-from logging.handlers import RotatingFileHandler
+from logging.handlers import (
+    QueueHandler,
+    QueueListener,
+    RotatingFileHandler,
+)
 
 from pkg.config import AppConfig
 from pkg.gui import app_run
+from pkg.metadata import (
+    FFmpegGovernor,
+    IOScheduler,
+    MetaDataDB,
+    set_media_backend,
+)
+from pkg.metrics import Metrics
 from pkg.translation import Translate
 
 logger = logging.getLogger(__name__)
@@ -15,23 +29,48 @@ logger = logging.getLogger(__name__)
 DEBUG = True
 
 
+class JsonLinesFormatter(Formatter):
+    """
+    ログを1行1件のJSON形式で出力するフォーマッタ。
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "file": record.filename,
+            "line": record.lineno,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        return json.dumps(data, ensure_ascii=False)
+
+
 def my_logging_setup(
     log_path: str,
     log_file: str,
     log_size: int | str,
     log_backup_count: int | str,
-) -> None:
+    level: int = logging.INFO,
+    json_lines: bool = False,
+) -> QueueListener:
     """
     ログ設定を行います。ローテーティングファイルハンドラとストリームハンドラを使用してログを構成します。
 
+    ログの出力はキューを介してバックグラウンドのスレッドで行うため、
+    GUIスレッドでファイルの書き込みやローテーションの確認は行いません。
+
     Args:
         log_path (str): ログファイルを作成するディレクトリへのパス。
         log_file (str): ログファイル名。
         log_size (int | str): ログファイルの最大サイズ（MB単位）。
         log_backup_count (int | str): 保存するバックアップログファイルの数。
+        level (int, optional): 出力するログレベル。
+        json_lines (bool, optional): Trueの場合、ログファイルを1行1件のJSON形式で出力する。
 
     Returns:
-        None: この関数は戻り値を持ちません。
+        QueueListener: 開始したリスナー。終了時に `stop()` を呼び出すこと。
     """
     formatter = Formatter(
         "%(asctime)s : %(levelname)s : %(filename)s - %(message)s"
@@ -58,10 +97,24 @@ def my_logging_setup(
         backupCount=backup_count,
         encoding="utf-8",
     )
+    if json_lines:
+        file_handler.setFormatter(JsonLinesFormatter())
+    else:
+        file_handler.setFormatter(formatter)
 
-    logging.basicConfig(
-        level=logging.NOTSET, handlers=[stream_handler, file_handler]
+    # 呼び出し側はキューに積むだけとし、書き込みはリスナーのスレッドで行う
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = QueueListener(
+        log_queue, stream_handler, file_handler, respect_handler_level=True
     )
+    listener.start()
+
+    # 例外の情報はキューに積む時点でメッセージに含める
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.setFormatter(Formatter("%(message)s"))
+
+    logging.basicConfig(level=level, handlers=[queue_handler])
+    return listener
 
 
 def get_exec_path() -> str:
@@ -95,15 +148,49 @@ def main() -> int:
 
     # 翻訳クラスを生成
     path = os.path.join(os.getcwd(), "lang")
-    _ = Translate(path, app_config.get_language())
+    _ = Translate(path, app_config.get_language(), app_config.get_cache_dir())
+
+    listener = my_logging_setup(
+        app_config.get_log_dir(),
+        app_config.get_log_file(),
+        100,
+        4,
+        app_config.get_log_level(),
+        app_config.is_log_json(),
+    )
 
-    my_logging_setup(
-        app_config.get_log_dir(), app_config.get_log_file(), 100, 4
+    # 処理時間の計測
+    if DEBUG or app_config.is_metrics_enabled():
+        Metrics().enable()
+
+    # 実行に時間がかかったSQL文の記録
+    db = MetaDataDB(app_config.get_db_path())
+    slow_query_ms = app_config.get_slow_query_threshold_ms()
+    if slow_query_ms > 0:
+        db.enable_slow_query_log(
+            slow_query_ms, app_config.get_slow_query_log_file()
+        )
+
+    # デバイスごとの読み込みのスケジューラ（インポートや整合性チェックで共有）
+    _ = IOScheduler(
+        app_config.get_io_workers(), app_config.get_io_device_workers()
+    )
+    # ffmpegの同時実行数の調整
+    _ = FFmpegGovernor(
+        app_config.get_ffmpeg_max_jobs(), app_config.get_ffmpeg_nice()
     )
+    # メディア情報の取得とフレームのキャプチャのバックエンド
+    set_media_backend(app_config.get_media_backend())
 
     # GUI起動
-    return app_run()
+    ret = app_run()
+    db.disable_slow_query_log()
+    # キューに残っているログを出力してから終了する
+    listener.stop()
+    return ret
 
 
 if __name__ == "__main__":
+    # PyInstallerでバンドルした場合のワーカープロセス対応
+    multiprocessing.freeze_support()
     sys.exit(main())
@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 import ast
 import configparser
+import logging
 import os
 import platform
 
@@ -70,6 +71,9 @@ class AppConfig:
             "db_dir": os.path.join(cfg_dir, "db"),
             "db": "metadata.db",
             "language": "ja_JP",
+            "cache_dir": os.path.join(cfg_dir, "cache"),
+            "log_level": "INFO",
+            "log_json": "0",
         }
         self.config["APP_GUI"] = {
             "font_size": "14",
@@ -79,6 +83,41 @@ class AppConfig:
         }
         self.config["APP_PLUGINS"] = {
             "plugins_dir": os.path.join(cfg_dir, "plugins"),
+            "frame_budget_ms": "12",
+            "progress_interval_ms": "100",
+            "plugin_processes": "0",
+        }
+        self.config["APP_IO"] = {
+            "workers_hdd": "1",
+            "workers_ssd": "4",
+            "workers_network": "2",
+            "workers_unknown": "2",
+            "device_workers": "",
+            "verify_bandwidth_mb": "0",
+            "ffmpeg_max_jobs": "0",
+            "ffmpeg_nice": "10",
+            "media_backend": "auto",
+        }
+        self.config["APP_PROXY"] = {
+            "enabled": "0",
+            "height": "480",
+            "video_bitrate_k": "800",
+            "threads": "2",
+            "nice": "15",
+        }
+        self.config["APP_JOBS"] = {
+            "workers": "4",
+            "max_attempts": "3",
+        }
+        self.config["APP_AUTOTAG"] = {
+            "min_length": "2",
+            "product_number": "",
+            "jancode": "",
+        }
+        self.config["APP_DEBUG"] = {
+            "metrics": "0",
+            "slow_query_ms": "0",
+            "slow_query_log": "slow_query.log",
         }
 
         # 設定ファイルの存在確認と作成
@@ -87,6 +126,7 @@ class AppConfig:
                 os.path.dirname(self.cfg_path),
                 self.config["APP_INFO"]["log_dir"],
                 self.config["APP_INFO"]["db_dir"],
+                self.config["APP_INFO"]["cache_dir"],
                 self.config["APP_PLUGINS"]["plugins_dir"],
             ]
             for d in dir_list:
@@ -166,6 +206,30 @@ class AppConfig:
         """
         return self.config["APP_INFO"]["log"]
 
+    def get_log_level(self) -> int:
+        """
+        出力するログレベルを取得します。
+
+        Returns:
+            int: ログレベル。設定値が不正な場合は `logging.INFO`。
+        """
+        level = logging.getLevelName(
+            self.config["APP_INFO"]["log_level"].strip().upper()
+        )
+        return level if isinstance(level, int) else logging.INFO
+
+    def is_log_json(self) -> bool:
+        """
+        ログファイルを1行1件のJSON形式で出力するかどうかを取得します。
+
+        Returns:
+            bool: JSON形式で出力する場合はTrue。
+        """
+        try:
+            return self.config.getboolean("APP_INFO", "log_json")
+        except ValueError:
+            return False
+
     def get_db_dir(self) -> str:
         """
         データベースディレクトリのパスを取得します。
@@ -193,6 +257,15 @@ class AppConfig:
         """
         return os.path.join(self.get_db_dir(), self.get_db_file())
 
+    def get_cache_dir(self) -> str:
+        """
+        キャッシュディレクトリのパスを取得します。
+
+        Returns:
+            str: キャッシュディレクトリのパス。
+        """
+        return self.config["APP_INFO"]["cache_dir"]
+
     def get_language(self) -> str:
         """
         言語を取得します。
@@ -211,6 +284,249 @@ class AppConfig:
         """
         return self.config["APP_PLUGINS"]["plugins_dir"]
 
+    def get_plugin_frame_budget_ms(self) -> int:
+        """
+        プラグインが1回のタイマ処理で使用できる時間を取得します。
+
+        Returns:
+            int: 時間（ミリ秒）
+        """
+        try:
+            return max(1, int(self.config["APP_PLUGINS"]["frame_budget_ms"]))
+        except ValueError:
+            return 12
+
+    def get_plugin_progress_interval_ms(self) -> int:
+        """
+        プラグインの進捗表示を更新する間隔を取得します。
+
+        Returns:
+            int: 間隔（ミリ秒）
+        """
+        try:
+            return max(
+                0, int(self.config["APP_PLUGINS"]["progress_interval_ms"])
+            )
+        except ValueError:
+            return 100
+
+    def get_plugin_processes(self) -> int:
+        """
+        プラグインをワーカープロセスで実行する際の並列数を取得します。
+
+        Returns:
+            int: 並列数。設定値が0の場合はCPU数。
+        """
+        try:
+            processes = int(self.config["APP_PLUGINS"]["plugin_processes"])
+        except ValueError:
+            processes = 0
+        if processes <= 0:
+            processes = os.cpu_count() or 1
+        return processes
+
+    def get_io_workers(self) -> dict:
+        """
+        デバイスの種類ごとに同時に読み込むファイル数を取得します。
+
+        Returns:
+            dict: 種類（`hdd`、`ssd`、`network`、`unknown`）をキー、
+            同時に読み込むファイル数を値とする辞書。不正な値の種類は含まない。
+        """
+        workers = {}
+        for kind in ("hdd", "ssd", "network", "unknown"):
+            try:
+                workers[kind] = max(
+                    1, int(self.config["APP_IO"][f"workers_{kind}"])
+                )
+            except ValueError:
+                pass
+        return workers
+
+    def get_io_device_workers(self) -> dict:
+        """
+        特定のデバイスで同時に読み込むファイル数を取得します。
+
+        設定値は `パス=ファイル数` を `;` で区切って指定します。
+
+        Returns:
+            dict: パスをキー、同時に読み込むファイル数を値とする辞書。
+        """
+        device_workers = {}
+        for entry in self.config["APP_IO"]["device_workers"].split(";"):
+            path, _, count = entry.rpartition("=")
+            if path.strip() and count.strip().isdigit():
+                device_workers[path.strip()] = int(count)
+        return device_workers
+
+    def get_verify_bandwidth(self) -> int:
+        """
+        整合性チェックの読み込み帯域の上限を取得します。
+
+        Returns:
+            int: 上限（バイト/秒）。0の場合は上限なし。
+        """
+        try:
+            mb = int(self.config["APP_IO"]["verify_bandwidth_mb"])
+        except ValueError:
+            return 0
+        return max(0, mb) * 1024 * 1024
+
+    def get_ffmpeg_max_jobs(self) -> int:
+        """
+        ffmpegを同時に実行する数の上限を取得します。
+
+        Returns:
+            int: 上限。0の場合はCPU数。
+        """
+        try:
+            return max(0, int(self.config["APP_IO"]["ffmpeg_max_jobs"]))
+        except ValueError:
+            return 0
+
+    def get_ffmpeg_nice(self) -> int:
+        """
+        ffmpegを実行する優先度（nice値の増分）を取得します。
+
+        Returns:
+            int: nice値の増分。0の場合は優先度を下げない。
+        """
+        try:
+            return max(0, int(self.config["APP_IO"]["ffmpeg_nice"]))
+        except ValueError:
+            return 10
+
+    def get_media_backend(self) -> str:
+        """
+        メディア情報の取得とフレームのキャプチャに使用するバックエンドを取得します。
+
+        Returns:
+            str: `auto`、`pyav`、`ffmpeg` のいずれか。
+        """
+        backend = self.config["APP_IO"]["media_backend"].strip().lower()
+        if backend not in ("auto", "pyav", "ffmpeg"):
+            return "auto"
+        return backend
+
+    def is_proxy_enabled(self) -> bool:
+        """
+        インポートした動画のプロキシ動画を作成するかどうかを取得します。
+
+        Returns:
+            bool: 作成する場合はTrue。
+        """
+        try:
+            return self.config.getboolean("APP_PROXY", "enabled")
+        except ValueError:
+            return False
+
+    def get_proxy_settings(self) -> dict:
+        """
+        プロキシ動画の作成の設定を取得します。
+
+        Returns:
+            dict: `ProxyTranscoder` の引数（`height`、`video_bitrate_k`、
+            `threads`、`nice`）の辞書。不正な値の項目は含まない。
+        """
+        settings = {}
+        for key in ("height", "video_bitrate_k", "threads", "nice"):
+            try:
+                settings[key] = max(0, int(self.config["APP_PROXY"][key]))
+            except ValueError:
+                pass
+        return settings
+
+    def get_job_workers(self) -> int:
+        """
+        ジョブを同時に実行するワーカーの数を取得します。
+
+        Returns:
+            int: ワーカーの数。
+        """
+        try:
+            return max(1, int(self.config["APP_JOBS"]["workers"]))
+        except ValueError:
+            return 4
+
+    def get_job_max_attempts(self) -> int:
+        """
+        失敗したジョブを再試行する場合の実行回数の上限を取得します。
+
+        Returns:
+            int: 実行回数の上限。
+        """
+        try:
+            return max(1, int(self.config["APP_JOBS"]["max_attempts"]))
+        except ValueError:
+            return 3
+
+    def get_autotag_min_length(self) -> int:
+        """
+        自動タグ付けの辞書に登録する値の最小の長さを取得します。
+
+        Returns:
+            int: 最小の長さ。
+        """
+        try:
+            return max(1, int(self.config["APP_AUTOTAG"]["min_length"]))
+        except ValueError:
+            return 2
+
+    def get_autotag_rules(self) -> dict:
+        """
+        自動タグ付けで品番とJANコードを探すユーザー定義の正規表現を取得します。
+
+        設定値は正規表現を1行に1つずつ指定します。
+
+        Returns:
+            dict: カラム名をキー、正規表現のリストを値とする辞書。
+        """
+        rules = {}
+        for column in ("product_number", "jancode"):
+            patterns = [
+                line.strip()
+                for line in self.config["APP_AUTOTAG"][column].splitlines()
+                if line.strip()
+            ]
+            if patterns:
+                rules[column] = patterns
+        return rules
+
+    def is_metrics_enabled(self) -> bool:
+        """
+        処理時間の計測が有効かどうかを取得します。
+
+        Returns:
+            bool: 有効な場合はTrue。
+        """
+        try:
+            return self.config.getboolean("APP_DEBUG", "metrics")
+        except ValueError:
+            return False
+
+    def get_slow_query_threshold_ms(self) -> float:
+        """
+        SQL文を記録する所要時間のしきい値を取得します。
+
+        Returns:
+            float: しきい値（ミリ秒）。0の場合は記録しない。
+        """
+        try:
+            return max(0.0, float(self.config["APP_DEBUG"]["slow_query_ms"]))
+        except ValueError:
+            return 0.0
+
+    def get_slow_query_log_file(self) -> str:
+        """
+        SQL文を記録するログファイルのパスを取得します。
+
+        Returns:
+            str: ログファイルのパス。
+        """
+        return os.path.join(
+            self.get_log_dir(), self.config["APP_DEBUG"]["slow_query_log"]
+        )
+
     def get_font_size(self) -> str:
         """
         フォントサイズを取得します。
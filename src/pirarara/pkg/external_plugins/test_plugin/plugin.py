@@ -4,6 +4,10 @@ from pkg.gui.plugins import PirararaExternalPluginInterface
 
 
 class ExternalPlugin(PirararaExternalPluginInterface):
+    name = "test_plugin"
+    version = "0.0.1"
+    capabilities = ("debug",)
+
     def do_action(self):
         print("do_action")
 
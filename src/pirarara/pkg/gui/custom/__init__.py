@@ -2,7 +2,11 @@
 # -*- coding: utf-8 -*-
 
 from .combo_box import PirararaComboBox
+from .gallery_view import PirararaGalleryView
 from .graphics_view import PirararaImageViewer
+from .job_monitor import PirararaJobMonitor
+from .job_queue import JobQueue
+from .proxy_queue import ProxyQueue
 from .message_box import (
     critical_message_box,
     info_message_box,
@@ -19,6 +23,10 @@ __all__ = [
     "PirararaTableWidget",
     "PirararaTreeWidget",
     "PirararaImageViewer",
+    "PirararaGalleryView",
+    "PirararaJobMonitor",
+    "ProxyQueue",
+    "JobQueue",
     "info_message_box",
     "warning_message_box",
     "critical_message_box",
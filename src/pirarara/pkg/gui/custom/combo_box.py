@@ -2,7 +2,7 @@
 # -*- coding: utf-8 -*-
 import logging
 
-from PySide6.QtCore import Signal
+from PySide6.QtCore import QTimer, Signal
 from PySide6.QtWidgets import QComboBox
 
 logger = logging.getLogger(__name__)
@@ -18,9 +18,15 @@ class PirararaComboBox(QComboBox):
     # 新しいアイテムが編集されたときに発信されるシグナル。編集されたテキストを渡します。
     item_edited = Signal(str)
 
+    # 入力中のテキストで検索する際に発信されるシグナル。入力中のテキストを渡します。
+    text_searched = Signal(str)
+
     # 記憶する履歴の最大数。
     HISTORY_COUNT = 10
 
+    # 入力が止まってから検索するまでの待ち時間（ミリ秒）。
+    SEARCH_DELAY_MS = 300
+
     def __init__(self, parent=None, history: int | None = None):
         """
         コンストラクタ。
@@ -39,10 +45,17 @@ class PirararaComboBox(QComboBox):
         # スタイル設定
         self._setup()
 
+        # キー入力をまとめるためのタイマ
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(self.__class__.SEARCH_DELAY_MS)
+        self._search_timer.timeout.connect(self.on_search_timeout)
+
         # イベントハンドラを設定
         self.line_edit = self.lineEdit()
         if self.line_edit is not None:
             self.line_edit.editingFinished.connect(self.on_editing_finished)
+            self.line_edit.textEdited.connect(self.on_text_edited)
 
     def _setup(self):
         """
@@ -72,6 +85,9 @@ class PirararaComboBox(QComboBox):
         Returns:
             None
         """
+        # 入力中の検索は不要となる
+        self._search_timer.stop()
+
         new_text = self.currentText()
         if new_text not in [self.itemText(i) for i in range(self.count())]:
             if self.count() >= self.__class__.HISTORY_COUNT:
@@ -79,11 +95,36 @@ class PirararaComboBox(QComboBox):
                 old_text = self.itemText(0)
                 # 古いアイテムを削除
                 self.removeItem(0)
-                logger.info(f"remove item {old_text}")
+                logger.debug(f"remove item {old_text}")
             # 新しいアイテム追加
             self.addItem(new_text)
-            logger.info(f"add new item {new_text}")
+            logger.debug(f"add new item {new_text}")
 
         # 独自シグナルを発信
-        logger.info(f"New item {new_text}")
+        logger.debug(f"New item {new_text}")
         self.item_edited.emit(new_text)
+
+    def on_text_edited(self, text: str):
+        """
+        テキストが入力されるたびに呼び出されるイベントハンドラ。
+
+        連続したキー入力の間は検索せず、入力が止まってから検索するようタイマを再始動します。
+
+        Args:
+            text (str): 入力中のテキスト。
+
+        Returns:
+            None
+        """
+        self._search_timer.start()
+
+    def on_search_timeout(self):
+        """
+        入力が止まった際に呼び出されるイベントハンドラ。
+
+        独自シグナル `text_searched` を発信します。
+
+        Returns:
+            None
+        """
+        self.text_searched.emit(self.currentText())
@@ -0,0 +1,300 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import logging
+import os
+from collections import OrderedDict
+
+from pkg.config import AppConfig
+from pkg.metadata import MetaDataDB
+from pkg.metrics import timed
+from PySide6.QtCore import (
+    QAbstractListModel,
+    QModelIndex,
+    QPersistentModelIndex,
+    QPoint,
+    QSize,
+    Qt,
+    QTimer,
+    Signal,
+)
+from PySide6.QtGui import QColor, QImage, QPixmap
+from PySide6.QtWidgets import QAbstractItemView, QListView
+
+from .thumbnail_cache import ThumbnailCache
+
+logger = logging.getLogger(__name__)
+
+
+class PirararaGalleryModel(QAbstractListModel):
+    """
+    ギャラリー表示用のリストモデルクラス。
+
+    保持するのはIDとタイトルと保存先だけで、サムネイルはビューが描画する
+    （表示範囲内の）項目についてのみ `ThumbnailCache` に要求します。
+    用意できたサムネイルは件数を制限してメモリに保持します。
+    """
+
+    # IDを取得するためのロール。
+    IdRole = Qt.ItemDataRole.UserRole + 1
+
+    # メモリに保持するサムネイルの数。
+    PIXMAP_CACHE_SIZE = 1500
+
+    def __init__(self, thumbnail_cache: ThumbnailCache, parent=None):
+        """
+        コンストラクタ。
+
+        Args:
+            thumbnail_cache (ThumbnailCache): サムネイルのキャッシュ。
+            parent (QObject, optional): 親オブジェクト。デフォルトはNone。
+        """
+        super().__init__(parent)
+        self.thumbnail_cache = thumbnail_cache
+        self.thumbnail_cache.thumbnail_ready.connect(self.on_thumbnail_ready)
+
+        # (id, title, save_dir_path) のリスト
+        self._rows: list = []
+        self._row_of_id: dict[int, int] = {}
+        self._pixmaps: OrderedDict = OrderedDict()
+        # サムネイルがないことが分かっている項目
+        self._missing: set = set()
+        self.thumbnail_size = ThumbnailCache.SIZES[0]
+        self._placeholder = self._create_placeholder(self.thumbnail_size)
+
+    def _create_placeholder(self, size: int) -> QPixmap:
+        pixmap = QPixmap(size, size * 9 // 16)
+        pixmap.fill(QColor(64, 64, 64))
+        return pixmap
+
+    def set_rows(self, rows: list) -> None:
+        """
+        表示する項目を設定します。
+
+        Args:
+            rows (list): `(id, title, save_dir_path)` のリスト。
+        """
+        self.beginResetModel()
+        self._rows = rows
+        self._row_of_id = {row[0]: i for i, row in enumerate(rows)}
+        self._missing.clear()
+        self.thumbnail_cache.clear_requests()
+        self.endResetModel()
+
+    def set_thumbnail_size(self, size: int) -> None:
+        """
+        サムネイルのキャッシュサイズを設定します。
+
+        Args:
+            size (int): キャッシュサイズ。
+        """
+        if size == self.thumbnail_size:
+            return
+        self.thumbnail_size = size
+        self._placeholder = self._create_placeholder(size)
+        self.thumbnail_cache.clear_requests()
+        if self._rows:
+            self.dataChanged.emit(
+                self.index(0), self.index(len(self._rows) - 1)
+            )
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self._rows)
+
+    def data(
+        self,
+        index: QModelIndex | QPersistentModelIndex,
+        role=Qt.ItemDataRole.DisplayRole,
+    ):
+        if not index.isValid():
+            return None
+        media_id, title, save_dir_path = self._rows[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return title
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return f"id{media_id} {title}"
+        if role == self.__class__.IdRole:
+            return media_id
+        if role == Qt.ItemDataRole.DecorationRole:
+            key = (media_id, self.thumbnail_size)
+            pixmap = self._pixmaps.get(key)
+            if pixmap is not None:
+                self._pixmaps.move_to_end(key)
+                return pixmap
+            if save_dir_path and key not in self._missing:
+                # 描画される項目のサムネイルだけを要求する
+                self.thumbnail_cache.request(
+                    media_id,
+                    self.thumbnail_size,
+                    os.path.join(save_dir_path, "capture.jpg"),
+                )
+            return self._placeholder
+        return None
+
+    def on_thumbnail_ready(self, media_id: int, size: int, image: QImage):
+        """
+        サムネイルが用意できたときの処理。
+
+        Args:
+            media_id (int): ID。
+            size (int): キャッシュサイズ。
+            image (QImage): サムネイル。
+        """
+        key = (media_id, size)
+        if image.isNull():
+            self._missing.add(key)
+            return
+        self._pixmaps[key] = QPixmap.fromImage(image)
+        while len(self._pixmaps) > self.__class__.PIXMAP_CACHE_SIZE:
+            self._pixmaps.popitem(last=False)
+        row = self._row_of_id.get(media_id)
+        if row is not None and size == self.thumbnail_size:
+            index = self.index(row)
+            self.dataChanged.emit(
+                index, index, [Qt.ItemDataRole.DecorationRole]
+            )
+
+
+class PirararaGalleryView(QListView):
+    """
+    サムネイルを一覧表示するギャラリービュークラス。
+
+    `QListView` のアイコンモードで項目のサイズを固定し、表示範囲内の項目だけを
+    描画します。スクロールが止まった時点で表示範囲外となった未処理の
+    サムネイルの要求を破棄します。Ctrl+ホイールで表示サイズを変更します。
+    """
+
+    # アイテムが選択された際に発信されるシグナル。選択された項目のデータベースIDを渡します。
+    item_selected = Signal(int)
+
+    # 表示サイズの候補（ピクセル）。
+    ICON_SIZES = (96, 128, 192, 256, 384, 512)
+    # スクロール停止とみなすまでの時間（ミリ秒）。
+    SCROLL_SETTLE_MS = 150
+
+    def __init__(self, parent=None):
+        """
+        コンストラクタ。
+
+        Args:
+            parent (QObject, optional): 親ウィジェット。デフォルトはNone。
+        """
+        super().__init__(parent)
+
+        # 構成情報からDBファイル名取得
+        app_config = AppConfig()
+        db_file_path = app_config.get_db_path()
+        # DBクラスを生成
+        self.db = MetaDataDB(db_file_path)
+
+        self.thumbnail_cache = ThumbnailCache(parent=self)
+        self.gallery_model = PirararaGalleryModel(self.thumbnail_cache, self)
+        self.setModel(self.gallery_model)
+
+        self.setViewMode(QListView.ViewMode.IconMode)
+        self.setResizeMode(QListView.ResizeMode.Adjust)
+        self.setMovement(QListView.Movement.Static)
+        self.setWrapping(True)
+        self.setWordWrap(False)
+        # すべての項目を同じサイズとし、全件のサイズ計算を省く
+        self.setUniformItemSizes(True)
+        self.setLayoutMode(QListView.LayoutMode.Batched)
+        self.setBatchSize(1000)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+
+        self._icon_size_index = 1
+        self._apply_icon_size()
+
+        # スクロール停止後に表示範囲外の要求を破棄する
+        self._settle_timer = QTimer(self)
+        self._settle_timer.setSingleShot(True)
+        self._settle_timer.setInterval(self.__class__.SCROLL_SETTLE_MS)
+        self._settle_timer.timeout.connect(self.retain_visible_requests)
+        self.verticalScrollBar().valueChanged.connect(
+            lambda: self._settle_timer.start()
+        )
+
+        self.selectionModel().currentChanged.connect(self.on_current_changed)
+
+    def _apply_icon_size(self):
+        size = self.__class__.ICON_SIZES[self._icon_size_index]
+        self.setIconSize(QSize(size, size * 9 // 16))
+        self.setGridSize(QSize(size + 16, size * 9 // 16 + 32))
+        self.gallery_model.set_thumbnail_size(ThumbnailCache.fit_size(size))
+
+    @timed("gui.gallery_load")
+    def load(self, column: str | None = None, keyword: str | None = None):
+        """
+        データベースから項目を取得して表示します。
+
+        Args:
+            column (str | None, optional): 検索対象のカラム名。デフォルトはNone。
+            keyword (str | None, optional): 検索キーワード。デフォルトはNone。
+
+        Returns:
+            None
+        """
+        if column and keyword:
+            data = self.db.get_all_data_by_column(column, keyword) or []
+            rows = [
+                (int(d["id"]), d.get("title", ""), d.get("save_dir_path", ""))
+                for d in data
+                if d.get("deletion_mark", "0") != "1"
+            ]
+        else:
+            rows = [
+                (id, title or "", save_dir_path or "")
+                for batch in self.db.iter_rows(["title", "save_dir_path"])
+                for id, title, save_dir_path in batch
+            ]
+        self.gallery_model.set_rows(rows)
+
+    def retain_visible_requests(self):
+        """
+        表示範囲外となった未処理のサムネイルの要求を破棄します。
+
+        Returns:
+            None
+        """
+        first = self.indexAt(QPoint(1, 1))
+        viewport = self.viewport().rect()
+        last = self.indexAt(viewport.bottomRight() - QPoint(1, 1))
+        if not first.isValid():
+            return
+        last_row = (
+            last.row() if last.isValid() else self.model().rowCount() - 1
+        )
+        size = self.gallery_model.thumbnail_size
+        keys = set()
+        for row in range(first.row(), last_row + 1):
+            media_id = (
+                self.model().index(row, 0).data(PirararaGalleryModel.IdRole)
+            )
+            keys.add((media_id, size))
+        self.thumbnail_cache.retain(keys)
+
+    def on_current_changed(self, current: QModelIndex, previous: QModelIndex):
+        if current.isValid():
+            self.item_selected.emit(current.data(PirararaGalleryModel.IdRole))
+
+    def wheelEvent(self, event):
+        """
+        Ctrl+ホイールで表示サイズを変更します。
+
+        Args:
+            event (QWheelEvent): ホイールイベント。
+        """
+        if event.modifiers() & Qt.KeyboardModifier.ControlModifier:
+            step = 1 if event.angleDelta().y() > 0 else -1
+            index = min(
+                max(self._icon_size_index + step, 0),
+                len(self.__class__.ICON_SIZES) - 1,
+            )
+            if index != self._icon_size_index:
+                self._icon_size_index = index
+                self._apply_icon_size()
+            event.accept()
+            return
+        super().wheelEvent(event)
@@ -4,15 +4,23 @@ import logging
 import os
 
 from pkg.config import AppConfig
-from pkg.metadata import MetaDataDB
-from PySide6.QtCore import Qt
-from PySide6.QtGui import QPixmap
+from pkg.metadata import (
+    MetaDataDB,
+    get_preview_path,
+    get_sprite_paths,
+    load_sprite_index,
+)
+from pkg.metrics import timed
+from PySide6.QtCore import QRect, Qt, QUrl
+from PySide6.QtGui import QDesktopServices, QPixmap
 from PySide6.QtWidgets import (
     QGraphicsPixmapItem,
     QGraphicsScene,
     QGraphicsView,
 )
 
+from .sprite_queue import SpriteQueue
+
 logger = logging.getLogger(__name__)
 
 
@@ -21,6 +29,11 @@ class PirararaImageViewer(QGraphicsView):
     画像表示機能を提供するカスタムQGraphicsViewクラス。
 
     データベースに保存された情報をもとに画像を読み込み、QGraphicsView上に表示します。
+    スプライトシートがある動画は、マウスの横位置に応じたフレームを表示して
+    内容を確認（スクラブ）できます。スプライトシートは表示時に一度だけ読み込み、
+    マウス移動時にはデコードもffmpegの実行も行いません。
+    ダブルクリックすると動画を再生します。プロキシ動画がある場合はプロキシ動画を
+    再生します。
     """
 
     def __init__(self, parent=None):
@@ -44,6 +57,18 @@ class PirararaImageViewer(QGraphicsView):
         self.setScene(self.graphics_scene)
         self.image_item = None
 
+        # スクラブ用のフレーム
+        self.sprite_item = None
+        self._sprite_tiles: list = []
+        self._sprite_frame = -1
+        self._current_id = 0
+        self.viewport().setMouseTracking(True)
+
+        # スプライトシートの作成キュー
+        self.sprite_queue = SpriteQueue(self)
+        self.sprite_queue.sprite_ready.connect(self.on_sprite_ready)
+
+    @timed("gui.show_image")
     def show_image(self, db_id: int):
         """
         指定されたデータベースIDに基づいて画像を表示します。
@@ -56,18 +81,108 @@ class PirararaImageViewer(QGraphicsView):
         Returns:
             None
         """
-        self.graphics_scene.clear()
+        self.clear_image()
 
         data = self.db.get_data(db_id)
         if data is not None:
             img_dir = data.get("save_dir_path", "")
             if img_dir:
+                self._current_id = db_id
                 img_path = os.path.join(img_dir, "capture.jpg")
                 pixmap = QPixmap(img_path)
                 self.image_item = QGraphicsPixmapItem(pixmap)
                 self.graphics_scene.addItem(self.image_item)
                 self.setSceneRect(pixmap.rect())
                 self.fit_in_view()
+                if not self.load_sprite(img_dir) and data.get("file_name"):
+                    self.sprite_queue.request(db_id)
+
+    def load_sprite(self, img_dir: str) -> bool:
+        """
+        スプライトシートを読み込み、フレームごとの画像に分割します。
+
+        Args:
+            img_dir (str): 保存先ディレクトリ。
+
+        Returns:
+            bool: 読み込めた場合はTrue。
+        """
+        index = load_sprite_index(img_dir)
+        if index is None:
+            return False
+        sheet = QPixmap(get_sprite_paths(img_dir)[0])
+        if sheet.isNull():
+            return False
+
+        width = index["tile_width"]
+        height = index["tile_height"]
+        columns = index["columns"]
+        self._sprite_tiles = [
+            sheet.copy(
+                QRect(
+                    (i % columns) * width,
+                    (i // columns) * height,
+                    width,
+                    height,
+                )
+            )
+            for i in range(index["frames"])
+        ]
+        self._sprite_frame = -1
+
+        # キャプチャ画像と同じ大きさで重ねて表示する
+        self.sprite_item = QGraphicsPixmapItem()
+        self.sprite_item.setTransformationMode(
+            Qt.TransformationMode.SmoothTransformation
+        )
+        rect = self.sceneRect()
+        if rect.isEmpty():
+            self.setSceneRect(0, 0, width, height)
+            rect = self.sceneRect()
+        scale = min(rect.width() / width, rect.height() / height)
+        self.sprite_item.setScale(scale)
+        self.sprite_item.setPos(
+            rect.x() + (rect.width() - width * scale) / 2,
+            rect.y() + (rect.height() - height * scale) / 2,
+        )
+        self.sprite_item.hide()
+        self.graphics_scene.addItem(self.sprite_item)
+        return True
+
+    def on_sprite_ready(self, db_id: int):
+        """
+        スプライトシートが作成されたときの処理。
+
+        Args:
+            db_id (int): ID。
+        """
+        if db_id == self._current_id and self.sprite_item is None:
+            data = self.db.get_data(db_id)
+            if data is not None and data.get("save_dir_path"):
+                self.load_sprite(data["save_dir_path"])
+
+    def scrub(self, ratio: float):
+        """
+        スプライトシートの指定位置のフレームを表示します。
+
+        Args:
+            ratio (float): 再生位置（0.0〜1.0）。
+        """
+        if self.sprite_item is None:
+            return
+        frames = len(self._sprite_tiles)
+        frame = min(max(int(ratio * frames), 0), frames - 1)
+        if frame != self._sprite_frame:
+            self._sprite_frame = frame
+            self.sprite_item.setPixmap(self._sprite_tiles[frame])
+        self.sprite_item.show()
+
+    def end_scrub(self):
+        """
+        スクラブを終了し、キャプチャ画像の表示に戻します。
+        """
+        if self.sprite_item is not None:
+            self.sprite_item.hide()
 
     def clear_image(self):
         """
@@ -77,6 +192,10 @@ class PirararaImageViewer(QGraphicsView):
             None
         """
         self.graphics_scene.clear()
+        self.image_item = None
+        self.sprite_item = None
+        self._sprite_tiles = []
+        self._current_id = 0
 
     def fit_in_view(self):
         """
@@ -103,3 +222,46 @@ class PirararaImageViewer(QGraphicsView):
         """
         super().resizeEvent(event)
         self.fit_in_view()
+
+    def mouseMoveEvent(self, event):
+        """
+        マウスの横位置に応じたフレームを表示します。
+
+        Args:
+            event (QMouseEvent): マウスイベント。
+        """
+        super().mouseMoveEvent(event)
+        width = self.viewport().width()
+        if width > 0:
+            self.scrub(event.position().x() / width)
+
+    def mouseDoubleClickEvent(self, event):
+        """
+        表示中の動画を既定のアプリケーションで再生します。
+
+        Args:
+            event (QMouseEvent): マウスイベント。
+        """
+        super().mouseDoubleClickEvent(event)
+        if not self._current_id:
+            return
+        data = self.db.get_data(self._current_id)
+        if data is None:
+            return
+        save_dir_path = data.get("save_dir_path", "")
+        file_name = data.get("file_name", "")
+        if not save_dir_path or not file_name:
+            return
+        file_path = get_preview_path(save_dir_path, file_name)
+        if os.path.exists(file_path):
+            QDesktopServices.openUrl(QUrl.fromLocalFile(file_path))
+
+    def leaveEvent(self, event):
+        """
+        マウスがビューから離れたときにキャプチャ画像の表示に戻します。
+
+        Args:
+            event (QEvent): イベント。
+        """
+        super().leaveEvent(event)
+        self.end_scrub()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import logging
+
+from pkg.config import AppConfig
+from pkg.metadata import describe_job
+from pkg.metadata.jobs import JOB_DONE, JOB_FAILED, JOB_QUEUED, JOB_RUNNING
+from pkg.translation import Translate
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtWidgets import (
+    QDockWidget,
+    QHBoxLayout,
+    QLabel,
+    QPushButton,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+    QWidget,
+)
+
+from .job_queue import JobQueue
+
+logger = logging.getLogger(__name__)
+
+
+class PirararaJobMonitor(QDockWidget):
+    """
+    ジョブの実行状況を表示するドックウィジェットクラス。
+
+    モーダルではないため、ジョブの実行中も他の操作ができます。
+    表示は表示中の間だけ一定間隔で更新し、失敗したジョブの再実行、
+    作成待ちのジョブの取り消し、完了したジョブの削除ができます。
+    """
+
+    # 表示を更新する間隔（ミリ秒）。
+    REFRESH_INTERVAL_MS = 1000
+    # 表示するジョブの数の上限。
+    MAX_ROWS = 200
+    # 表示するカラム。
+    COLUMNS = ["job_id", "job_type", "target", "status", "attempts", "error"]
+
+    def __init__(self, job_queue: JobQueue, parent=None):
+        """
+        コンストラクタ。
+
+        Args:
+            job_queue (JobQueue): ジョブのキュー。
+            parent (QWidget, optional): 親ウィジェット。デフォルトはNone。
+        """
+        super().__init__(parent)
+        self.job_queue = job_queue
+
+        # アプリケーション構成ファイルアクセスクラス
+        self.app_config = AppConfig()
+
+        # 翻訳クラスを生成
+        self.translate = Translate()
+        name = self.__class__.__name__
+
+        # 画面タイトルの設定
+        self.setWindowTitle(self.translate.tr(name, "Jobs"))
+        self.setObjectName(name)
+
+        # フォントサイズ設定
+        self.setFont(self.app_config.get_app_font())
+
+        self.contents = QWidget(self)
+        self.formLayout = QVBoxLayout(self.contents)
+
+        # 状態ごとのジョブの数
+        self.summary_label = QLabel(self.contents)
+        self.formLayout.addWidget(self.summary_label)
+
+        # ジョブの一覧
+        self.table = QTableWidget(self.contents)
+        self.table.setColumnCount(len(self.__class__.COLUMNS))
+        self.table.setHorizontalHeaderLabels(
+            [
+                self.translate.tr(name, column)
+                for column in self.__class__.COLUMNS
+            ]
+        )
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.formLayout.addWidget(self.table)
+
+        # ボタン
+        self.horizontalLayout = QHBoxLayout()
+        self.retry_button = QPushButton(self.contents)
+        self.retry_button.setText(self.translate.tr(name, "Retry failed"))
+        self.horizontalLayout.addWidget(self.retry_button)
+        self.cancel_button = QPushButton(self.contents)
+        self.cancel_button.setText(self.translate.tr(name, "Cancel queued"))
+        self.horizontalLayout.addWidget(self.cancel_button)
+        self.horizontalLayout.addStretch()
+        self.clear_button = QPushButton(self.contents)
+        self.clear_button.setText(self.translate.tr(name, "Clear finished"))
+        self.horizontalLayout.addWidget(self.clear_button)
+        self.formLayout.addLayout(self.horizontalLayout)
+
+        self.setWidget(self.contents)
+
+        # 表示の定期更新（表示中のみ）
+        self.timer = QTimer(self)
+        self.timer.setInterval(self.__class__.REFRESH_INTERVAL_MS)
+        self.timer.timeout.connect(self.refresh)
+        self.visibilityChanged.connect(self.on_visibility_changed)
+
+        # シグナルにスロット割当
+        self.retry_button.clicked.connect(self.retry_clicked)
+        self.cancel_button.clicked.connect(self.cancel_clicked)
+        self.clear_button.clicked.connect(self.clear_clicked)
+
+    def on_visibility_changed(self, visible: bool):
+        """
+        表示中の間だけ表示を定期的に更新します。
+
+        Args:
+            visible (bool): 表示中の場合はTrue。
+        """
+        if visible:
+            self.refresh()
+            self.timer.start()
+        else:
+            self.timer.stop()
+
+    def refresh(self):
+        """
+        ジョブの実行状況の表示を更新します。
+        """
+        name = self.__class__.__name__
+        db = self.job_queue.db
+        counts = db.count_jobs()
+        summary = "  ".join(
+            f"{self.translate.tr(name, status)}: {counts.get(status, 0)}"
+            for status in (JOB_RUNNING, JOB_QUEUED, JOB_FAILED, JOB_DONE)
+        )
+        if self.job_queue.is_paused():
+            summary += f"  ({self.translate.tr(name, 'paused')})"
+        self.summary_label.setText(summary)
+
+        jobs = db.get_jobs(self.__class__.MAX_ROWS)
+        self.table.setRowCount(len(jobs))
+        for row, job in enumerate(jobs):
+            job_id, job_type, payload, status, attempts, last_error, _ = job
+            values = [
+                str(job_id),
+                self.translate.tr(name, job_type),
+                describe_job(job_type, payload),
+                self.translate.tr(name, status),
+                str(attempts),
+                last_error or "",
+            ]
+            for column, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if column in (0, 4):
+                    item.setTextAlignment(
+                        Qt.AlignmentFlag.AlignRight
+                        | Qt.AlignmentFlag.AlignVCenter
+                    )
+                self.table.setItem(row, column, item)
+        self.table.resizeColumnsToContents()
+
+    def retry_clicked(self):
+        """
+        失敗したジョブを再実行します。
+        """
+        count = self.job_queue.retry_failed()
+        logger.info(f"{count} failed jobs were requeued")
+        self.refresh()
+
+    def cancel_clicked(self):
+        """
+        作成待ちのジョブを取り消します。
+        """
+        count = self.job_queue.cancel_queued()
+        logger.info(f"{count} queued jobs were canceled")
+        self.refresh()
+
+    def clear_clicked(self):
+        """
+        完了したジョブを一覧から削除します。
+        """
+        self.job_queue.clear_finished()
+        self.refresh()
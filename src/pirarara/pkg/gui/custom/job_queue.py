@@ -0,0 +1,325 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import logging
+import threading
+
+from pkg.config import AppConfig
+from pkg.metadata import (
+    IOScheduler,
+    JobRunner,
+    MetaDataDB,
+    discard_interrupted_imports,
+    get_retry_delay,
+)
+from pkg.metadata.jobs import (
+    JOB_IMPORT,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    JOB_THUMBNAIL,
+    JOB_VERIFY,
+)
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QTimer, Signal
+
+logger = logging.getLogger(__name__)
+
+
+class _JobWorker(QRunnable):
+    """
+    ジョブを取り出して実行するワーカー。
+    """
+
+    def __init__(self, queue: "JobQueue"):
+        super().__init__()
+        self.queue = queue
+
+    def run(self):
+        while (job := self.queue._take_job()) is not None:
+            self.queue._run_job(*job)
+
+
+class JobQueue(QObject):
+    """
+    インポート、サムネイルの作成、整合性チェックなどの長時間の処理を
+    ジョブとしてバックグラウンドで実行するキュークラス。
+
+    ジョブはデータベースの `JobTbl` に保存し、複数のワーカーがトランザクションで
+    1件ずつ取り出して実行します。失敗したジョブは待ち時間を延ばしながら
+    再試行し、アプリケーションを終了しても次回の起動時に続きから実行します。
+    """
+
+    # ユーザーが選択した項目の優先度（一括処理より先に処理する）。
+    PRIORITY_USER = 10
+    # インポートや一括処理の優先度。
+    PRIORITY_BATCH = 0
+
+    # ジョブの実行を開始したときに発信されるシグナル。ジョブIDと種類を渡します。
+    job_started = Signal(int, str)
+    # ジョブの実行が終了したときに発信されるシグナル。
+    # ジョブID、種類、処理結果（失敗した場合はNone）を渡します。
+    job_finished = Signal(int, str, object)
+    # 整合性チェックのジョブがすべて終了したときに発信されるシグナル。
+    # チェック結果を渡します。
+    verify_finished = Signal(dict)
+    # 実行できるジョブがなくなったときに発信されるシグナル。
+    idle = Signal()
+    # 再試行を待つジョブがある場合に、ワーカーの再開をGUIスレッドへ依頼する。
+    _wake_requested = Signal(float)
+
+    def __init__(self, parent=None):
+        """
+        コンストラクタ。
+
+        Args:
+            parent (QObject, optional): 親オブジェクト。デフォルトはNone。
+        """
+        super().__init__(parent)
+
+        # 構成情報からDBファイル名取得
+        app_config = AppConfig()
+        db_file_path = app_config.get_db_path()
+        # DBクラスを生成
+        self.db = MetaDataDB(db_file_path)
+        self.runner = JobRunner(
+            self.db,
+            IOScheduler(),
+            verify_bandwidth=app_config.get_verify_bandwidth(),
+        )
+        self.workers = app_config.get_job_workers()
+        self.max_attempts = app_config.get_job_max_attempts()
+
+        self._lock = threading.Lock()
+        self._active_workers = 0
+        self._stopped = False
+        # 一時停止中はクリアする
+        self._resume_event = threading.Event()
+        self._resume_event.set()
+
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(self.workers)
+
+        # 再試行の待ち時間が過ぎたらワーカーを再開する
+        self._wake_timer = QTimer(self)
+        self._wake_timer.setSingleShot(True)
+        self._wake_timer.timeout.connect(self._start_workers)
+        self._wake_requested.connect(self._schedule_wake)
+        self.job_finished.connect(self._on_job_finished)
+
+    def start(self) -> None:
+        """
+        前回の終了時に残ったジョブの実行を開始します。
+
+        実行中のまま終了したものは作成待ちに戻し、完了したものは削除します。
+        再開するインポートのジョブがない場合は、中断したインポートのレコードを
+        削除します。
+        """
+        reset = self.db.reset_jobs(self.max_attempts)
+        if reset:
+            logger.info(f"{reset} interrupted jobs were requeued")
+        self.db.delete_finished_jobs()
+        if not self._count_pending(JOB_IMPORT):
+            discarded = discard_interrupted_imports()
+            if discarded:
+                logger.info(f"{discarded} interrupted imports were discarded")
+        self._start_workers()
+
+    def enqueue(
+        self, job_type: str, payloads: list, priority: int = PRIORITY_BATCH
+    ) -> int:
+        """
+        ジョブを登録して実行を開始します。
+
+        Args:
+            job_type (str): ジョブの種類。
+            payloads (list): ジョブの内容のリスト。
+            priority (int, optional): 優先度。大きいほど先に処理する。
+
+        Returns:
+            int: 登録したジョブの数。
+        """
+        if not payloads or self._stopped:
+            return 0
+        count = self.db.add_jobs(job_type, payloads, priority)
+        self._start_workers()
+        return count
+
+    def import_files(self, files: list) -> int:
+        """
+        ファイルのインポートを登録します。
+
+        Args:
+            files (list): ファイルのパスのリスト。
+
+        Returns:
+            int: 登録したジョブの数。
+        """
+        return self.enqueue(JOB_IMPORT, self.runner.import_payloads(files))
+
+    def create_thumbnails(
+        self, ids: list, priority: int = PRIORITY_USER
+    ) -> int:
+        """
+        キャプチャ画像（サムネイル）の作成し直しを登録します。
+
+        Args:
+            ids (list): IDのリスト。
+            priority (int, optional): 優先度。
+
+        Returns:
+            int: 登録したジョブの数。
+        """
+        return self.enqueue(
+            JOB_THUMBNAIL, [{"media_id": id} for id in ids], priority
+        )
+
+    def verify_library(self, resume: bool = True) -> int:
+        """
+        ライブラリの整合性チェックを登録します。
+
+        完了すると `verify_finished` でチェック結果を通知します。
+        チェックするレコードがない場合はすぐに通知します。
+
+        Args:
+            resume (bool, optional): Trueの場合、完了していない前回の実行を
+                再開する。
+
+        Returns:
+            int: 登録したジョブの数。
+        """
+        scan_id, payloads = self.runner.verify_payloads(resume)
+        count = self.enqueue(JOB_VERIFY, payloads)
+        if not self._count_pending(JOB_VERIFY):
+            self.verify_finished.emit(self.runner.finish_verify(scan_id))
+        return count
+
+    def retry_failed(self) -> int:
+        """
+        失敗したジョブを再実行します。
+
+        Returns:
+            int: 再実行するジョブの数。
+        """
+        count = self.db.retry_failed_jobs()
+        if count:
+            self._start_workers()
+        return count
+
+    def cancel_queued(self) -> int:
+        """
+        作成待ちのジョブを取り消します。実行中のジョブはそのまま実行します。
+
+        Returns:
+            int: 取り消したジョブの数。
+        """
+        return self.db.cancel_queued_jobs()
+
+    def clear_finished(self) -> int:
+        """
+        完了したジョブを一覧から削除します。
+
+        Returns:
+            int: 削除したジョブの数。
+        """
+        return self.db.delete_finished_jobs()
+
+    def pause(self) -> None:
+        """
+        ジョブの取り出しを一時停止します。実行中のジョブは最後まで実行します。
+        """
+        self._resume_event.clear()
+        logger.info("jobs paused")
+
+    def resume(self) -> None:
+        """
+        一時停止したジョブの取り出しを再開します。
+        """
+        self._resume_event.set()
+        logger.info("jobs resumed")
+
+    def is_paused(self) -> bool:
+        """
+        一時停止中かどうかを取得します。
+
+        Returns:
+            bool: 一時停止中の場合はTrue。
+        """
+        return not self._resume_event.is_set()
+
+    def stop(self, wait_ms: int = 3000) -> None:
+        """
+        ジョブの実行を中断します。
+
+        中断したジョブは作成待ちに戻し、次回の起動時に実行します。
+
+        Args:
+            wait_ms (int, optional): ワーカーの終了を待つ時間（ミリ秒）。
+        """
+        self._stopped = True
+        self._wake_timer.stop()
+        self.runner.cancel()
+        self._resume_event.set()
+        self.pool.waitForDone(wait_ms)
+
+    def _count_pending(self, job_type: str) -> int:
+        counts = self.db.count_jobs(job_type)
+        return counts.get(JOB_QUEUED, 0) + counts.get(JOB_RUNNING, 0)
+
+    def _start_workers(self) -> None:
+        with self._lock:
+            if self._stopped:
+                return
+            count = self.workers - self._active_workers
+            self._active_workers += count
+        for _ in range(count):
+            self.pool.start(_JobWorker(self))
+
+    def _schedule_wake(self, delay: float) -> None:
+        self._wake_timer.start(int(delay * 1000) + 100)
+
+    def _take_job(self) -> tuple | None:
+        self._resume_event.wait()
+        # 登録とワーカーの終了が行き違わないようロックを取得して取り出す
+        with self._lock:
+            job = None if self._stopped else self.db.claim_job()
+            if job is None:
+                self._active_workers -= 1
+                last = self._active_workers == 0
+        if job is None:
+            if last and not self._stopped:
+                delay = self.db.get_next_job_delay()
+                if delay is None:
+                    self.idle.emit()
+                else:
+                    self._wake_requested.emit(delay)
+            return None
+        self.job_started.emit(job[0], job[1])
+        return job
+
+    def _run_job(
+        self, job_id: int, job_type: str, payload: dict, attempts: int
+    ) -> None:
+        try:
+            result = self.runner.run(job_type, payload)
+        except InterruptedError:
+            # 中断したものは次回の起動時に実行する
+            self.db.release_job(job_id)
+            return
+        except Exception as e:
+            logger.error(f"Error running {job_type} job {job_id}: {e}")
+            retry_delay = None
+            if attempts < self.max_attempts:
+                retry_delay = get_retry_delay(attempts)
+            self.db.fail_job(job_id, str(e), retry_delay)
+            self.job_finished.emit(job_id, job_type, None)
+            return
+        self.db.complete_job(job_id, result)
+        self.job_finished.emit(job_id, job_type, result)
+
+    def _on_job_finished(self, job_id: int, job_type: str, result) -> None:
+        # 整合性チェックは最後のジョブが終了したら結果をまとめる
+        if job_type != JOB_VERIFY or self._stopped:
+            return
+        if self._count_pending(JOB_VERIFY):
+            return
+        scan_id = self.db.get_unfinished_verify_scan()
+        if scan_id is not None:
+            self.verify_finished.emit(self.runner.finish_verify(scan_id))
@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import logging
+import os
+import threading
+
+from pkg.config import AppConfig
+from pkg.metadata import MetaDataDB, ProxyTranscoder
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+logger = logging.getLogger(__name__)
+
+
+class _ProxyWorker(QRunnable):
+    """
+    作成待ちのプロキシ動画を優先度の順に作成するワーカー。
+    """
+
+    def __init__(self, queue: "ProxyQueue"):
+        super().__init__()
+        self.queue = queue
+
+    def run(self):
+        while (media_id := self.queue._take_job()) is not None:
+            try:
+                size = self.queue._create(media_id)
+            except Exception as e:
+                logger.error(f"Error creating proxy id{media_id}: {e}")
+                size = None
+            self.queue._finish_job(media_id, size)
+
+
+class _MissingScanner(QRunnable):
+    """
+    プロキシ動画がない動画を探して作成待ちに登録するワーカー。
+    """
+
+    def __init__(self, queue: "ProxyQueue"):
+        super().__init__()
+        self.queue = queue
+
+    def run(self):
+        ids = []
+        for batch in self.queue.db.iter_rows(["media_type", "proxy_status"]):
+            for media_id, media_type, proxy_status in batch:
+                if media_type == "movie" and not proxy_status:
+                    ids.append(media_id)
+        if ids:
+            logger.info(f"{len(ids)} items have no proxy")
+            self.queue.enqueue(ids)
+
+
+class ProxyQueue(QObject):
+    """
+    プレビュー用のプロキシ動画をバックグラウンドで作成するキュークラス。
+
+    作成待ちはデータベースの `ProxyJobTbl` に保存するため、アプリケーションを
+    終了しても次回の起動時に続きから作成します。ffmpegの実行は1件ずつ、
+    スレッド数を制限して低い優先度で行い、`pause` で一時停止できます。
+    """
+
+    # ユーザーが選択した項目の優先度（インポート時の一括作成より先に処理する）。
+    PRIORITY_USER = 10
+    # インポート時や一括作成の優先度。
+    PRIORITY_BATCH = 0
+
+    # プロキシ動画の作成を開始したときに発信されるシグナル。IDを渡します。
+    job_started = Signal(int)
+    # プロキシ動画の作成が終了したときに発信されるシグナル。
+    # IDと作成できたかどうかを渡します。
+    job_finished = Signal(int, bool)
+    # 作成待ちがなくなったときに発信されるシグナル。
+    idle = Signal()
+
+    def __init__(self, parent=None):
+        """
+        コンストラクタ。
+
+        Args:
+            parent (QObject, optional): 親オブジェクト。デフォルトはNone。
+        """
+        super().__init__(parent)
+
+        # 構成情報からDBファイル名取得
+        app_config = AppConfig()
+        db_file_path = app_config.get_db_path()
+        # DBクラスを生成
+        self.db = MetaDataDB(db_file_path)
+        self.transcoder = ProxyTranscoder(**app_config.get_proxy_settings())
+
+        self._lock = threading.Lock()
+        self._worker_running = False
+        self._stopped = False
+        # 一時停止中はクリアする
+        self._resume_event = threading.Event()
+        self._resume_event.set()
+
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+
+    def start(self) -> None:
+        """
+        前回の終了時に残った作成待ちの処理を開始します。
+
+        実行中のまま終了したものは作成待ちに戻してから処理します。
+        """
+        reset = self.db.reset_proxy_jobs()
+        if reset:
+            logger.info(f"{reset} interrupted proxy jobs were requeued")
+        if self.db.count_proxy_jobs():
+            self._start_worker()
+
+    def enqueue(self, ids: list, priority: int = PRIORITY_BATCH) -> None:
+        """
+        プロキシ動画の作成を登録します。
+
+        Args:
+            ids (list): IDのリスト。
+            priority (int, optional): 優先度。大きいほど先に処理する。
+        """
+        if not ids or self._stopped:
+            return
+        self.db.add_proxy_jobs(ids, priority)
+        self._start_worker()
+
+    def enqueue_missing(self) -> None:
+        """
+        プロキシ動画がないすべての動画の作成を登録します。
+
+        項目の検索もワーカースレッドで行います。
+        """
+        QThreadPool.globalInstance().start(_MissingScanner(self))
+
+    def pause(self) -> None:
+        """
+        プロキシ動画の作成を一時停止します。実行中のffmpegも一時停止します。
+        """
+        self._resume_event.clear()
+        self.transcoder.pause()
+        logger.info("proxy generation paused")
+
+    def resume(self) -> None:
+        """
+        一時停止したプロキシ動画の作成を再開します。
+        """
+        self.transcoder.resume()
+        self._resume_event.set()
+        logger.info("proxy generation resumed")
+
+    def is_paused(self) -> bool:
+        """
+        一時停止中かどうかを取得します。
+
+        Returns:
+            bool: 一時停止中の場合はTrue。
+        """
+        return not self._resume_event.is_set()
+
+    def stop(self, wait_ms: int = 3000) -> None:
+        """
+        プロキシ動画の作成を中断します。
+
+        実行中のものは作成待ちに戻し、次回の起動時に作成します。
+
+        Args:
+            wait_ms (int, optional): ワーカーの終了を待つ時間（ミリ秒）。
+        """
+        self._stopped = True
+        self.transcoder.cancel()
+        self._resume_event.set()
+        self.pool.waitForDone(wait_ms)
+
+    def _start_worker(self) -> None:
+        with self._lock:
+            if self._worker_running or self._stopped:
+                return
+            self._worker_running = True
+        self.pool.start(_ProxyWorker(self))
+
+    def _take_job(self) -> int | None:
+        self._resume_event.wait()
+        # 登録とワーカーの終了が行き違わないようロックを取得して取り出す
+        with self._lock:
+            media_id = None if self._stopped else self.db.take_proxy_job()
+            if media_id is None:
+                self._worker_running = False
+        if media_id is None:
+            if not self._stopped:
+                self.idle.emit()
+            return None
+        self.job_started.emit(media_id)
+        return media_id
+
+    def _finish_job(self, media_id: int, size: int | None) -> None:
+        if self._stopped:
+            # 中断したものは次回の起動時に作成する
+            self.db.reset_proxy_jobs([media_id])
+            return
+        self.db.finish_proxy_job(media_id, size)
+        self.job_finished.emit(media_id, size is not None)
+
+    def _create(self, media_id: int) -> int | None:
+        """
+        プロキシ動画を作成します。
+
+        Args:
+            media_id (int): ID。
+
+        Returns:
+            int | None: プロキシ動画のサイズ（バイト）。作成できなかった場合はNone。
+        """
+        data = self.db.get_data(media_id)
+        if data is None:
+            return None
+        save_dir_path = data.get("save_dir_path", "")
+        file_name = data.get("file_name", "")
+        if not save_dir_path or not file_name:
+            return None
+        file_path = os.path.join(save_dir_path, file_name)
+        if not os.path.exists(file_path):
+            return None
+        try:
+            source_height = int(data.get("video_height") or 0)
+        except ValueError:
+            source_height = 0
+        return self.transcoder.transcode(
+            file_path, save_dir_path, source_height
+        )
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import logging
+import sqlite3
+
+from pkg.metadata import MetaDataDB
+from PySide6.QtCore import QThread, Signal
+
+logger = logging.getLogger(__name__)
+
+
+class PirararaSearchThread(QThread):
+    """
+    データベース検索をGUIスレッド外で実行するスレッドクラス。
+
+    検索結果をページ単位でシグナル発信し、`cancel` により実行中のクエリを
+    `sqlite3.Connection.interrupt()` で中断します。
+    """
+
+    # 検索結果の1ページ分を渡すシグナル。検索世代と辞書のリストを渡します。
+    page_loaded = Signal(int, list)
+    # 検索が最後まで完了したときに発信されるシグナル。検索世代を渡します。
+    search_finished = Signal(int)
+
+    # 1ページあたりのレコード数。
+    PAGE_SIZE = 500
+
+    def __init__(
+        self,
+        generation: int,
+        column: str | None,
+        keyword: str | None,
+        parent=None,
+    ):
+        """
+        コンストラクタ。
+
+        Args:
+            generation (int): 検索世代。古い検索結果の破棄に使用します。
+            column (str | None): 検索対象のカラム名。
+            keyword (str | None): 検索キーワード。
+            parent (QObject, optional): 親オブジェクト。デフォルトはNone。
+        """
+        super().__init__(parent)
+        self.generation = generation
+        self.column = column
+        self.keyword = keyword
+        self.db = MetaDataDB()
+        self._conn: sqlite3.Connection | None = None
+
+    def run(self):
+        """
+        検索を実行し、ページ単位で結果を発信します。
+
+        Returns:
+            None
+        """
+        if self.isInterruptionRequested():
+            return
+        try:
+            self._conn = self.db.connect(check_same_thread=False)
+            for rows in self.db.iter_data_by_column(
+                self._conn, self.column, self.keyword, self.PAGE_SIZE
+            ):
+                if self.isInterruptionRequested():
+                    return
+                self.page_loaded.emit(self.generation, rows)
+            self.search_finished.emit(self.generation)
+        except sqlite3.OperationalError as e:
+            # interrupt()による中断は正常系として扱う
+            if not self.isInterruptionRequested():
+                logger.error(f"Error searching: {e}")
+        finally:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def cancel(self):
+        """
+        検索を中断します。GUIスレッドから呼び出します。
+
+        Returns:
+            None
+        """
+        self.requestInterruption()
+        conn = self._conn
+        if conn is not None:
+            try:
+                conn.interrupt()
+            except sqlite3.ProgrammingError:
+                # 既に接続が閉じられている
+                pass
@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+from pkg.config import AppConfig
+from pkg.metadata import (
+    MetaDataDB,
+    create_sprite_sheet,
+    get_preview_path,
+    get_sprite_paths,
+    parse_duration,
+)
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+logger = logging.getLogger(__name__)
+
+
+class _SpriteWorker(QRunnable):
+    """
+    キューに積まれたスプライトシートを順に作成するワーカー。
+    """
+
+    def __init__(self, queue: "SpriteQueue"):
+        super().__init__()
+        self.queue = queue
+
+    def run(self):
+        while (media_id := self.queue._take_request()) is not None:
+            try:
+                created = self.queue._create(media_id)
+            except Exception as e:
+                logger.error(f"Error creating sprite sheet id{media_id}: {e}")
+                created = False
+            self.queue._finish_request(media_id, created)
+
+
+class _MissingScanner(QRunnable):
+    """
+    スプライトシートがない項目を探してキューに積むワーカー。
+    """
+
+    def __init__(self, queue: "SpriteQueue"):
+        super().__init__()
+        self.queue = queue
+
+    def run(self):
+        ids = []
+        for batch in self.queue.db.iter_rows(["save_dir_path", "file_name"]):
+            for media_id, save_dir_path, file_name in batch:
+                if not save_dir_path or not file_name:
+                    continue
+                if not os.path.exists(get_sprite_paths(save_dir_path)[0]):
+                    ids.append(media_id)
+        if ids:
+            logger.info(f"{len(ids)} items have no sprite sheet")
+            self.queue.enqueue(ids)
+
+
+class SpriteQueue(QObject):
+    """
+    スプライトシートをバックグラウンドで作成するキュークラス。
+
+    ffmpegの実行は1件ずつ行います。表示中の項目の要求（`request`）は
+    インポート後や起動時の一括作成（`enqueue`）より先に処理します。
+    """
+
+    # スプライトシートが作成されたときに発信されるシグナル。IDを渡します。
+    sprite_ready = Signal(int)
+
+    def __init__(self, parent=None):
+        """
+        コンストラクタ。
+
+        Args:
+            parent (QObject, optional): 親オブジェクト。デフォルトはNone。
+        """
+        super().__init__(parent)
+
+        # 構成情報からDBファイル名取得
+        app_config = AppConfig()
+        db_file_path = app_config.get_db_path()
+        # DBクラスを生成
+        self.db = MetaDataDB(db_file_path)
+
+        self._lock = threading.Lock()
+        # 未処理の要求（末尾ほど優先）
+        self._queue: OrderedDict = OrderedDict()
+        self._running: set = set()
+        self._worker_running = False
+
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+
+    def request(self, media_id: int) -> None:
+        """
+        スプライトシートの作成を最優先で要求します。
+
+        Args:
+            media_id (int): ID。
+        """
+        self._add([media_id], first=True)
+
+    def enqueue(self, ids: list) -> None:
+        """
+        スプライトシートの作成を要求します。`request` の要求より後に処理します。
+
+        Args:
+            ids (list): IDのリスト。
+        """
+        self._add(ids, first=False)
+
+    def enqueue_missing(self) -> None:
+        """
+        スプライトシートがないすべての項目の作成を要求します。
+
+        項目の検索もワーカースレッドで行います。
+        """
+        QThreadPool.globalInstance().start(_MissingScanner(self))
+
+    def clear(self) -> None:
+        """
+        未処理の要求をすべて破棄します。
+        """
+        with self._lock:
+            self._queue.clear()
+
+    def _add(self, ids: list, first: bool) -> None:
+        with self._lock:
+            for media_id in ids:
+                if media_id in self._running:
+                    continue
+                if first:
+                    self._queue[media_id] = None
+                    self._queue.move_to_end(media_id)
+                elif media_id not in self._queue:
+                    self._queue[media_id] = None
+                    self._queue.move_to_end(media_id, last=False)
+            start_worker = bool(self._queue) and not self._worker_running
+            if start_worker:
+                self._worker_running = True
+        if start_worker:
+            self.pool.start(_SpriteWorker(self))
+
+    def _take_request(self) -> int | None:
+        with self._lock:
+            if not self._queue:
+                self._worker_running = False
+                return None
+            media_id, _ = self._queue.popitem(last=True)
+            self._running.add(media_id)
+        return media_id
+
+    def _finish_request(self, media_id: int, created: bool):
+        with self._lock:
+            self._running.discard(media_id)
+        if created:
+            self.sprite_ready.emit(media_id)
+
+    def _create(self, media_id: int) -> bool:
+        """
+        スプライトシートを作成します。既にある場合は何もしません。
+
+        Args:
+            media_id (int): ID。
+
+        Returns:
+            bool: 作成した場合はTrue。
+        """
+        data = self.db.get_data(media_id)
+        if data is None:
+            return False
+        save_dir_path = data.get("save_dir_path", "")
+        file_name = data.get("file_name", "")
+        if not save_dir_path or not file_name:
+            return False
+        if os.path.exists(get_sprite_paths(save_dir_path)[0]):
+            return False
+        # プロキシ動画がある場合は元の動画よりデコードが軽いため使用する
+        file_path = get_preview_path(save_dir_path, file_name)
+        if not os.path.exists(file_path):
+            return False
+        duration = parse_duration(data.get("duration", ""))
+        return (
+            create_sprite_sheet(file_path, duration, save_dir_path) is not None
+        )
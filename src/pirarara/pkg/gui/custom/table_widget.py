@@ -6,10 +6,28 @@ import shutil
 from datetime import datetime
 
 from pkg.config import AppConfig
-from pkg.metadata import MetaDataDB
+from pkg.gui.plugins.auto_tag import AutoTag
+from pkg.gui.plugins.normalize_title import NormalizeTitle
+from pkg.gui.plugins.perceptual_hash import PerceptualHashPlugin
+from pkg.metadata import (
+    MetaDataDB,
+    find_duplicate_groups,
+    format_duplicate_report,
+    format_verify_report,
+)
+from pkg.metrics import timed
 from pkg.translation import Translate
 from PySide6.QtCore import Qt, Signal
-from PySide6.QtWidgets import QTableWidget, QTableWidgetItem
+from PySide6.QtGui import QGuiApplication, QKeySequence
+from PySide6.QtWidgets import (
+    QInputDialog,
+    QMenu,
+    QMessageBox,
+    QTableWidget,
+    QTableWidgetItem,
+)
+
+from .search_thread import PirararaSearchThread
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +43,13 @@ class PirararaTableWidget(QTableWidget):
     item_selected = Signal(int)
     # アイテムが変更された際に発信されるシグナル。
     item_changed = Signal()
+    # プロキシ動画の作成が要求されたときに発信されるシグナル。IDのリストを渡します。
+    proxy_requested = Signal(list)
+    # キャプチャ画像の作成し直しが要求されたときに発信されるシグナル。
+    # IDのリストを渡します。
+    thumbnail_requested = Signal(list)
+    # ライブラリの整合性チェックが要求されたときに発信されるシグナル。
+    verify_requested = Signal()
 
     def __init__(self, parent=None):
         """
@@ -56,6 +81,7 @@ class PirararaTableWidget(QTableWidget):
             "save_dir_path",
             "file_hash_algorithm",
             "file_hash_data",
+            "import_session",
         }
         non_editable_keys = {
             "id",
@@ -69,6 +95,8 @@ class PirararaTableWidget(QTableWidget):
             "audio_sample_rate",
             "duration",
             "file_name",
+            "proxy_status",
+            "proxy_size",
         }
         date_keys = {"updated_at", "created_at"}
         for key in db_table_columns.keys():
@@ -92,6 +120,11 @@ class PirararaTableWidget(QTableWidget):
         for k in self.table_widget_columns.keys():
             self.columns_tr_keys.append(self.tr.tr(self.__class__.__name__, k))
 
+        # 非同期検索の状態
+        self._search_generation = 0
+        self._search_pending_clear = False
+        self._search_threads: list[PirararaSearchThread] = []
+
         # テーブルの初期セットアップ
         self._setup()
         # データベースからデータを取得して設定
@@ -99,6 +132,7 @@ class PirararaTableWidget(QTableWidget):
         # シグナルとスロットを接続
         self.cellChanged.connect(self.on_changed)
         self.itemSelectionChanged.connect(self.on_selection_changed)
+        self.customContextMenuRequested.connect(self.on_context_menu)
 
     def _setup(self):
         """
@@ -112,6 +146,7 @@ class PirararaTableWidget(QTableWidget):
         self.resizeColumnsToContents()
         self.setSelectionBehavior(QTableWidget.SelectRows)
         self.setSortingEnabled(True)
+        self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.setStyleSheet(
             "QTableWidget { font-size: 14pt; font-weight: bold;}"
             + "QTableWidget::item:selected { background-color: #3399ff; }"
@@ -144,6 +179,491 @@ class PirararaTableWidget(QTableWidget):
         self.db.update(db_id, db_column, db_value)
         self.item_changed.emit()
 
+    def keyPressEvent(self, event):
+        """
+        キーボード入力時の処理を実行します。
+
+        コピー、貼り付けのショートカットを処理し、それ以外は既定の処理に任せます。
+
+        Args:
+            event (QKeyEvent): キープレスイベント。
+
+        Returns:
+            None
+        """
+        if event.matches(QKeySequence.StandardKey.Copy):
+            self.copy_cells()
+            return
+        if event.matches(QKeySequence.StandardKey.Paste):
+            self.paste_cells()
+            return
+        super().keyPressEvent(event)
+
+    def on_context_menu(self, pos):
+        """
+        コンテキストメニューを表示します。
+
+        Args:
+            pos (QPoint): メニューを表示する位置（ビューポート座標）。
+
+        Returns:
+            None
+        """
+        name = self.__class__.__name__
+        menu = QMenu(self)
+        copy_action = menu.addAction(self.tr.tr(name, "Copy"))
+        paste_action = menu.addAction(self.tr.tr(name, "Paste"))
+        menu.addSeparator()
+        apply_action = menu.addAction(
+            self.tr.tr(name, "Apply value to selected rows")
+        )
+        apply_action.setEnabled(self._is_editable_column(self.currentColumn()))
+        normalize_action = menu.addAction(self.tr.tr(name, "Normalize titles"))
+        normalize_action.setEnabled(len(self._selected_rows()) > 0)
+        auto_tag_action = menu.addAction(self.tr.tr(name, "Auto-tag"))
+        menu.addSeparator()
+        duplicates_action = menu.addAction(self.tr.tr(name, "Find duplicates"))
+        verify_action = menu.addAction(self.tr.tr(name, "Verify library"))
+        menu.addSeparator()
+        proxy_action = menu.addAction(self.tr.tr(name, "Create proxy"))
+        proxy_action.setEnabled(len(self._selected_rows()) > 0)
+        thumbnail_action = menu.addAction(
+            self.tr.tr(name, "Recreate thumbnail")
+        )
+        thumbnail_action.setEnabled(len(self._selected_rows()) > 0)
+
+        action = menu.exec(self.viewport().mapToGlobal(pos))
+        if action == copy_action:
+            self.copy_cells()
+        elif action == paste_action:
+            self.paste_cells()
+        elif action == apply_action:
+            self.apply_value_to_selected_rows()
+        elif action == normalize_action:
+            self.normalize_selected_titles()
+        elif action == auto_tag_action:
+            self.auto_tag()
+        elif action == duplicates_action:
+            self.find_duplicates()
+        elif action == verify_action:
+            self.verify_library()
+        elif action == proxy_action:
+            self.request_proxy()
+        elif action == thumbnail_action:
+            self.request_thumbnail()
+
+    def copy_cells(self):
+        """
+        選択されたセルをタブ区切りのテキストとしてクリップボードにコピーします。
+
+        Returns:
+            None
+        """
+        indexes = self.selectedIndexes()
+        if not indexes:
+            return
+        rows = sorted({index.row() for index in indexes})
+        columns = sorted({index.column() for index in indexes})
+        lines = []
+        for row in rows:
+            values = []
+            for column in columns:
+                item = self.item(row, column)
+                values.append(item.text() if item is not None else "")
+            lines.append("\t".join(values))
+        QGuiApplication.clipboard().setText("\n".join(lines))
+
+    def paste_cells(self):
+        """
+        クリップボードのタブ区切りテキストを現在のセルを起点に貼り付けます。
+
+        クリップボードが単一の値で複数行が選択されている場合は、
+        選択されたすべての行の現在のカラムに貼り付けます。
+        編集できないカラムには貼り付けません。
+
+        Returns:
+            None
+        """
+        text = QGuiApplication.clipboard().text()
+        if not text:
+            return
+        text = text.replace("\r\n", "\n").rstrip("\n")
+        block = [line.split("\t") for line in text.split("\n")]
+
+        start_column = self.currentColumn()
+        if start_column < 0:
+            return
+        selected_rows = self._selected_rows()
+
+        cells = []
+        if len(block) == 1 and len(block[0]) == 1 and len(selected_rows) > 1:
+            if self._is_editable_column(start_column):
+                cells = [
+                    (row, start_column, block[0][0]) for row in selected_rows
+                ]
+        else:
+            start_row = (
+                selected_rows[0] if selected_rows else self.currentRow()
+            )
+            if start_row < 0:
+                return
+            for row_offset, values in enumerate(block):
+                row = start_row + row_offset
+                if row >= self.rowCount():
+                    break
+                for column_offset, value in enumerate(values):
+                    column = start_column + column_offset
+                    if column >= self.columnCount():
+                        break
+                    if self._is_editable_column(column):
+                        cells.append((row, column, value))
+        self.apply_cells(cells)
+
+    def apply_value_to_selected_rows(self):
+        """
+        入力した値を、選択されたすべての行の現在のカラムに設定します。
+
+        Returns:
+            None
+        """
+        column = self.currentColumn()
+        if not self._is_editable_column(column):
+            return
+        selected_rows = self._selected_rows()
+        if not selected_rows:
+            return
+
+        name = self.__class__.__name__
+        item = self.currentItem()
+        text, ok = QInputDialog.getText(
+            self,
+            self.tr.tr(name, "Bulk edit"),
+            self.columns_tr_keys[column],
+            text=item.text() if item is not None else "",
+        )
+        if not ok:
+            return
+        self.apply_cells([(row, column, text) for row in selected_rows])
+
+    def normalize_selected_titles(self):
+        """
+        選択された行のタイトルを正規化します。
+
+        まず書き込みを行わずに正規化し、変更内容の差分を確認してから書き込みます。
+
+        Returns:
+            None
+        """
+        name = self.__class__.__name__
+        title_column = self.columns_keys.index("title")
+        id_to_row = {}
+        items = []
+        for row in self._selected_rows():
+            id_item = self.item(row, 0)
+            title_item = self.item(row, title_column)
+            if id_item is None or title_item is None:
+                continue
+            db_id = int(id_item.text())
+            id_to_row[db_id] = row
+            items.append([db_id, title_item.text()])
+        if not items:
+            return
+
+        plugin = NormalizeTitle(items, dry_run=True)
+        plugin.exec()
+        if plugin.was_canceled or not plugin.changes:
+            return
+
+        # 変更内容を確認
+        box = QMessageBox(self)
+        box.setWindowTitle(self.tr.tr(name, "Normalize titles"))
+        box.setText(
+            f"{len(plugin.changes)} "
+            + self.tr.tr(name, "titles will be changed. Apply?")
+        )
+        box.setDetailedText(plugin.normalizer.format_diff(plugin.changes))
+        box.setStandardButtons(
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        if box.exec() != QMessageBox.StandardButton.Yes:
+            return
+
+        self.apply_cells(
+            [
+                (id_to_row[db_id], title_column, new_title)
+                for db_id, _, new_title in plugin.changes
+            ]
+        )
+
+    def auto_tag(self):
+        """
+        ファイル名とタイトルから分類カラム、品番、JANコードの空の値を推定します。
+
+        行が選択されている場合は選択された行、それ以外はライブラリ内の
+        すべての行が対象です。推定した値を確認してから書き込みます。
+
+        Returns:
+            None
+        """
+        name = self.__class__.__name__
+        try:
+            plugin = AutoTag(self._selected_ids() or None, dry_run=True)
+        except ValueError:
+            return
+        plugin.exec()
+        if plugin.was_canceled:
+            return
+        if not plugin.suggestions:
+            QMessageBox.information(
+                self,
+                self.tr.tr(name, "Auto-tag"),
+                self.tr.tr(name, "No values were found."),
+            )
+            return
+
+        # 推定した値を確認
+        box = QMessageBox(self)
+        box.setWindowTitle(self.tr.tr(name, "Auto-tag"))
+        box.setText(
+            f"{len(plugin.suggestions)} "
+            + self.tr.tr(name, "values will be filled. Apply?")
+        )
+        box.setDetailedText(
+            plugin.tagger.format_diff(plugin.suggestions, plugin.titles())
+        )
+        box.setStandardButtons(
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        if box.exec() != QMessageBox.StandardButton.Yes:
+            return
+
+        # 表示されていない行も含めて一括で書き込み、表示中の行に反映する
+        plugin.tagger.apply(self.db, plugin.suggestions)
+        id_to_row = {}
+        for row in range(self.rowCount()):
+            id_item = self.item(row, 0)
+            if id_item is not None:
+                id_to_row[int(id_item.text())] = row
+        self._set_cell_texts(
+            [
+                (id_to_row[db_id], self.columns_keys.index(column), value)
+                for db_id, column, value, _ in plugin.suggestions
+                if db_id in id_to_row and column in self.columns_keys
+            ]
+        )
+
+        logger.info(f"auto-tagged {len(plugin.suggestions)} cells")
+        self.item_changed.emit()
+
+    def find_duplicates(self):
+        """
+        ライブラリ全体から重複候補の動画を探し、一覧を表示します。
+
+        知覚ハッシュが未計算の動画がある場合は先に計算します。
+
+        Returns:
+            None
+        """
+        name = self.__class__.__name__
+        rows = self.db.get_rows_without_perceptual_hash()
+        if rows:
+            plugin = PerceptualHashPlugin(rows)
+            plugin.exec()
+            if plugin.was_canceled:
+                return
+
+        QGuiApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            groups = find_duplicate_groups(self.db.get_perceptual_hashes())
+        finally:
+            QGuiApplication.restoreOverrideCursor()
+        titles = self._get_titles([db_id for ids in groups for db_id in ids])
+
+        box = QMessageBox(self)
+        box.setWindowTitle(self.tr.tr(name, "Find duplicates"))
+        box.setText(
+            f"{len(groups)} " + self.tr.tr(name, "duplicate groups found.")
+        )
+        if groups:
+            box.setDetailedText(format_duplicate_report(groups, titles))
+        box.exec()
+
+    def verify_library(self):
+        """
+        ライブラリに保存したファイルの整合性チェックを要求します。
+
+        チェックはジョブとしてバックグラウンドで実行され、完了すると
+        `show_verify_report` で結果を表示します。
+
+        Returns:
+            None
+        """
+        self.verify_requested.emit()
+
+    def show_verify_report(self, report: dict):
+        """
+        整合性チェックの結果を表示します。
+
+        Args:
+            report (dict): `IntegrityVerifier.finish` が返す辞書。
+
+        Returns:
+            None
+        """
+        name = self.__class__.__name__
+        tr = Translate()
+        titles = self._get_titles(
+            report["corrupted"] + report["missing"] + report["unreadable"]
+        )
+        box = QMessageBox(self)
+        box.setWindowTitle(tr.tr(name, "Verify library"))
+        box.setText(
+            "\n".join(
+                [
+                    f"{tr.tr(name, 'Checked')}: {report['checked']}",
+                    f"{tr.tr(name, 'Corrupted')}: "
+                    f"{len(report['corrupted'])}",
+                    f"{tr.tr(name, 'Missing')}: {len(report['missing'])}",
+                    f"{tr.tr(name, 'Unreadable')}: "
+                    f"{len(report['unreadable'])}",
+                    f"{tr.tr(name, 'Orphaned')}: "
+                    f"{len(report['orphaned'])}",
+                ]
+            )
+        )
+        detail = format_verify_report(report, titles)
+        if detail:
+            box.setDetailedText(detail)
+        box.exec()
+
+    def request_proxy(self):
+        """
+        選択された行のプロキシ動画の作成を要求します。
+
+        Returns:
+            None
+        """
+        ids = self._selected_ids()
+        if ids:
+            self.proxy_requested.emit(ids)
+
+    def request_thumbnail(self):
+        """
+        選択された行のキャプチャ画像の作成し直しを要求します。
+
+        Returns:
+            None
+        """
+        ids = self._selected_ids()
+        if ids:
+            self.thumbnail_requested.emit(ids)
+
+    def _selected_ids(self) -> list:
+        """
+        選択された行のIDを取得します。
+
+        Returns:
+            list: IDのリスト。
+        """
+        ids = []
+        for row in self._selected_rows():
+            id_item = self.item(row, 0)
+            if id_item is not None:
+                ids.append(int(id_item.text()))
+        return ids
+
+    def _get_titles(self, ids: list) -> dict:
+        """
+        指定されたIDのタイトルを取得します。
+
+        Args:
+            ids (list): IDのリスト。
+
+        Returns:
+            dict: IDをキー、タイトルを値とする辞書。
+        """
+        titles = {}
+        for db_id in ids:
+            data = self.db.get_data(db_id)
+            if data is not None:
+                titles[db_id] = data.get("title", "")
+        return titles
+
+    def apply_cells(self, cells: list):
+        """
+        複数のセルの値をデータベースに1つのトランザクションで書き込み、表示に反映します。
+
+        変更の通知は全セルの書き込み後に1回だけ発信します。
+
+        Args:
+            cells (list): 変更するセルの `(row, column, text)` のリスト。
+
+        Returns:
+            None
+        """
+        db_cells = []
+        for row, column, text in cells:
+            id_item = self.item(row, 0)
+            if id_item is None:
+                continue
+            db_cells.append(
+                (int(id_item.text()), self.columns_keys[column], text)
+            )
+        if not db_cells:
+            return
+        self.db.update_cells(db_cells)
+        self._set_cell_texts(cells)
+
+        logger.info(f"bulk edit {len(db_cells)} cells")
+        self.item_changed.emit()
+
+    def _set_cell_texts(self, cells: list):
+        """
+        データベースに書き込まずにセルの表示を書き換えます。
+
+        Args:
+            cells (list): 変更するセルの `(row, column, text)` のリスト。
+
+        Returns:
+            None
+        """
+        # 書き換え中に行が並べ替えられないようソートを一時的に無効化する
+        self.blockSignals(True)
+        sorting = self.isSortingEnabled()
+        self.setSortingEnabled(False)
+        for row, column, text in cells:
+            item = self.item(row, column)
+            if item is None:
+                self.setItem(row, column, QTableWidgetItem(text))
+            else:
+                item.setText(text)
+        self.setSortingEnabled(sorting)
+        self.blockSignals(False)
+
+    def _selected_rows(self) -> list[int]:
+        """
+        選択されている行番号のリストを取得します。
+
+        Returns:
+            list[int]: 昇順に並べた行番号のリスト。
+        """
+        return sorted({index.row() for index in self.selectedIndexes()})
+
+    def _is_editable_column(self, column: int) -> bool:
+        """
+        指定した列が編集可能かを確認します。
+
+        Args:
+            column (int): 列番号。
+
+        Returns:
+            bool: 編集可能な場合はTrue。
+        """
+        if column < 0 or column >= len(self.columns_keys):
+            return False
+        _, edit = self.table_widget_columns[self.columns_keys[column]]
+        return edit
+
     def on_selection_changed(self):
         """
         アイテムが選択されたときに呼び出されるスロット。
@@ -160,6 +680,7 @@ class PirararaTableWidget(QTableWidget):
                 self.item_selected.emit(db_id)
             break
 
+    @timed("gui.get_form_db")
     def get_form_db(
         self, column: str | None = None, keyword: str | None = None
     ):
@@ -173,6 +694,9 @@ class PirararaTableWidget(QTableWidget):
         Returns:
             None
         """
+        # 実行中の検索があれば結果を破棄する
+        self.cancel_search()
+
         self.blockSignals(True)
         self.clearContents()
         self.setRowCount(0)
@@ -184,10 +708,128 @@ class PirararaTableWidget(QTableWidget):
         else:
             data = self.db.get_all_data()
 
-        for row_index, d_item in enumerate(data):
+        self._append_rows(data)
+        self.resizeColumnsToContents()
+        self.blockSignals(False)
+
+    def search_form_db(
+        self, column: str | None = None, keyword: str | None = None
+    ):
+        """
+        データベースの検索をワーカースレッドで実行し、結果をページ単位でテーブルに表示します。
+
+        実行中の古い検索は中断され、その結果は破棄されます。
+
+        Args:
+            column (str | None, optional): 検索対象のカラム名。デフォルトはNone。
+            keyword (str | None, optional): 検索キーワード。デフォルトはNone。
+
+        Returns:
+            None
+        """
+        self.cancel_search()
+
+        self._search_generation += 1
+        self._search_pending_clear = True
+        thread = PirararaSearchThread(
+            self._search_generation, column, keyword, self
+        )
+        thread.page_loaded.connect(self.on_page_loaded)
+        thread.search_finished.connect(self.on_search_finished)
+        thread.finished.connect(lambda: self._on_thread_finished(thread))
+        self._search_threads.append(thread)
+        thread.start()
+
+    def cancel_search(self, wait: bool = False):
+        """
+        実行中の検索を中断します。
+
+        Args:
+            wait (bool, optional): スレッドの終了を待つ場合はTrue。デフォルトはFalse。
+
+        Returns:
+            None
+        """
+        # 以降に届く古い検索結果は世代の不一致で破棄される
+        self._search_generation += 1
+        for thread in self._search_threads:
+            thread.cancel()
+            if wait:
+                thread.wait()
+
+    def on_page_loaded(self, generation: int, rows: list):
+        """
+        検索結果の1ページ分を受け取ったときに呼び出されるスロット。
+
+        Args:
+            generation (int): 検索世代。
+            rows (list): 検索結果のレコードのリスト。
+
+        Returns:
+            None
+        """
+        if generation != self._search_generation:
+            return
+        self.blockSignals(True)
+        if self._search_pending_clear:
+            self._search_pending_clear = False
+            self.clearContents()
+            self.setRowCount(0)
+        self._append_rows(rows)
+        self.blockSignals(False)
+
+    def on_search_finished(self, generation: int):
+        """
+        検索が完了したときに呼び出されるスロット。
+
+        Args:
+            generation (int): 検索世代。
+
+        Returns:
+            None
+        """
+        if generation != self._search_generation:
+            return
+        if self._search_pending_clear:
+            # 該当データなし
+            self.on_page_loaded(generation, [])
+        self.resizeColumnsToContents()
+
+    def _on_thread_finished(self, thread: PirararaSearchThread):
+        """
+        検索スレッドの終了時に参照を解放します。
+
+        Args:
+            thread (PirararaSearchThread): 終了したスレッド。
+
+        Returns:
+            None
+        """
+        if thread in self._search_threads:
+            self._search_threads.remove(thread)
+        thread.deleteLater()
+
+    def _append_rows(self, data: list | None):
+        """
+        レコードのリストをテーブルの末尾に追加します。
+
+        Args:
+            data (list | None): データベースから取得したレコードのリスト。
+
+        Returns:
+            None
+        """
+        if not data:
+            return
+
+        # 行追加中にソートが走らないよう一時的に無効化する
+        sorting = self.isSortingEnabled()
+        self.setSortingEnabled(False)
+        for d_item in data:
             deletion_mark = d_item.get("deletion_mark", "0")
             if deletion_mark == "1":
                 continue
+            row_index = self.rowCount()
             self.setRowCount(row_index + 1)
             for column_index, (column, items) in enumerate(
                 self.table_widget_columns.items()
@@ -212,8 +854,7 @@ class PirararaTableWidget(QTableWidget):
                         cell_data.flags() & ~Qt.ItemFlag.ItemIsEditable
                     )
                 self.setItem(row_index, column_index, cell_data)
-        self.resizeColumnsToContents()
-        self.blockSignals(False)
+        self.setSortingEnabled(sorting)
 
     def delete_selected_items(self):
         """
@@ -0,0 +1,255 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+from pkg.config import AppConfig
+from pkg.metadata import ImagePack
+from pkg.metrics import track
+from PySide6.QtCore import (
+    QBuffer,
+    QByteArray,
+    QIODevice,
+    QObject,
+    QRunnable,
+    QSize,
+    Qt,
+    QThreadPool,
+    Signal,
+)
+from PySide6.QtGui import QImage, QImageReader, QImageWriter
+
+logger = logging.getLogger(__name__)
+
+
+class _ThumbnailWorker(QRunnable):
+    """
+    キューに積まれたサムネイルを順に生成するワーカー。
+
+    キューが空になるまで、最後に要求されたもの（表示中のもの）から処理します。
+    """
+
+    def __init__(self, cache: "ThumbnailCache"):
+        super().__init__()
+        self.cache = cache
+
+    def run(self):
+        while (request := self.cache._take_request()) is not None:
+            media_id, size, source_path = request
+            try:
+                image = self.cache._load(media_id, size, source_path)
+            except Exception as e:
+                logger.error(f"Error creating thumbnail id{media_id}: {e}")
+                image = QImage()
+            self.cache._finish_request(media_id, size, image)
+
+
+class ThumbnailCache(QObject):
+    """
+    複数解像度のサムネイルをディスクにキャッシュするクラス。
+
+    サムネイルはキャプチャ画像から要求された時点でワーカースレッドで生成し、
+    `<cache_dir>/thumbnails` のパックファイル（`ImagePack`）に保存します。
+    サムネイルごとのファイルを作らないため、大量の項目を表示しても
+    ファイルのオープンやメタデータの問い合わせは発生しません。
+    大きいサイズのキャッシュがある場合はそこから縮小するため、元画像の読み込みは
+    解像度ごとに繰り返しません。画像の読み込みは `QImageReader` で縮小しながら
+    デコードするため、元の解像度の画像はメモリに展開しません。
+    """
+
+    # サムネイルが用意できたときに発信されるシグナル。ID、サイズ、画像を渡します。
+    thumbnail_ready = Signal(int, int, QImage)
+
+    # キャッシュするサムネイルのサイズ（長辺のピクセル数）。
+    SIZES = (128, 256, 512)
+    # 保存するJPEGの品質。
+    JPEG_QUALITY = 85
+
+    def __init__(self, cache_dir: str | None = None, parent=None):
+        """
+        コンストラクタ。
+
+        Args:
+            cache_dir (str | None, optional): キャッシュディレクトリ。
+                指定がない場合は設定ファイルのキャッシュディレクトリを使用する。
+            parent (QObject, optional): 親オブジェクト。デフォルトはNone。
+        """
+        super().__init__(parent)
+        if cache_dir is None:
+            cache_dir = AppConfig().get_cache_dir()
+        self.cache_dir = os.path.join(cache_dir, "thumbnails")
+        self.pack = ImagePack(self.cache_dir)
+
+        self._lock = threading.Lock()
+        # 未処理の要求（後から要求したものほど末尾）
+        self._queue: OrderedDict = OrderedDict()
+        # 処理中の要求
+        self._running: set = set()
+        self._workers = 0
+
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max(1, (os.cpu_count() or 2) // 2))
+
+        # 削除や再作成で未使用となった領域が多い場合は詰め直す
+        if self.pack.needs_compaction():
+            self.pool.start(self.pack.compact)
+
+    @classmethod
+    def fit_size(cls, size: int) -> int:
+        """
+        表示サイズ以上で最小のキャッシュサイズを求めます。
+
+        Args:
+            size (int): 表示サイズ（ピクセル）。
+
+        Returns:
+            int: キャッシュサイズ。
+        """
+        for cache_size in cls.SIZES:
+            if cache_size >= size:
+                return cache_size
+        return cls.SIZES[-1]
+
+    def name(self, size: int) -> str:
+        """
+        パックファイルに格納するサムネイルの名前を求めます。
+
+        Args:
+            size (int): キャッシュサイズ。
+
+        Returns:
+            str: 名前。
+        """
+        return f"thumbnail{size}"
+
+    def request(self, media_id: int, size: int, source_path: str) -> None:
+        """
+        サムネイルを要求します。用意できると `thumbnail_ready` を発信します。
+
+        既に要求済みの場合は優先順位を最も高くします。
+
+        Args:
+            media_id (int): ID。
+            size (int): キャッシュサイズ。
+            source_path (str): 元画像のパス。
+        """
+        key = (media_id, size)
+        with self._lock:
+            if key in self._running:
+                return
+            self._queue[key] = source_path
+            self._queue.move_to_end(key)
+            start_worker = self._workers < self.pool.maxThreadCount()
+            if start_worker:
+                self._workers += 1
+        if start_worker:
+            self.pool.start(_ThumbnailWorker(self))
+
+    def retain(self, keys: set) -> None:
+        """
+        指定された要求以外の未処理の要求を破棄します。
+
+        スクロールで表示範囲外となったサムネイルを生成しないために使用します。
+
+        Args:
+            keys (set): 残す `(ID, サイズ)` の集合。
+        """
+        with self._lock:
+            for key in [k for k in self._queue if k not in keys]:
+                del self._queue[key]
+
+    def clear_requests(self) -> None:
+        """
+        未処理の要求をすべて破棄します。
+        """
+        with self._lock:
+            self._queue.clear()
+
+    def _take_request(self) -> tuple | None:
+        with self._lock:
+            if not self._queue:
+                self._workers -= 1
+                return None
+            (media_id, size), source_path = self._queue.popitem(last=True)
+            self._running.add((media_id, size))
+        return media_id, size, source_path
+
+    def _finish_request(self, media_id: int, size: int, image: QImage):
+        with self._lock:
+            self._running.discard((media_id, size))
+        self.thumbnail_ready.emit(media_id, size, image)
+
+    def _load(self, media_id: int, size: int, source_path: str) -> QImage:
+        """
+        サムネイルを読み込みます。キャッシュがない場合は生成して保存します。
+
+        Args:
+            media_id (int): ID。
+            size (int): キャッシュサイズ。
+            source_path (str): 元画像のパス。
+
+        Returns:
+            QImage: サムネイル。元画像がない場合は空の画像。
+        """
+        try:
+            source_mtime = os.stat(source_path).st_mtime
+        except OSError:
+            return QImage()
+
+        data = self.pack.get(media_id, self.name(size), source_mtime)
+        if data is not None:
+            # PySide6の `QImage.fromData` は `memoryview` を受け付けないため
+            # 圧縮されたデータのみをコピーして渡す
+            return QImage.fromData(bytes(data))
+
+        with track("thumbnail.create"):
+            # 大きいサイズのキャッシュがあればそこから縮小する
+            image = QImage()
+            for larger in self.__class__.SIZES:
+                if larger > size:
+                    data = self.pack.get(
+                        media_id, self.name(larger), source_mtime
+                    )
+                    if data is not None:
+                        image = QImage.fromData(bytes(data)).scaled(
+                            size,
+                            size,
+                            Qt.AspectRatioMode.KeepAspectRatio,
+                            Qt.TransformationMode.SmoothTransformation,
+                        )
+                        break
+
+            if image.isNull():
+                reader = QImageReader(source_path)
+                original = reader.size()
+                if original.isValid() and (
+                    original.width() > size or original.height() > size
+                ):
+                    # デコード時に縮小する（JPEGは縮小した解像度で復号される）
+                    reader.setScaledSize(
+                        original.scaled(
+                            QSize(size, size),
+                            Qt.AspectRatioMode.KeepAspectRatio,
+                        )
+                    )
+                image = reader.read()
+                if image.isNull():
+                    return image
+
+            byte_array = QByteArray()
+            buffer = QBuffer(byte_array)
+            buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+            # `QImage.save` の形式は実行時に文字列しか受け付けないため
+            # 形式をバイト列で指定できる `QImageWriter` で書き込む
+            writer = QImageWriter(buffer, QByteArray(b"jpg"))
+            writer.setQuality(self.__class__.JPEG_QUALITY)
+            if writer.write(image):
+                self.pack.put(
+                    media_id,
+                    self.name(size),
+                    bytes(byte_array.data()),
+                    source_mtime,
+                )
+        return image
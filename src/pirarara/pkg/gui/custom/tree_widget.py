@@ -4,6 +4,7 @@ import logging
 
 from pkg.config import AppConfig
 from pkg.metadata import MetaDataDB
+from pkg.metrics import timed
 from pkg.translation import Translate
 from PySide6.QtCore import Qt, Signal
 from PySide6.QtWidgets import QHeaderView, QTreeWidget, QTreeWidgetItem
@@ -179,7 +180,7 @@ class PirararaTreeWidget(QTreeWidget):
                 index = self.indexOfTopLevelItem(parent_item)
                 signal_parent_text = self.columns[index]
                 column_text = selected_item.text(0)
-            logger.info(f"{signal_parent_text} {column_text}")
+            logger.debug(f"{signal_parent_text} {column_text}")
             self.item_selected.emit(column_text, signal_parent_text)
 
     def on_item_double_clicked(self, item, column):
@@ -198,9 +199,10 @@ class PirararaTreeWidget(QTreeWidget):
         """
         item.setSelected(False)
         # 独自シグナルを発信
-        logger.info(f"on_item_double_clicked: {column}")
+        logger.debug(f"on_item_double_clicked: {column}")
         self.item_selected.emit("", "")
 
+    @timed("gui.refresh_display")
     def refresh_display(self):
         """
         表示内容をリフレッシュする。
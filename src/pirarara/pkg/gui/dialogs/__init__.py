@@ -3,6 +3,7 @@
 
 from .about import AboutDialog
 from .open_file import OpenFileDialog
+from .performance import PerformanceDialog
 from .plugins import PluginsDialog
 from .setting import SettingDialog
 
@@ -11,4 +12,5 @@ __all__ = [
     "SettingDialog",
     "PluginsDialog",
     "AboutDialog",
+    "PerformanceDialog",
 ]
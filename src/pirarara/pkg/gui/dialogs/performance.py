@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import logging
+
+from pkg.config import AppConfig
+from pkg.gui.custom import info_message_box
+from pkg.metrics import Metrics
+from pkg.translation import Translate
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtWidgets import (
+    QDialog,
+    QHBoxLayout,
+    QLabel,
+    QPushButton,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class PerformanceDialog(QDialog):
+    """
+    処理ごとの呼び出し回数と所要時間のパーセンタイルを表示するダイアログクラス。
+
+    表示は一定間隔で更新され、集計結果はログディレクトリにJSONで保存できます。
+    """
+
+    # 表示を更新する間隔（ミリ秒）。
+    REFRESH_INTERVAL_MS = 1000
+    # 表示するカラム（`LatencyHistogram.to_dict` のキー）。
+    COLUMNS = ["count", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"]
+
+    def __init__(self, parent=None):
+        """
+        コンストラクタ。
+
+        Args:
+            parent (QWidget, optional): 親ウィジェット。デフォルトはNone。
+        """
+        super().__init__(parent)
+
+        # アプリケーション構成ファイルアクセスクラス
+        self.app_config = AppConfig()
+
+        # 翻訳クラスを生成
+        self.tr = Translate()
+
+        # 計測クラス
+        self.metrics = Metrics()
+
+        # 画面タイトルの設定
+        self.setWindowTitle(self.tr.tr(self.__class__.__name__, "PERFORMANCE"))
+
+        # ウインドウサイズ
+        self.resize(800, 480)
+
+        # フォントサイズ設定
+        self.setFont(self.app_config.get_app_font())
+
+        # ベースのレイアウト
+        self.formLayout = QVBoxLayout(self)
+
+        # 計測が無効の場合の案内
+        self.status_label = QLabel(self)
+        self.formLayout.addWidget(self.status_label)
+
+        # 集計結果の表
+        self.table = QTableWidget(self)
+        self.table.setColumnCount(len(self.__class__.COLUMNS) + 1)
+        self.table.setHorizontalHeaderLabels(
+            [self.tr.tr(self.__class__.__name__, "name")]
+            + self.__class__.COLUMNS
+        )
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.formLayout.addWidget(self.table)
+
+        # ボタン
+        self.horizontalLayout = QHBoxLayout()
+        self.run_plugins = QPushButton(self)
+        self.run_plugins.setText(
+            self.tr.tr(self.__class__.__name__, "Run plugins")
+        )
+        self.horizontalLayout.addWidget(self.run_plugins)
+        self.horizontalLayout.addStretch()
+        self.reset_button = QPushButton(self)
+        self.reset_button.setText(self.tr.tr(self.__class__.__name__, "Reset"))
+        self.horizontalLayout.addWidget(self.reset_button)
+        self.dump_button = QPushButton(self)
+        self.dump_button.setText(
+            self.tr.tr(self.__class__.__name__, "Save JSON")
+        )
+        self.horizontalLayout.addWidget(self.dump_button)
+        self.close_button = QPushButton(self)
+        self.close_button.setText(self.tr.tr(self.__class__.__name__, "close"))
+        self.horizontalLayout.addWidget(self.close_button)
+        self.formLayout.addLayout(self.horizontalLayout)
+
+        # 表示の定期更新
+        self.timer = QTimer(self)
+        self.timer.setInterval(self.__class__.REFRESH_INTERVAL_MS)
+        self.timer.timeout.connect(self.refresh)
+
+        # シグナルにスロット割当
+        self.reset_button.clicked.connect(self.reset_clicked)
+        self.dump_button.clicked.connect(self.dump_clicked)
+        self.close_button.clicked.connect(self.close)
+
+        self.refresh()
+        self.timer.start()
+
+    def refresh(self):
+        """
+        集計結果の表示を更新します。
+        """
+        if self.metrics.enabled:
+            self.status_label.hide()
+        else:
+            self.status_label.setText(
+                self.tr.tr(self.__class__.__name__, "Metrics are disabled.")
+            )
+            self.status_label.show()
+
+        snapshot = self.metrics.snapshot()
+        self.table.setRowCount(len(snapshot))
+        for row, (name, values) in enumerate(snapshot.items()):
+            self.table.setItem(row, 0, QTableWidgetItem(name))
+            for column, key in enumerate(self.__class__.COLUMNS, 1):
+                item = QTableWidgetItem(str(values.get(key, "")))
+                item.setTextAlignment(
+                    Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+                )
+                self.table.setItem(row, column, item)
+        self.table.resizeColumnsToContents()
+
+    def reset_clicked(self):
+        """
+        集計結果を破棄します。
+        """
+        self.metrics.reset()
+        self.refresh()
+
+    def dump_clicked(self):
+        """
+        集計結果をログディレクトリにJSONで保存します。
+        """
+        file_path = self.metrics.dump(self.app_config.get_log_dir())
+        logger.info(f"metrics saved: {file_path}")
+        info_message_box(
+            self.tr.tr(self.__class__.__name__, "Saved.") + f"\n{file_path}",
+            self,
+        )
+
+    def done(self, result: int):
+        self.timer.stop()
+        super().done(result)
+
+    def closeEvent(self, event):
+        self.timer.stop()
+        super().closeEvent(event)
@@ -12,6 +12,7 @@ from pkg.gui.custom import (
     info_message_box,
     question_message_box,
 )
+from pkg.gui.plugins import ExternalPlugins
 from pkg.translation import Translate
 from PySide6.QtCore import Qt
 from PySide6.QtWidgets import (
@@ -202,3 +203,5 @@ class PluginsDialog(QDialog):
         self.plugins_list.clear()
         for item in sorted_directories:
             self.plugins_list.addItem(os.path.basename(item))
+        # プラグインのマニフェストを更新
+        ExternalPlugins().rescan()
@@ -7,30 +7,37 @@ from pkg.config import AppConfig
 from pkg.const import __appname__, __version__
 from pkg.gui.custom import (
     PirararaComboBox,
+    PirararaGalleryView,
+    JobQueue,
     PirararaImageViewer,
+    PirararaJobMonitor,
     PirararaTableWidget,
     PirararaToolButton,
     PirararaTreeWidget,
+    ProxyQueue,
 )
 from pkg.gui.dialogs import (
     AboutDialog,
     OpenFileDialog,
+    PerformanceDialog,
     PluginsDialog,
     SettingDialog,
 )
 from pkg.gui.plugins import (
     ExternalPlugins,
-    ImportFilePlugin,
+    ExternalProcessPlugin,
     PirararaBasePlugin,
 )
 from pkg.translation import Translate
-from PySide6.QtCore import QRect, QSize, Qt
+from pkg.metadata.jobs import JOB_IMPORT, JOB_THUMBNAIL
+from PySide6.QtCore import QRect, QSize, Qt, QTimer
 from PySide6.QtWidgets import (
     QMainWindow,
     QMenuBar,
     QMessageBox,
     QPlainTextEdit,
     QSplitter,
+    QStackedWidget,
     QStatusBar,
     QToolBar,
     QVBoxLayout,
@@ -63,6 +70,8 @@ class MWindow(QMainWindow):
         plainTextEdit (QPlainTextEdit): プレインテキストエディット。
         menubar (QMenuBar): メニューバー。
         statusbar (QStatusBar): ステータスバー。
+        job_queue (JobQueue): インポートなどの長時間の処理のジョブのキュー。
+        job_monitor (PirararaJobMonitor): ジョブの実行状況のドックウィジェット。
     """
 
     def __init__(self):
@@ -104,6 +113,11 @@ class MWindow(QMainWindow):
                 "import.svg",
                 self.show_import_file_dialog,
             ),
+            (
+                self.tr.tr(self.__class__.__name__, "GALLERY"),
+                "gallery.svg",
+                self.toggle_gallery,
+            ),
             ("|", "", None),
             (
                 self.tr.tr(self.__class__.__name__, "SETTING"),
@@ -156,9 +170,19 @@ class MWindow(QMainWindow):
         self.treeWidget = PirararaTreeWidget(self.splitter_1)
         self.splitter_1.addWidget(self.treeWidget)
 
+        # テーブルウィジェットとギャラリービューを切り替えて表示する
+        self.viewStack = QStackedWidget(self.splitter_1)
+        self.splitter_1.addWidget(self.viewStack)
+
         # テーブルウィジェット
-        self.tableWidget = PirararaTableWidget(self.splitter_1)
-        self.splitter_1.addWidget(self.tableWidget)
+        self.tableWidget = PirararaTableWidget(self.viewStack)
+        self.viewStack.addWidget(self.tableWidget)
+
+        # ギャラリービュー
+        self.galleryView = PirararaGalleryView(self.viewStack)
+        self.viewStack.addWidget(self.galleryView)
+        # 表示中の絞り込み条件（ギャラリービューの表示に使用）
+        self._view_filter: tuple = ("", "")
 
         # スプリッター
         self.splitter_2 = QSplitter(self.splitter_1)
@@ -185,11 +209,65 @@ class MWindow(QMainWindow):
         self.statusbar = QStatusBar(self)
         self.setStatusBar(self.statusbar)
 
+        # インポート、サムネイル作成、整合性チェックのジョブのキュー
+        self.job_queue = JobQueue(self)
+        self.job_queue.job_finished.connect(self.on_job_finished)
+        self.job_queue.verify_finished.connect(
+            self.tableWidget.show_verify_report
+        )
+        # インポートしたID（表示の更新時にまとめて処理する）
+        self._imported_ids: list = []
+        # ジョブの完了が続く間は表示の更新をまとめる
+        self._job_refresh_timer = QTimer(self)
+        self._job_refresh_timer.setSingleShot(True)
+        self._job_refresh_timer.setInterval(1000)
+        self._job_refresh_timer.timeout.connect(self.on_jobs_refreshed)
+
+        # ジョブの実行状況（モーダルではないドックウィジェット）
+        self.job_monitor = PirararaJobMonitor(self.job_queue, self)
+        self.addDockWidget(
+            Qt.DockWidgetArea.BottomDockWidgetArea, self.job_monitor
+        )
+        self.job_monitor.hide()
+
+        # ジョブのメニュー
+        name = self.__class__.__name__
+        self.job_menu = self.menubar.addMenu(self.tr.tr(name, "JOBS"))
+        job_monitor_action = self.job_monitor.toggleViewAction()
+        job_monitor_action.setText(self.tr.tr(name, "Show job monitor"))
+        self.job_menu.addAction(job_monitor_action)
+        self.pause_jobs_action = self.job_menu.addAction(
+            self.tr.tr(name, "Pause jobs")
+        )
+        self.pause_jobs_action.setCheckable(True)
+        self.pause_jobs_action.toggled.connect(self.toggle_jobs_pause)
+
+        # プロキシ動画の作成キュー
+        self.proxy_queue = ProxyQueue(self)
+        self.proxy_queue.job_started.connect(self.on_proxy_job_started)
+        self.proxy_queue.job_finished.connect(self.on_proxy_job_finished)
+        self.proxy_queue.idle.connect(self.statusbar.clearMessage)
+
+        # プロキシ動画のメニュー
+        self.proxy_menu = self.menubar.addMenu(self.tr.tr(name, "PROXY"))
+        create_proxies_action = self.proxy_menu.addAction(
+            self.tr.tr(name, "Create proxies for all videos")
+        )
+        create_proxies_action.triggered.connect(
+            self.proxy_queue.enqueue_missing
+        )
+        self.pause_proxy_action = self.proxy_menu.addAction(
+            self.tr.tr(name, "Pause proxy generation")
+        )
+        self.pause_proxy_action.setCheckable(True)
+        self.pause_proxy_action.toggled.connect(self.toggle_proxy_pause)
+
         # ウインドウ位置、サイズなどを設定
         self._setup()
 
         # コンボボックスのシグナルにスロットを割り当て
         self.comboBox.item_edited.connect(self.on_combo_box_editing)
+        self.comboBox.text_searched.connect(self.on_combo_box_editing)
 
         # ツリーウィジェットのシグナルにスロットを割り当て
         self.treeWidget.item_selected.connect(
@@ -203,6 +281,23 @@ class MWindow(QMainWindow):
         self.tableWidget.item_changed.connect(
             self.on_table_widget_item_changed
         )
+        self.tableWidget.proxy_requested.connect(self.on_proxy_requested)
+        self.tableWidget.thumbnail_requested.connect(
+            self.on_thumbnail_requested
+        )
+        self.tableWidget.verify_requested.connect(self.on_verify_requested)
+
+        # ギャラリービューのシグナルにスロットを割り当て
+        self.galleryView.item_selected.connect(
+            self.on_table_widget_item_selected
+        )
+
+        # スプライトシートがない項目をバックグラウンドで作成
+        self.graphicsView.sprite_queue.enqueue_missing()
+        # 前回の終了時に残ったプロキシ動画の作成を再開
+        self.proxy_queue.start()
+        # 前回の終了時に残ったジョブの実行を再開
+        self.job_queue.start()
 
     def _setup(self):
         """
@@ -259,6 +354,14 @@ class MWindow(QMainWindow):
             self.app_config.q_bytearray_to_str(self.splitter_2.saveState())
         )
         self.app_config.write_config()
+        # 実行中の検索を中断
+        self.tableWidget.cancel_search(wait=True)
+        # 未作成のスプライトシートを破棄
+        self.graphicsView.sprite_queue.clear()
+        # 作成中のプロキシ動画は次回の起動時に作成する
+        self.proxy_queue.stop()
+        # 実行中のジョブは次回の起動時に実行する
+        self.job_queue.stop()
         super().closeEvent(event)
 
     def keyPressEvent(self, event):
@@ -288,19 +391,91 @@ class MWindow(QMainWindow):
             self.graphicsView.clear_image()
             self.treeWidget.refresh_display()
             self.tableWidget.get_form_db("", "")
+            self.refresh_gallery("", "")
 
     def show_import_file_dialog(self):
         """
-        ファイルインポートダイアログを表示し、選択されたファイルを処理する。
+        ファイルインポートダイアログを表示し、選択されたファイルのインポートを
+        ジョブとして登録する。
+
+        インポートはバックグラウンドで実行され、進捗はジョブの実行状況に
+        表示されます。
         """
         dialog = OpenFileDialog(self)
         selected_files = dialog.get_selected_file()
 
         if len(selected_files) != 0:
-            plugin = ImportFilePlugin(selected_files)
-            plugin.exec()
-            self.treeWidget.refresh_display()
-            self.tableWidget.get_form_db("", "")
+            count = self.job_queue.import_files(selected_files)
+            logger.info(f"{count} files were queued for import")
+            self.job_monitor.show()
+
+    def on_job_finished(self, job_id: int, job_type: str, result):
+        """
+        ジョブの終了時に処理を実行する。
+
+        インポートやサムネイルの作成が終わった場合は表示の更新を予約します。
+
+        Args:
+            job_id (int): ジョブID。
+            job_type (str): ジョブの種類。
+            result (Any): 処理結果。失敗した場合はNone。
+        """
+        if not result:
+            return
+        if job_type == JOB_IMPORT:
+            if result.get("media_id"):
+                self._imported_ids.append(result["media_id"])
+                self._job_refresh_timer.start()
+        elif job_type == JOB_THUMBNAIL:
+            self._job_refresh_timer.start()
+
+    def on_jobs_refreshed(self):
+        """
+        ジョブの結果を表示に反映し、インポートした項目の後処理を登録する。
+        """
+        imported_ids, self._imported_ids = self._imported_ids, []
+        if not imported_ids:
+            # キャプチャ画像だけが変わった場合は表示中の条件のまま更新する
+            self.refresh_gallery(*self._view_filter)
+            return
+        self.treeWidget.refresh_display()
+        self.tableWidget.get_form_db("", "")
+        self.refresh_gallery("", "")
+        # スクラブ用のスプライトシートをバックグラウンドで作成
+        self.graphicsView.sprite_queue.enqueue(imported_ids)
+        # プレビュー用のプロキシ動画をバックグラウンドで作成
+        if self.app_config.is_proxy_enabled():
+            self.proxy_queue.enqueue(imported_ids)
+
+    def on_thumbnail_requested(self, ids: list):
+        """
+        選択された項目のキャプチャ画像の作成し直しをジョブとして登録する。
+
+        Args:
+            ids (list): IDのリスト。
+        """
+        self.job_queue.create_thumbnails(ids)
+
+    def on_verify_requested(self):
+        """
+        ライブラリの整合性チェックをジョブとして登録する。
+
+        結果は完了時にテーブルウィジェットが表示します。
+        """
+        self.job_queue.verify_library()
+        self.job_monitor.show()
+
+    def toggle_jobs_pause(self, paused: bool):
+        """
+        ジョブの実行を一時停止または再開する。
+
+        Args:
+            paused (bool): 一時停止する場合はTrue。
+        """
+        if paused:
+            self.job_queue.pause()
+        else:
+            self.job_queue.resume()
 
     def show_setting_dialog(self):
         """
@@ -327,13 +502,17 @@ class MWindow(QMainWindow):
         """
         コンボボックスの編集時に処理を実行する。
 
+        検索はワーカースレッドで実行され、結果は順次テーブルに表示されます。
+
         Args:
             text (str): コンボボックスに入力されたテキスト。
         """
         if len(text) == 0:
-            self.tableWidget.get_form_db("", "")
+            self.tableWidget.search_form_db("", "")
+            self.refresh_gallery("", "")
         else:
-            self.tableWidget.get_form_db("title", text)
+            self.tableWidget.search_form_db("title", text)
+            self.refresh_gallery("title", text)
 
     def on_tree_widget_item_selected(self, column_text: str, parent_text: str):
         """
@@ -344,6 +523,29 @@ class MWindow(QMainWindow):
             parent_text (str): 親ノードのテキスト。
         """
         self.tableWidget.get_form_db(parent_text, column_text)
+        self.refresh_gallery(parent_text, column_text)
+
+    def toggle_gallery(self):
+        """
+        テーブルウィジェットとギャラリービューの表示を切り替える。
+        """
+        if self.viewStack.currentWidget() is self.galleryView:
+            self.viewStack.setCurrentWidget(self.tableWidget)
+        else:
+            self.viewStack.setCurrentWidget(self.galleryView)
+            self.galleryView.load(*self._view_filter)
+
+    def refresh_gallery(self, column: str, keyword: str):
+        """
+        絞り込み条件を記録し、ギャラリービューが表示中であれば表示を更新する。
+
+        Args:
+            column (str): 検索対象のカラム名。
+            keyword (str): 検索キーワード。
+        """
+        self._view_filter = (column, keyword)
+        if self.viewStack.currentWidget() is self.galleryView:
+            self.galleryView.load(column, keyword)
 
     def on_table_widget_item_selected(self, db_id: int):
         """
@@ -360,6 +562,51 @@ class MWindow(QMainWindow):
         """
         self.treeWidget.refresh_display()
 
+    def on_proxy_requested(self, ids: list):
+        """
+        選択された項目のプロキシ動画の作成を優先して登録する。
+
+        Args:
+            ids (list): IDのリスト。
+        """
+        self.proxy_queue.enqueue(ids, ProxyQueue.PRIORITY_USER)
+
+    def on_proxy_job_started(self, db_id: int):
+        """
+        プロキシ動画の作成の開始をステータスバーに表示する。
+
+        Args:
+            db_id (int): ID。
+        """
+        # `self.tr` は `QWidget.tr` を置き換えているため翻訳クラスを直接使用する
+        text = Translate().tr(self.__class__.__name__, "Creating proxy")
+        self.statusbar.showMessage(f"{text}: id{db_id}")
+
+    def on_proxy_job_finished(self, db_id: int, created: bool):
+        """
+        プロキシ動画の作成の結果をログに出力する。
+
+        Args:
+            db_id (int): ID。
+            created (bool): 作成できた場合はTrue。
+        """
+        if created:
+            logger.info(f"proxy created: id{db_id}")
+        else:
+            logger.warning(f"proxy failed: id{db_id}")
+
+    def toggle_proxy_pause(self, paused: bool):
+        """
+        プロキシ動画の作成を一時停止または再開する。
+
+        Args:
+            paused (bool): 一時停止する場合はTrue。
+        """
+        if paused:
+            self.proxy_queue.pause()
+        else:
+            self.proxy_queue.resume()
+
     def show_title_dialog(self):
         """
         Settingダイアログを表示する。
@@ -368,9 +615,36 @@ class MWindow(QMainWindow):
         dialog.exec()
 
     def show_debug_dialog(self):
+        """
+        処理時間の計測結果を表示するPerformanceダイアログを表示する。
+        """
+        dialog = PerformanceDialog(self)
+        dialog.run_plugins.clicked.connect(self.run_external_plugins)
+        dialog.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        dialog.show()
+
+    def run_external_plugins(self):
+        """
+        インストール済の外部プラグインを順に実行する。
+        """
         ext_plugins = ExternalPlugins()
-        plugin = ext_plugins.load_plugins()
-        # プラグインのsetting呼び出し
-        plugin.setting()
-        # プラグインのdo_action呼び出し
-        plugin.do_action()
+        for plugin_name in ext_plugins.plugins_list:
+            entry = ext_plugins.manifest[plugin_name]
+            # ワーカープロセスで実行するプラグインはインポートせずに実行
+            if entry.get("attributes", {}).get("execution") == "process":
+                dialog = ExternalProcessPlugin(
+                    plugin_name, entry, ext_plugins.plugin_dir
+                )
+                dialog.exec()
+                self.treeWidget.refresh_display()
+                continue
+            plugin = ext_plugins.get_plugin(plugin_name)
+            if plugin is None:
+                continue
+            # プラグインのsetting呼び出し
+            plugin.setting()
+            # プラグインのdo_action呼び出し
+            plugin.do_action()
+        # インポートに時間がかかったプラグインを確認
+        for plugin_name, elapsed in ext_plugins.get_import_report():
+            logger.info(f"plugin {plugin_name}: import {elapsed:.1f} ms")
@@ -4,11 +4,17 @@
 from .base import PirararaBasePlugin
 from .external_plugins import ExternalPlugins
 from .import_file import ImportFilePlugin
+from .perceptual_hash import PerceptualHashPlugin
+from .process_plugin import ExternalProcessPlugin
+from .verify_library import VerifyLibraryPlugin
 from .external_plugin_interface import PirararaExternalPluginInterface
 
 __all__ = [
     "PirararaBasePlugin",
     "ImportFilePlugin",
+    "PerceptualHashPlugin",
+    "VerifyLibraryPlugin",
     "ExternalPlugins",
+    "ExternalProcessPlugin",
     "PirararaExternalPluginInterface",
 ]
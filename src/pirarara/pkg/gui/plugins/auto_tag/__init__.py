@@ -0,0 +1,11 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from .plugin import AutoTag
+from .tagger import AhoCorasick, AutoTagger
+
+__all__ = [
+    "AhoCorasick",
+    "AutoTag",
+    "AutoTagger",
+]
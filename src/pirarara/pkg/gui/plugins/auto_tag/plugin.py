@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import logging
+
+from pkg.config import AppConfig
+from pkg.gui.plugins import PirararaBasePlugin
+from pkg.metadata import MetaDataDB
+
+from .tagger import AutoTagger
+
+logger = logging.getLogger(__name__)
+
+
+class AutoTag(PirararaBasePlugin):
+    """
+    ファイル名とタイトルから分類カラムの値を一括で推定するプラグイン。
+
+    辞書のオートマトンは開始時に1回だけ作成し、行を一定数ずつまとめて走査します。
+    推定した値は最後に1つのトランザクションでデータベースに書き込みます。
+    """
+
+    # 1回の処理で走査する行数。
+    CHUNK_SIZE = 2000
+
+    def __init__(
+        self,
+        selected_ids: list | None = None,
+        tagger: AutoTagger | None = None,
+        dry_run: bool = False,
+    ):
+        """
+        コンストラクタ。
+
+        Args:
+            selected_ids (list | None, optional): 対象のIDのリスト。
+                Noneの場合はライブラリ内のすべての行を対象とする。
+            tagger (AutoTagger | None, optional): 推定に使用するクラス。
+                指定がない場合は登録済みの値と設定の正規表現から生成する。
+            dry_run (bool, optional): Trueの場合はデータベースに書き込まず、
+                推定した値を `suggestions` に保持するだけとする。
+        """
+        # 構成情報からDBクラスインスタンスを取得
+        app_config = AppConfig()
+        self.db = MetaDataDB(app_config.get_db_path())
+
+        if selected_ids is not None and not isinstance(selected_ids, list):
+            raise TypeError("The parameters must be list type")
+
+        targets = None if selected_ids is None else set(selected_ids)
+        self.rows = [
+            row
+            for rows in self.db.iter_rows(AutoTagger.columns(), 5000)
+            for row in rows
+            if targets is None or row[0] in targets
+        ]
+        if len(self.rows) == 0:
+            raise ValueError("There are no valid values")
+
+        self.tagger = tagger or AutoTagger.from_db(
+            self.db,
+            app_config.get_autotag_rules(),
+            app_config.get_autotag_min_length(),
+        )
+        self.dry_run = dry_run
+        # 推定した値の (id, カラム, 値, 一致した文字列) のリスト
+        self.suggestions: list = []
+
+        chunk_size = self.__class__.CHUNK_SIZE
+        self.action_counts = (len(self.rows) + chunk_size - 1) // chunk_size
+
+        super().__init__(self.action_counts)
+
+    def titles(self) -> dict:
+        """
+        推定した値がある行のタイトルを取得します。
+
+        Returns:
+            dict: IDをキー、タイトルを値とする辞書。
+        """
+        ids = {suggestion[0] for suggestion in self.suggestions}
+        title_index = AutoTagger.columns().index("title") + 1
+        return {row[0]: row[title_index] for row in self.rows if row[0] in ids}
+
+    def do_action(self):
+        chunk_size = self.__class__.CHUNK_SIZE
+        start = self.current_count * chunk_size
+        chunk = self.rows[start : start + chunk_size]
+        if chunk:
+            self.set_message(str(chunk[0][1]))
+            self.suggestions.extend(self.tagger.suggest(chunk))
+
+        # 最後のまとまりを処理したら一括で書き込む
+        if self.current_count + 1 >= self.action_count:
+            if not self.dry_run and not self.was_canceled and self.suggestions:
+                self.tagger.apply(self.db, self.suggestions)
+                logger.info(f"auto-tagged {len(self.suggestions)} cells")
+
+        super().do_action()
@@ -0,0 +1,375 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import logging
+import re
+import string
+import unicodedata
+from typing import Iterable
+
+from pkg.metadata import MetaDataDB
+
+logger = logging.getLogger(__name__)
+
+
+class AhoCorasick:
+    """
+    複数の語を1回の走査で検索するAho-Corasickオートマトン。
+
+    語の追加後に `build` で失敗遷移を求め、`find` で文字列に含まれる語を
+    すべて求めます。語の数に関わらず、検索時間は文字列の長さと一致数に
+    比例します。
+    """
+
+    def __init__(self):
+        # 状態ごとの遷移（文字 -> 状態）
+        self._goto: list[dict] = [{}]
+        # 状態ごとの失敗遷移
+        self._fail: list[int] = [0]
+        # 状態ごとに一致する語の番号（失敗遷移先の一致も含める）
+        self._out: list[tuple] = [()]
+        # 語の番号ごとの長さ
+        self._lengths: list[int] = []
+
+    def add(self, word: str) -> int:
+        """
+        語を追加します。
+
+        Args:
+            word (str): 語。
+
+        Returns:
+            int: 語の番号。
+        """
+        state = 0
+        for ch in word:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = next_state
+        index = len(self._lengths)
+        self._lengths.append(len(word))
+        self._out[state] += (index,)
+        return index
+
+    def build(self) -> None:
+        """
+        幅優先で失敗遷移を求めます。`add` の後、`find` の前に呼び出すこと。
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        queue = list(goto[0].values())
+        for state in queue:
+            for ch, next_state in goto[state].items():
+                queue.append(next_state)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                f = goto[f].get(ch, 0)
+                fail[next_state] = f
+                if out[f]:
+                    out[next_state] += out[f]
+
+    def find(self, text: str) -> list:
+        """
+        文字列に含まれる語をすべて求めます。
+
+        Args:
+            text (str): 検索する文字列。
+
+        Returns:
+            list: `(開始位置, 終了位置, 語の番号)` のリスト。
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        lengths = self._lengths
+        matches = []
+        state = 0
+        for end, ch in enumerate(text, 1):
+            next_state = goto[state].get(ch)
+            # 遷移できるまで失敗遷移をたどる（根まで戻った場合は根に留まる）
+            while next_state is None:
+                if not state:
+                    next_state = 0
+                    break
+                state = fail[state]
+                next_state = goto[state].get(ch)
+            state = next_state
+            if out[state]:
+                for index in out[state]:
+                    matches.append((end - lengths[index], end, index))
+        return matches
+
+
+class AutoTagger:
+    """
+    ファイル名とタイトルから分類カラムの値を推定するクラス。
+
+    登録済みの分類カラムの値をすべて辞書としてAho-Corasickオートマトンに
+    登録し、各行のファイル名とタイトルを1回ずつ走査して含まれる値を探します。
+    品番とJANコードは設定された正規表現で探します。
+    推定するのは値が空のカラムだけで、既存の値は変更しません。
+
+    Attributes:
+        facets (dict): カラム名をキー、辞書の値のリストを値とする辞書。
+        rules (dict): カラム名をキー、正規表現のリストを値とする辞書。
+    """
+
+    # 辞書で推定するカラム（ツリーウィジェットの分類）。
+    FACET_COLUMNS = (
+        "author",
+        "brand",
+        "category",
+        "club",
+        "company",
+        "publisher",
+    )
+    # 検索対象のカラム。
+    SOURCE_COLUMNS = ("file_name", "title")
+
+    # 既定の正規表現。最初のグループ（ない場合は一致した全体）を値とする。
+    DEFAULT_RULES = {
+        "product_number": (r"(?<![A-Za-z0-9])([A-Za-z]{2,6}-\d{2,5})(?!\d)",),
+        "jancode": (r"(?<!\d)(\d{13}|\d{8})(?!\d)",),
+    }
+
+    # 辞書に登録する値の最小の長さ。短い値は誤検出が多い。
+    DEFAULT_MIN_LENGTH = 2
+
+    # 語の境界を判定する文字（英数字）。
+    WORD_CHARS = frozenset(string.ascii_letters + string.digits)
+
+    def __init__(
+        self,
+        facets: dict,
+        rules: dict | None = None,
+        min_length: int = DEFAULT_MIN_LENGTH,
+    ):
+        """
+        コンストラクタ。
+
+        Args:
+            facets (dict): カラム名をキー、辞書の値のリストを値とする辞書。
+            rules (dict | None, optional): カラム名をキー、ユーザー定義の
+                正規表現のリストを値とする辞書。既定の正規表現より先に使用する。
+            min_length (int, optional): 辞書に登録する値の最小の長さ。
+        """
+        self.facets = facets
+        self.rules = rules or {}
+        self.min_length = min_length
+
+        # 正規化した語 -> 語の番号、語の番号ごとの (カラム, 値) のリスト
+        self._automaton = AhoCorasick()
+        self._entries: list[list] = []
+        word_index: dict[str, int] = {}
+        for column, values in facets.items():
+            for value in values:
+                word = self._normalize(value)
+                if len(word) < min_length:
+                    continue
+                index = word_index.get(word)
+                if index is None:
+                    index = self._automaton.add(word)
+                    word_index[word] = index
+                    self._entries.append([])
+                self._entries[index].append((column, value))
+        self._automaton.build()
+        self.word_count = len(self._entries)
+
+        self._rules = []
+        for column, patterns in self.DEFAULT_RULES.items():
+            for pattern in list(self.rules.get(column, [])) + list(patterns):
+                try:
+                    self._rules.append((column, re.compile(pattern)))
+                except re.error as e:
+                    # 不正な正規表現は使用しない
+                    logger.warning(f"Invalid auto-tag rule {pattern!r}: {e}")
+
+    @classmethod
+    def from_db(
+        cls,
+        db: MetaDataDB,
+        rules: dict | None = None,
+        min_length: int = DEFAULT_MIN_LENGTH,
+    ) -> "AutoTagger":
+        """
+        データベースに登録済みの分類カラムの値から生成します。
+
+        Args:
+            db (MetaDataDB): データベースクラスのインスタンス。
+            rules (dict | None, optional): カラム名をキー、ユーザー定義の
+                正規表現のリストを値とする辞書。
+            min_length (int, optional): 辞書に登録する値の最小の長さ。
+
+        Returns:
+            AutoTagger: 生成したインスタンス。
+        """
+        facets = {
+            column: db.get_distinct_values(column)
+            for column in cls.FACET_COLUMNS
+        }
+        return cls(facets, rules, min_length)
+
+    @classmethod
+    def columns(cls) -> list:
+        """
+        `suggest` に渡す行のカラムを取得します。
+
+        Returns:
+            list: 検索対象のカラムと推定するカラムのリスト。
+        """
+        return (
+            list(cls.SOURCE_COLUMNS)
+            + list(cls.FACET_COLUMNS)
+            + list(cls.DEFAULT_RULES)
+        )
+
+    def suggest(self, rows: Iterable[tuple]) -> list:
+        """
+        値が空のカラムの値を推定します（データベースには書き込みません）。
+
+        Args:
+            rows (Iterable[tuple]): `(id, *columns())` の行。
+
+        Returns:
+            list: `(id, カラム, 推定した値, 一致した文字列)` のリスト。
+        """
+        columns = self.columns()
+        facet_set = set(self.FACET_COLUMNS)
+        normalize = self._normalize
+        find = self._automaton.find
+        entries = self._entries
+        word_chars = self.WORD_CHARS
+
+        suggestions = []
+        for id, *values in rows:
+            row = dict(zip(columns, values))
+            empty = {
+                column
+                for column in columns[len(self.SOURCE_COLUMNS) :]
+                if not row.get(column)
+            }
+            if not empty:
+                continue
+            # 改行を挟んで連結し、ファイル名とタイトルを1回で走査する
+            text = "\n".join(
+                row.get(column) or "" for column in self.SOURCE_COLUMNS
+            )
+
+            if empty & facet_set:
+                normalized = normalize(text)
+                # カラムごとに最も長く一致した値を選ぶ
+                best: dict[str, tuple] = {}
+                for start, end, index in find(normalized):
+                    # 英数字の途中で始まる、または終わる一致は除く
+                    if (
+                        start > 0
+                        and normalized[start - 1] in word_chars
+                        and normalized[start] in word_chars
+                    ) or (
+                        end < len(normalized)
+                        and normalized[end] in word_chars
+                        and normalized[end - 1] in word_chars
+                    ):
+                        continue
+                    for column, value in entries[index]:
+                        if column not in empty:
+                            continue
+                        current = best.get(column)
+                        length = end - start
+                        if current is None or length > current[0]:
+                            best[column] = (length, value, start, end)
+                        elif length == current[0] and value != current[1]:
+                            # 同じ長さで異なる値は判断できない
+                            best[column] = (length, None, start, end)
+                for column, (_, value, start, end) in best.items():
+                    if value is not None:
+                        suggestions.append(
+                            (id, column, value, normalized[start:end])
+                        )
+
+            # 品番とJANコードは全角の英数字も探せるよう互換文字を正規化する
+            text = unicodedata.normalize("NFKC", text)
+            for column, pattern in self._rules:
+                if column not in empty:
+                    continue
+                value = self._match_rule(column, pattern, text)
+                if value is not None:
+                    suggestions.append((id, column, value, value))
+                    # 同じカラムの残りの正規表現は使用しない
+                    empty.discard(column)
+        return suggestions
+
+    def format_diff(self, suggestions: list, titles: dict) -> str:
+        """
+        推定した値を一覧形式の文字列にします。
+
+        Args:
+            suggestions (list): `suggest` が返すリスト。
+            titles (dict): IDをキー、タイトルを値とする辞書。
+
+        Returns:
+            str: 一覧形式の文字列。
+        """
+        lines = []
+        last_id = None
+        for id, column, value, _ in suggestions:
+            if id != last_id:
+                lines.append(f"id{id} {titles.get(id, '')}")
+                last_id = id
+            lines.append(f"+ {column}: {value}")
+        return "\n".join(lines)
+
+    def apply(self, db: MetaDataDB, suggestions: list) -> int:
+        """
+        推定した値をデータベースに1つのトランザクションで書き込みます。
+
+        Args:
+            db (MetaDataDB): データベースクラスのインスタンス。
+            suggestions (list): `suggest` が返すリスト。
+
+        Returns:
+            int: 更新したセル数。
+        """
+        return db.update_cells(
+            [(id, column, value) for id, column, value, _ in suggestions]
+        )
+
+    def _match_rule(
+        self, column: str, pattern: re.Pattern, text: str
+    ) -> str | None:
+        for match in pattern.finditer(text):
+            value = match.group(1) if pattern.groups else match.group(0)
+            if column == "jancode" and not self.is_valid_jancode(value):
+                continue
+            if column == "product_number":
+                value = value.upper()
+            return value
+        return None
+
+    @staticmethod
+    def is_valid_jancode(code: str) -> bool:
+        """
+        JANコード（EAN-13、EAN-8）のチェックデジットを検証します。
+
+        Args:
+            code (str): JANコード。
+
+        Returns:
+            bool: 正しい場合はTrue。
+        """
+        if len(code) not in (8, 13) or not code.isdigit():
+            return False
+        digits = [int(ch) for ch in code]
+        # チェックデジットの左隣から3、1の重みを交互に掛ける
+        total = sum(
+            digit * (3 if i % 2 == 0 else 1)
+            for i, digit in enumerate(reversed(digits[:-1]))
+        )
+        return (10 - total % 10) % 10 == digits[-1]
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        # 全角と半角、大文字と小文字の違いを無視する
+        return unicodedata.normalize("NFKC", text).casefold()
@@ -2,10 +2,12 @@
 # -*- coding: utf-8 -*-
 import gc
 import logging
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
 
 from pkg.config import AppConfig
 from pkg.translation import Translate
-from PySide6.QtCore import Qt, QTimer
+from PySide6.QtCore import Qt, QTimer, Signal
 from PySide6.QtWidgets import (
     QDialog,
     QDialogButtonBox,
@@ -18,7 +20,20 @@ logger = logging.getLogger(__name__)
 
 
 class PirararaBasePlugin(QDialog):
-    def __init__(self, action_count: int, parent=None):
+    """
+    進捗ダイアログを表示しながら処理を繰り返し実行するプラグインの基底クラス。
+
+    1回のタイマ処理の中で、設定された時間（フレームバジェット）に収まるだけ
+    `do_action` を繰り返し呼び出し、進捗表示の更新は一定間隔に間引きます。
+    `offload` を指定した場合は `process_item` をワーカースレッドで実行し、
+    結果をGUIスレッドの `item_processed` に渡します。
+    同時に実行する項目数は `max_in_flight` で指定します。
+    """
+
+    # ワーカースレッドの処理結果をGUIスレッドへ渡すシグナル。
+    _item_processed = Signal(int, object)
+
+    def __init__(self, action_count: int, parent=None, offload: bool = False):
         super().__init__(parent)
 
         # アプリケーション構成ファイルアクセスクラス
@@ -80,15 +95,49 @@ class PirararaBasePlugin(QDialog):
         self.current_count = 0
         self.was_canceled = False
 
+        # 1回のタイマ処理で使用できる時間（秒）
+        self.frame_budget = self.app_config.get_plugin_frame_budget_ms() / 1000
+        # 進捗表示を更新する間隔（秒）
+        self.progress_interval = (
+            self.app_config.get_plugin_progress_interval_ms() / 1000
+        )
+        self._last_progress_time = 0.0
+        self._pending_message: str | None = None
+        self._finished = False
+
+        # ワーカースレッドで処理する場合
+        self.offload = offload
+        # 同時に実行する項目数
+        self.max_in_flight = 1
+        self._next_index = 0
+        self._executor: Executor | None = None
+        if self.offload:
+            self._executor = self._create_executor()
+            self._item_processed.connect(self._on_item_processed)
+
     def _close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
         gc.collect()
         self.close()
 
     def exec(self):
         # シングルショットタイマを実行
-        QTimer.singleShot(1, self.do_action)
+        QTimer.singleShot(1, self._tick)
         super().exec()
 
+    def set_message(self, text: str):
+        """
+        メッセージを設定します。
+
+        表示は進捗表示の更新に合わせて間引かれます。
+
+        Args:
+            text (str): 表示するメッセージ。
+        """
+        self._pending_message = text
+
     def handle_button_clicked(self, button):
         standard_button = self.buttonBox.standardButton(button)
         if standard_button == QDialogButtonBox.StandardButton.Cancel:
@@ -103,16 +152,162 @@ class PirararaBasePlugin(QDialog):
         派生クラスでdo_actionメソッドをオーバーライトして
         self.msg_labelを設定すること。
         """
-        # プログレスバーに値を設定
         self.current_count += 1
-        self.progress_bar.setValue(self.current_count)
+        # プログレスバーに値を設定
+        self._update_progress()
 
-        # 予定処理数に達した？
-        if self.current_count >= self.action_count:
-            self._close()
-        # キャンセルされた？
-        if self.was_canceled:
-            self._close()
+        # 予定処理数に達した？またはキャンセルされた？
+        if self.current_count >= self.action_count or self.was_canceled:
+            self._finish()
 
-        # シングルショットタイマを実行
-        QTimer.singleShot(0, self.do_action)
+    def process_item(self, index: int):
+        """
+        `offload` 指定時にワーカースレッドで実行する処理。派生クラスでオーバーライトすること。
+
+        GUIの部品にはアクセスしないこと。
+
+        Args:
+            index (int): 処理する項目の番号。
+
+        Returns:
+            Any: `item_processed` に渡す処理結果。
+        """
+        raise NotImplementedError
+
+    def item_started(self, index: int):
+        """
+        `offload` 指定時に、項目の処理を開始する前にGUIスレッドで呼び出されます。
+
+        Args:
+            index (int): 処理する項目の番号。
+        """
+        pass
+
+    def item_processed(self, index: int, result):
+        """
+        `offload` 指定時に、項目の処理結果を受け取りGUIスレッドで呼び出されます。
+
+        Args:
+            index (int): 処理した項目の番号。
+            result (Any): `process_item` の戻り値。
+        """
+        pass
+
+    def _tick(self):
+        """
+        フレームバジェットに収まるだけ処理を実行し、次のタイマ処理を予約します。
+        """
+        if self._finished:
+            return
+        if self.offload:
+            self._submit_next()
+            return
+
+        deadline = time.perf_counter() + self.frame_budget
+        while not self._finished:
+            self.do_action()
+            if time.perf_counter() >= deadline:
+                break
+
+        if not self._finished:
+            # シングルショットタイマを実行
+            QTimer.singleShot(0, self._tick)
+
+    def _create_executor(self) -> Executor:
+        """
+        `offload` 指定時に項目を処理するExecutorを生成します。
+
+        Returns:
+            Executor: 項目を処理するExecutor。
+        """
+        return ThreadPoolExecutor(max_workers=1)
+
+    def _submit_next(self):
+        """
+        実行中の項目数が `max_in_flight` に達するまで次の項目を投入します。
+        """
+        if self.current_count >= self.action_count or self.was_canceled:
+            self._finish()
+            return
+        if self._executor is None:
+            return
+        while (
+            self._next_index < self.action_count
+            and self._next_index - self.current_count < self.max_in_flight
+        ):
+            index = self._next_index
+            self._next_index += 1
+            self.item_started(index)
+            self._submit_item(index)
+        self._update_progress()
+
+    def _submit_item(self, index: int):
+        """
+        項目をExecutorに投入します。
+
+        Args:
+            index (int): 処理する項目の番号。
+        """
+        # キャンセルでExecutorが破棄された後は投入しない
+        if self._executor is None:
+            return
+        self._executor.submit(self._run_item, index)
+
+    def _run_item(self, index: int):
+        """
+        ワーカースレッドで項目を処理し、結果をシグナルでGUIスレッドへ渡します。
+
+        Args:
+            index (int): 処理する項目の番号。
+        """
+        try:
+            result = self.process_item(index)
+        except Exception as e:
+            logger.error(f"Error processing item {index}: {e}")
+            result = e
+        self._item_processed.emit(index, result)
+
+    def _on_item_processed(self, index: int, result):
+        """
+        ワーカースレッドの処理結果を受け取ります。
+
+        Args:
+            index (int): 処理した項目の番号。
+            result (Any): 処理結果。例外が発生した場合はその例外。
+        """
+        if self._finished:
+            return
+        if not isinstance(result, Exception):
+            self.item_processed(index, result)
+        self.do_action()
+        if not self._finished:
+            self._submit_next()
+
+    def _update_progress(self, force: bool = False):
+        """
+        進捗表示を更新します。前回の更新から一定時間経過していない場合は何もしません。
+
+        Args:
+            force (bool, optional): Trueの場合は経過時間に関わらず更新する。
+        """
+        now = time.perf_counter()
+        if (
+            not force
+            and now - self._last_progress_time < self.progress_interval
+        ):
+            return
+        self._last_progress_time = now
+        self.progress_bar.setValue(self.current_count)
+        if self._pending_message is not None:
+            self.msg_label.setText(self._pending_message)
+            self._pending_message = None
+
+    def _finish(self):
+        """
+        処理を終了してダイアログを閉じます。
+        """
+        if self._finished:
+            return
+        self._finished = True
+        self._update_progress(force=True)
+        self._close()
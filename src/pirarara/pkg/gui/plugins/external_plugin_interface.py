@@ -1,6 +1,32 @@
 class PirararaExternalPluginInterface:
+    # プラグイン名。空の場合はディレクトリ名を使用する。
+    name = ""
+    # プラグインのバージョン。
+    version = "0.0.0"
+    # プラグインが提供する機能のリスト。
+    capabilities: tuple = ()
+
+    # 実行方法。"process" の場合はワーカープロセスで process_rows を実行する。
+    execution = "inprocess"
+    # Trueの場合はバッチを複数のプロセスで並列に処理できる。
+    data_parallel = False
+    # process_rows に渡すカラムのリスト。
+    columns: tuple = ("title",)
+
     def setting(self):
         raise NotImplementedError
 
     def do_action(self):
         raise NotImplementedError
+
+    def process_rows(self, rows: list) -> list:
+        """
+        ワーカープロセスで実行される処理。
+
+        Args:
+            rows (list): `(id, columnsの値...)` のタプルのリスト。
+
+        Returns:
+            list: 更新する行の `(id, {カラム名: 値})` のリスト。
+        """
+        raise NotImplementedError
@@ -1,10 +1,13 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
+import ast
 import importlib
-import inspect
+import json
 import logging
 import os
 import sys
+import time
+from typing import Any
 
 from pkg.config import AppConfig
 
@@ -12,8 +15,23 @@ logger = logging.getLogger(__name__)
 
 
 class ExternalPlugins:
+    """
+    外部プラグインを管理するクラス。
+
+    プラグインディレクトリを一度だけ走査し、各プラグインの情報（名前、バージョン、
+    エントリクラス、機能、ファイルの更新時刻）をマニフェストとしてディスクに
+    キャッシュします。プラグインのモジュールは最初に使用されるまでインポートしません。
+    """
+
     _instance = None
 
+    # マニフェストファイル名。
+    MANIFEST_FILE = "plugins_manifest.json"
+    # マニフェストの形式バージョン。形式を変更した場合は値を上げること。
+    MANIFEST_VERSION = 1
+    # 既定のエントリクラス名。
+    DEFAULT_ENTRY_CLASS = "ExternalPlugin"
+
     def __new__(cls, *args, **kwargs):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
@@ -28,52 +46,295 @@ class ExternalPlugins:
         # アプリケーション構成ファイルアクセスクラス
         self.app_config = AppConfig()
         # プラグインディレクトリ
-        plugin_dir = self.app_config.get_plugins_dir()
+        self.plugin_dir = self.app_config.get_plugins_dir()
 
         # sys.pathにプラグインディレクトリを追加
-        if plugin_dir not in sys.path:
-            sys.path.append(plugin_dir)
-
-        # プラグインディレクトリ直下のディレクトリをリスト化
-        plugin_dir = self.app_config.get_plugins_dir()
-        if os.path.exists(plugin_dir):
-            self.plugins_list = [
-                d
-                for d in os.listdir(plugin_dir)
-                if os.path.isdir(os.path.join(plugin_dir, d))
-            ]
-
-    def load_plugins(self):
-        # リストが空なら処理しない
-        if not self.plugins_list:
+        if self.plugin_dir not in sys.path:
+            sys.path.append(self.plugin_dir)
+
+        # マニフェストファイルのパス
+        self.manifest_path = os.path.join(
+            self.app_config.get_cache_dir(), self.__class__.MANIFEST_FILE
+        )
+
+        # プラグイン名をキーとしたマニフェスト
+        self.manifest: dict[str, dict] = {}
+        # 生成済みのプラグインインスタンス
+        self._instances: dict[str, object] = {}
+        # プラグインごとのインポート時間（ミリ秒）
+        self.import_times: dict[str, float] = {}
+
+        self.rescan()
+
+    @property
+    def plugins_list(self) -> list:
+        """
+        インストールされているプラグイン名のリスト。
+
+        Returns:
+            list: プラグイン名のリスト。
+        """
+        return sorted(self.manifest.keys())
+
+    def rescan(self) -> None:
+        """
+        プラグインディレクトリを走査してマニフェストを更新します。
+
+        ファイルの更新時刻が変わっていないプラグインはキャッシュの情報を使用し、
+        変更があった場合のみマニフェストファイルを書き直します。
+
+        Returns:
+            None
+        """
+        cached = self._read_manifest()
+        manifest = {}
+        if os.path.exists(self.plugin_dir):
+            for d in sorted(os.listdir(self.plugin_dir)):
+                path = os.path.join(self.plugin_dir, d)
+                if not os.path.isdir(path):
+                    continue
+                files = self._get_file_mtimes(path)
+                if "plugin.py" not in files:
+                    continue
+                entry = cached.get(d)
+                if entry is None or entry.get("files") != files:
+                    entry = self._read_plugin_info(d, path)
+                    entry["files"] = files
+                manifest[d] = entry
+
+        if manifest != cached:
+            self._write_manifest(manifest)
+        self.manifest = manifest
+
+        # 削除されたプラグインのインスタンスを破棄
+        for name in list(self._instances):
+            if name not in self.manifest:
+                del self._instances[name]
+
+    def get_plugin(self, plugin_name: str):
+        """
+        プラグインのインスタンスを取得します。
+
+        初めて使用する場合にのみモジュールをインポートし、インポート時間を記録します。
+
+        Args:
+            plugin_name (str): プラグイン名（ディレクトリ名）。
+
+        Returns:
+            PirararaExternalPluginInterface | None: プラグインのインスタンス。
+            読み込めなかった場合はNone。
+        """
+        if plugin_name in self._instances:
+            return self._instances[plugin_name]
+        entry = self.manifest.get(plugin_name)
+        if entry is None:
             return None
-        # プラグインのロード
+
+        # プラグインロード
+        load_plugin = plugin_name + ".plugin"
+        start = time.perf_counter()
+        try:
+            plugin = importlib.import_module(load_plugin)
+        except ImportError as e:
+            logger.error(f"Failed to import {load_plugin}: {e}")
+            return None
+        elapsed = (time.perf_counter() - start) * 1000
+        self.import_times[plugin_name] = elapsed
+        logger.info(f"Imported {load_plugin} in {elapsed:.1f} ms.")
+
+        # ロードしたプラグインに指定クラスがあるかを確認
+        entry_class = getattr(plugin, entry["entry_class"], None)
+        if not isinstance(entry_class, type):
+            logger.error(
+                f"{load_plugin} has no class named {entry['entry_class']}."
+            )
+            return None
+        instance = entry_class()
+        self._instances[plugin_name] = instance
+        return instance
+
+    def load_plugins(self) -> list:
+        """
+        すべてのプラグインを読み込み、インスタンスのリストを返します。
+
+        Returns:
+            list: 読み込めたプラグインのインスタンスのリスト。
+        """
+        plugins = []
         for plugin_name in self.plugins_list:
-            try:
-                # プラグインロード
-                load_plugin = plugin_name + ".plugin"
-                # 既にロード済かを確認
-                if load_plugin in sys.modules:
-                    logger.info(
-                        f"The {plugin_name} has already been loaded."
-                    )
-                    plugin = sys.modules[load_plugin]
-                    return plugin.ExternalPlugin()
+            plugin = self.get_plugin(plugin_name)
+            if plugin is not None:
+                plugins.append(plugin)
+        return plugins
+
+    def get_import_report(self) -> list:
+        """
+        プラグインごとのインポート時間を遅い順に返します。
+
+        Returns:
+            list: プラグイン名とインポート時間（ミリ秒）の組のリスト。
+            未インポートのプラグインは含みません。
+        """
+        return sorted(
+            self.import_times.items(), key=lambda item: item[1], reverse=True
+        )
+
+    def _get_file_mtimes(self, path: str) -> dict:
+        """
+        プラグインディレクトリ内のファイルの更新時刻を取得します。
 
-                plugin = importlib.import_module(load_plugin)
-                logger.info(
-                    f"I was able to import this {plugin} successfully."
+        Args:
+            path (str): プラグインのディレクトリのパス。
+
+        Returns:
+            dict: 相対パスをキー、更新時刻（ナノ秒）を値とする辞書。
+        """
+        files = {}
+        for root, dirs, names in os.walk(path):
+            dirs[:] = [d for d in dirs if d != "__pycache__"]
+            for name in names:
+                if not name.endswith((".py", ".json")):
+                    continue
+                full_path = os.path.join(root, name)
+                rel_path = os.path.relpath(full_path, path).replace(
+                    os.sep, "/"
                 )
-                # ロードしたプラグインに指定クラスがあるかを確認
-                classes = [
-                    name
-                    for name, _ in inspect.getmembers(
-                        plugin, inspect.isclass
+                files[rel_path] = os.stat(full_path).st_mtime_ns
+        return files
+
+    def _read_plugin_info(self, plugin_name: str, path: str) -> dict:
+        """
+        プラグインのモジュールをインポートせずに、ソースを解析して情報を取得します。
+
+        エントリクラスのクラス属性 `name`、`version`、`capabilities` を読み取ります。
+        モジュールに `ENTRY_CLASS` が定義されている場合はそのクラスをエントリクラスとします。
+
+        Args:
+            plugin_name (str): プラグイン名（ディレクトリ名）。
+            path (str): プラグインのディレクトリのパス。
+
+        Returns:
+            dict: プラグインの情報。
+        """
+        entry: dict[str, Any] = {
+            "name": plugin_name,
+            "version": "",
+            "entry_class": self.__class__.DEFAULT_ENTRY_CLASS,
+            "capabilities": [],
+        }
+        try:
+            with open(
+                os.path.join(path, "plugin.py"), "r", encoding="utf-8"
+            ) as file:
+                tree = ast.parse(file.read())
+        except (OSError, SyntaxError, ValueError) as e:
+            logger.error(f"Failed to parse {plugin_name}: {e}")
+            return entry
+
+        module_values = self._literal_assigns(tree.body)
+        if isinstance(module_values.get("ENTRY_CLASS"), str):
+            entry["entry_class"] = module_values["ENTRY_CLASS"]
+
+        for node in tree.body:
+            if (
+                isinstance(node, ast.ClassDef)
+                and node.name == entry["entry_class"]
+            ):
+                values = self._literal_assigns(node.body)
+                if values.get("name"):
+                    entry["name"] = str(values["name"])
+                if "version" in values:
+                    entry["version"] = str(values["version"])
+                if isinstance(values.get("capabilities"), (list, tuple)):
+                    entry["capabilities"] = [
+                        str(c) for c in values["capabilities"]
+                    ]
+                # その他のリテラルなクラス属性も保持する
+                entry["attributes"] = {
+                    k: v
+                    for k, v in values.items()
+                    if k not in ("name", "version", "capabilities")
+                    and (
+                        isinstance(v, (str, int, float, bool))
+                        or (
+                            isinstance(v, (list, tuple))
+                            and all(isinstance(c, str) for c in v)
+                        )
                     )
-                ]
-                if "ExternalPlugin" in classes:
-                    return plugin.ExternalPlugin()
-                return None
-            except ImportError:
-                logger.error(f"Failed to import {plugin}.")
-                return None
+                }
+                break
+        return entry
+
+    def _literal_assigns(self, body: list) -> dict:
+        """
+        文のリストからリテラル値の代入を取り出します。
+
+        Args:
+            body (list): ASTの文のリスト。
+
+        Returns:
+            dict: 変数名をキー、値を値とする辞書。
+        """
+        values = {}
+        for node in body:
+            if isinstance(node, ast.Assign):
+                targets = node.targets
+                value = node.value
+            elif isinstance(node, ast.AnnAssign) and node.value is not None:
+                targets = [node.target]
+                value = node.value
+            else:
+                continue
+            try:
+                literal = ast.literal_eval(value)
+            except ValueError:
+                continue
+            for target in targets:
+                if isinstance(target, ast.Name):
+                    values[target.id] = literal
+        return values
+
+    def _read_manifest(self) -> dict:
+        """
+        マニフェストファイルを読み込みます。
+
+        Returns:
+            dict: マニフェスト。読み込めない場合は空の辞書。
+        """
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return {}
+        if (
+            not isinstance(data, dict)
+            or data.get("version") != self.__class__.MANIFEST_VERSION
+            or data.get("plugins_dir") != self.plugin_dir
+            or not isinstance(data.get("plugins"), dict)
+        ):
+            return {}
+        return data["plugins"]
+
+    def _write_manifest(self, manifest: dict) -> None:
+        """
+        マニフェストファイルを書き込みます。
+
+        Args:
+            manifest (dict): マニフェスト。
+
+        Returns:
+            None
+        """
+        data = {
+            "version": self.__class__.MANIFEST_VERSION,
+            "plugins_dir": self.plugin_dir,
+            "plugins": manifest,
+        }
+        tmp_path = self.manifest_path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(data, file, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.manifest_path)
+        except OSError as e:
+            logger.warning(f"Failed to write plugin manifest: {e}")
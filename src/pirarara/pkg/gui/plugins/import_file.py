@@ -1,7 +1,9 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 import os
-from pkg.metadata import set_media_info
+from concurrent.futures import Executor, ThreadPoolExecutor
+
+from pkg.metadata import IOScheduler, set_media_info
 
 from .base import PirararaBasePlugin
 
@@ -15,14 +17,32 @@ class ImportFilePlugin(PirararaBasePlugin):
         if self.action_counts == 0:
             raise ValueError("There are no valid values")
 
-        # 処理するファイルのリストを保持
-        self.files = files
+        # 処理するファイルをデバイスごとに読み込む順に並べる
+        self.scheduler = IOScheduler()
+        self.plan = self.scheduler.plan(files)
+        self.files = [file for _, file in self.plan]
+        self.max_workers = self.scheduler.max_workers(
+            device for device, _ in self.plan
+        )
+        # インポートしたID
+        self.imported_ids: list[int] = []
+
+        # ハッシュ計算やFFmpegの実行でGUIが止まらないようワーカースレッドで処理する
+        super().__init__(self.action_counts, offload=True)
+        # 異なるデバイスのファイルは並列に処理する
+        self.max_in_flight = self.max_workers
+
+    def _create_executor(self) -> Executor:
+        return ThreadPoolExecutor(max_workers=self.max_workers)
+
+    def item_started(self, index: int):
+        self.set_message(os.path.basename(self.files[index]))
 
-        super().__init__(self.action_counts)
+    def process_item(self, index: int):
+        device, file = self.plan[index]
+        with self.scheduler.slot(device):
+            return set_media_info(file)
 
-    def do_action(self):
-        if self.current_count < len(self.files):
-            fname = self.files[self.current_count]
-            self.msg_label.setText(os.path.basename(fname))
-            set_media_info(fname)
-        super().do_action()
+    def item_processed(self, index: int, result):
+        if result:
+            self.imported_ids.append(result)
@@ -1,8 +1,10 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+from .normalizer import TitleNormalizer
 from .plugin import NormalizeTitle
 
 __all__ = [
     "NormalizeTitle",
+    "TitleNormalizer",
 ]
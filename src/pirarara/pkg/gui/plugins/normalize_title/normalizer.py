@@ -0,0 +1,248 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import re
+import unicodedata
+from typing import Callable, Iterable
+
+from pkg.metadata import MetaDataDB
+
+
+class TitleNormalizer:
+    """
+    タイトルを正規化するクラス。
+
+    設定された処理（パイプライン）を順に適用してタイトルを正規化します。
+    正規表現や変換テーブルは生成時に一度だけ構築します。
+
+    Attributes:
+        pipeline (tuple): 適用する処理名のタプル。
+    """
+
+    # 既定の処理順。
+    DEFAULT_PIPELINE = (
+        "nfkc",
+        "width",
+        "extension",
+        "brackets",
+        "tags",
+        "whitespace",
+    )
+
+    # 既定で除去する括弧の組。
+    DEFAULT_BRACKETS = (
+        ("【", "】"),
+        ("[", "]"),
+        ("［", "］"),
+    )
+
+    # 既定で除去するタグ（大文字小文字を区別しない）。
+    DEFAULT_TAGS = (
+        "2160p",
+        "1080p",
+        "720p",
+        "480p",
+        "4k",
+        "fhd",
+        "uhd",
+        "x264",
+        "x265",
+        "h264",
+        "h265",
+        "hevc",
+        "aac",
+    )
+
+    # 除去する拡張子。
+    EXTENSIONS = (
+        "mp4",
+        "avi",
+        "mov",
+        "wmv",
+        "flv",
+        "webm",
+        "mpg",
+        "mkv",
+        "asf",
+        "vob",
+        "ts",
+        "m2ts",
+    )
+
+    # 全角英数記号と全角スペースを半角にする変換テーブル。
+    _WIDTH_TABLE = {
+        **{code: code - 0xFEE0 for code in range(0xFF01, 0xFF5F)},
+        0x3000: 0x20,
+    }
+
+    def __init__(
+        self,
+        pipeline: Iterable[str] | None = None,
+        brackets: Iterable[tuple[str, str]] | None = None,
+        tags: Iterable[str] | None = None,
+    ):
+        """
+        コンストラクタ。
+
+        Args:
+            pipeline (Iterable[str] | None, optional): 適用する処理名。
+                指定がない場合は `DEFAULT_PIPELINE`。
+            brackets (Iterable[tuple[str, str]] | None, optional): 中身ごと
+                除去する括弧の組。指定がない場合は `DEFAULT_BRACKETS`。
+            tags (Iterable[str] | None, optional): 除去するタグ。
+                指定がない場合は `DEFAULT_TAGS`。
+
+        Raises:
+            ValueError: 未知の処理名が指定された場合。
+        """
+        steps: dict[str, Callable[[str], str]] = {
+            "nfkc": self._nfkc,
+            "width": self._width,
+            "extension": self._extension,
+            "brackets": self._brackets,
+            "tags": self._tags,
+            "whitespace": self._whitespace,
+        }
+        self.pipeline = tuple(
+            self.__class__.DEFAULT_PIPELINE if pipeline is None else pipeline
+        )
+        for name in self.pipeline:
+            if name not in steps:
+                raise ValueError(f"unknown normalize step: {name}")
+        self._steps = [steps[name] for name in self.pipeline]
+
+        # 正規表現を事前に構築
+        if brackets is None:
+            brackets = self.__class__.DEFAULT_BRACKETS
+        patterns = [
+            f"{re.escape(o)}[^{re.escape(o)}{re.escape(c)}]*{re.escape(c)}"
+            for o, c in brackets
+        ]
+        self._brackets_re = (
+            re.compile("|".join(patterns)) if patterns else None
+        )
+
+        if tags is None:
+            tags = self.__class__.DEFAULT_TAGS
+        tags = sorted(tags, key=len, reverse=True)
+        self._tags_re = (
+            re.compile(
+                r"(?<![0-9A-Za-z])(?:"
+                + "|".join(re.escape(t) for t in tags)
+                + r")(?![0-9A-Za-z])",
+                re.IGNORECASE,
+            )
+            if tags
+            else None
+        )
+
+        self._extension_re = re.compile(
+            r"\.(?:" + "|".join(self.__class__.EXTENSIONS) + r")$",
+            re.IGNORECASE,
+        )
+        self._space_re = re.compile(r"\s+")
+        self._trim_re = re.compile(r"^[\s\-_.]+|[\s\-_.]+$")
+
+    def normalize(self, title: str) -> str:
+        """
+        タイトルを正規化します。
+
+        Args:
+            title (str): 正規化するタイトル。
+
+        Returns:
+            str: 正規化後のタイトル。
+        """
+        for step in self._steps:
+            title = step(title)
+        return title
+
+    def preview(self, rows: Iterable[tuple[int, str]]) -> list:
+        """
+        変更されるタイトルのみを抽出します（データベースには書き込みません）。
+
+        Args:
+            rows (Iterable[tuple[int, str]]): IDとタイトルの組。
+
+        Returns:
+            list: 変更があった行の `(id, 変更前, 変更後)` のリスト。
+        """
+        normalize = self.normalize
+        changes = []
+        for id, title in rows:
+            if not title:
+                continue
+            new_title = normalize(title)
+            if new_title and new_title != title:
+                changes.append((id, title, new_title))
+        return changes
+
+    def format_diff(self, changes: list) -> str:
+        """
+        変更内容を差分形式の文字列にします。
+
+        Args:
+            changes (list): `preview` が返す変更のリスト。
+
+        Returns:
+            str: 差分形式の文字列。
+        """
+        lines = []
+        for id, title, new_title in changes:
+            lines.append(f"id{id}")
+            lines.append(f"- {title}")
+            lines.append(f"+ {new_title}")
+        return "\n".join(lines)
+
+    def apply(self, db: MetaDataDB, changes: list) -> int:
+        """
+        変更をデータベースに1つのトランザクションで書き込みます。
+
+        Args:
+            db (MetaDataDB): データベースクラスのインスタンス。
+            changes (list): `preview` が返す変更のリスト。
+
+        Returns:
+            int: 更新したレコード数。
+        """
+        rows = [(id, [new_title]) for id, _, new_title in changes]
+        return db.update_many(["title"], rows)
+
+    def normalize_library(self, db: MetaDataDB, dry_run: bool = False) -> list:
+        """
+        ライブラリ内のすべてのタイトルを正規化します。
+
+        Args:
+            db (MetaDataDB): データベースクラスのインスタンス。
+            dry_run (bool, optional): Trueの場合はデータベースに書き込まない。
+
+        Returns:
+            list: 変更があった行の `(id, 変更前, 変更後)` のリスト。
+        """
+        changes = []
+        for rows in db.iter_rows(["title"], batch_size=10000):
+            changes.extend(self.preview(rows))
+        if not dry_run and changes:
+            self.apply(db, changes)
+        return changes
+
+    def _nfkc(self, text: str) -> str:
+        return unicodedata.normalize("NFKC", text)
+
+    def _width(self, text: str) -> str:
+        return text.translate(self.__class__._WIDTH_TABLE)
+
+    def _extension(self, text: str) -> str:
+        return self._extension_re.sub("", text)
+
+    def _brackets(self, text: str) -> str:
+        if self._brackets_re is None:
+            return text
+        return self._brackets_re.sub(" ", text)
+
+    def _tags(self, text: str) -> str:
+        if self._tags_re is None:
+            return text
+        return self._tags_re.sub(" ", text)
+
+    def _whitespace(self, text: str) -> str:
+        return self._trim_re.sub("", self._space_re.sub(" ", text))
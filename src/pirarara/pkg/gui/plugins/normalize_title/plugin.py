@@ -1,40 +1,93 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
+import logging
+
 from pkg.config import AppConfig
 from pkg.gui.plugins import PirararaBasePlugin
 from pkg.metadata import MetaDataDB
 
+from .normalizer import TitleNormalizer
+
+logger = logging.getLogger(__name__)
+
 
 class NormalizeTitle(PirararaBasePlugin):
-    def __init__(self, selected_items: list):
-        if not isinstance(selected_items, list):
-            raise TypeError("The parameters must be list type")
+    """
+    タイトルを一括で正規化するプラグイン。
 
-        self.action_counts = len(selected_items)
-        if self.action_counts == 0:
-            raise ValueError("There are no valid values")
+    タイトルを一定数ずつまとめて正規化し、変更があった行のみを
+    最後に1つのトランザクションでデータベースに書き込みます。
+    """
+
+    # 1回の処理で正規化するタイトル数。
+    CHUNK_SIZE = 500
+
+    def __init__(
+        self,
+        selected_items: list | None = None,
+        normalizer: TitleNormalizer | None = None,
+        dry_run: bool = False,
+    ):
+        """
+        コンストラクタ。
 
+        Args:
+            selected_items (list | None, optional): IDとタイトルをもつリストのリスト。
+                Noneの場合はライブラリ内のすべてのタイトルを対象とする。
+            normalizer (TitleNormalizer | None, optional): 正規化に使用するクラス。
+                指定がない場合は既定の設定で生成する。
+            dry_run (bool, optional): Trueの場合はデータベースに書き込まず、
+                変更内容を `changes` に保持するだけとする。
+        """
         # 構成情報からDBクラスインスタンスを取得
         self.db = MetaDataDB(AppConfig().get_db_path())
 
+        if selected_items is None:
+            selected_items = [
+                list(row)
+                for rows in self.db.iter_rows(["title"])
+                for row in rows
+            ]
+        if not isinstance(selected_items, list):
+            raise TypeError("The parameters must be list type")
+        if len(selected_items) == 0:
+            raise ValueError("There are no valid values")
+
         """
         処理するアイテムリストの中身は
         IDとTitleをリストにもつネストしたリスト
         """
         self.selected_items = selected_items
+        self.normalizer = normalizer or TitleNormalizer()
+        self.dry_run = dry_run
+        # 変更があった行の (id, 変更前, 変更後) のリスト
+        self.changes: list = []
 
-        super().__init__(self.selected_items)
+        chunk_size = self.__class__.CHUNK_SIZE
+        self.action_counts = (
+            len(selected_items) + chunk_size - 1
+        ) // chunk_size
 
-    def do_action(self):
-        item = self.selected_items[self.current_count]
-        if isinstance(item, list):
-            current_id = item[0]
-            title = item[1]
+        super().__init__(self.action_counts)
 
-            self.msg_label.setText(title)
+    def do_action(self):
+        chunk_size = self.__class__.CHUNK_SIZE
+        start = self.current_count * chunk_size
+        chunk = self.selected_items[start : start + chunk_size]
+        if chunk:
+            self.set_message(str(chunk[0][1]))
+            self.changes.extend(
+                self.normalizer.preview(
+                    (item[0], item[1])
+                    for item in chunk
+                    if isinstance(item, list)
+                )
+            )
 
-            columns = ["title"]
-            values = [self.normalize(title)]
-            self.db.update(current_id, columns, values)
+        # 最後のまとまりを処理したら一括で書き込む
+        if self.current_count + 1 >= self.action_count:
+            if not self.dry_run and not self.was_canceled and self.changes:
+                self.normalizer.apply(self.db, self.changes)
+                logger.info(f"normalized {len(self.changes)} titles")
 
         super().do_action()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+from concurrent.futures import Executor, ThreadPoolExecutor
+
+from pkg.config import AppConfig
+from pkg.metadata import (
+    IOScheduler,
+    MetaDataDB,
+    compute_perceptual_hashes,
+    parse_duration,
+    release_media,
+)
+
+from .base import PirararaBasePlugin
+
+
+class PerceptualHashPlugin(PirararaBasePlugin):
+    """
+    知覚ハッシュが未計算の動画のハッシュを計算するプラグイン。
+
+    ffmpegの実行は `IOScheduler` でデバイスごとに同時実行数を制限しながら
+    ワーカースレッドで行い、結果はGUIスレッドで保存します。
+    """
+
+    def __init__(self, rows: list):
+        """
+        コンストラクタ。
+
+        Args:
+            rows (list): `(id, save_dir_path, file_name, duration)` のタプルのリスト。
+        """
+        if not isinstance(rows, list):
+            raise TypeError("The parameters must be list type")
+
+        self.action_counts = len(rows)
+        if self.action_counts == 0:
+            raise ValueError("There are no valid values")
+
+        # 動画ファイルをデバイスごとに読み込む順に並べる
+        self.scheduler = IOScheduler()
+        self.plan = self.scheduler.plan(rows, self._file_path)
+        self.rows = [row for _, row in self.plan]
+        self.max_workers = self.scheduler.max_workers(
+            device for device, _ in self.plan
+        )
+        # 構成情報からDBクラスインスタンスを取得
+        self.db = MetaDataDB(AppConfig().get_db_path())
+
+        super().__init__(self.action_counts, offload=True)
+        self.max_in_flight = self.max_workers
+
+    def _create_executor(self) -> Executor:
+        return ThreadPoolExecutor(max_workers=self.max_workers)
+
+    def _file_path(self, row: tuple) -> str:
+        _, save_dir_path, file_name, _ = row
+        if not save_dir_path or not file_name:
+            return ""
+        return os.path.join(save_dir_path, file_name)
+
+    def item_started(self, index: int):
+        self.set_message(str(self.rows[index][2]))
+
+    def process_item(self, index: int):
+        device, row = self.plan[index]
+        file_path = self._file_path(row)
+        if not file_path:
+            return []
+        with self.scheduler.slot(device):
+            try:
+                return compute_perceptual_hashes(
+                    file_path, parse_duration(row[3])
+                )
+            finally:
+                # PyAVで開いたファイルをワーカースレッドに残さない
+                release_media()
+
+    def item_processed(self, index: int, result):
+        if result:
+            self.db.set_perceptual_hashes(self.rows[index][0], result)
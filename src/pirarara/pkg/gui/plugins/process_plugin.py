@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import importlib
+import logging
+import multiprocessing
+import sys
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from functools import partial
+
+from pkg.config import AppConfig
+from pkg.metadata import MetaDataDB
+
+from .base import PirararaBasePlugin
+
+logger = logging.getLogger(__name__)
+
+# ワーカープロセス内で生成済みのプラグインインスタンス
+_worker_plugins: dict = {}
+
+
+def _init_worker(plugin_dir: str):
+    """
+    ワーカープロセスの初期化処理。
+
+    Args:
+        plugin_dir (str): プラグインディレクトリのパス。
+    """
+    if plugin_dir not in sys.path:
+        sys.path.append(plugin_dir)
+
+
+def _process_batch(plugin_name: str, entry_class: str, rows: list) -> list:
+    """
+    ワーカープロセスでプラグインの `process_rows` を実行します。
+
+    プラグインのインスタンスはワーカープロセスごとに一度だけ生成します。
+
+    Args:
+        plugin_name (str): プラグイン名（ディレクトリ名）。
+        entry_class (str): エントリクラス名。
+        rows (list): `(id, 値1, 値2, ...)` のタプルのリスト。
+
+    Returns:
+        list: 更新する行の `(id, {カラム名: 値})` のリスト。
+    """
+    plugin = _worker_plugins.get(plugin_name)
+    if plugin is None:
+        module = importlib.import_module(plugin_name + ".plugin")
+        plugin = getattr(module, entry_class)()
+        _worker_plugins[plugin_name] = plugin
+    return plugin.process_rows(rows)
+
+
+class ExternalProcessPlugin(PirararaBasePlugin):
+    """
+    外部プラグインの `process_rows` をワーカープロセスで実行するクラス。
+
+    レコードをバッチ単位で読み出しながらワーカープロセスへ送り、
+    返された更新内容をすべてのバッチの処理後に1つのトランザクションで書き込みます。
+    キャンセルされた場合、またはバッチの処理に失敗した場合は書き込みません。
+    """
+
+    # 1バッチあたりのレコード数。
+    BATCH_SIZE = 1000
+
+    def __init__(
+        self,
+        plugin_name: str,
+        entry: dict,
+        plugin_dir: str,
+        batch_size: int | None = None,
+    ):
+        """
+        コンストラクタ。
+
+        Args:
+            plugin_name (str): プラグイン名（ディレクトリ名）。
+            entry (dict): プラグインのマニフェスト情報。
+            plugin_dir (str): プラグインディレクトリのパス。
+            batch_size (int | None, optional): 1バッチあたりのレコード数。
+                指定がない場合は `BATCH_SIZE`。
+        """
+        self.plugin_name = plugin_name
+        self.entry_class = entry["entry_class"]
+        self.plugin_dir = plugin_dir
+        self.batch_size = batch_size or self.__class__.BATCH_SIZE
+
+        attributes = entry.get("attributes", {})
+        self.columns = list(attributes.get("columns") or ["title"])
+        self.data_parallel = bool(attributes.get("data_parallel", False))
+
+        # 構成情報からDBクラスインスタンスを取得
+        self.db = MetaDataDB(AppConfig().get_db_path())
+        # 更新するセルの (id, column, value) のリスト
+        self.cells: list = []
+        self.failed = False
+
+        row_count = self.db.get_row_count()
+        action_count = max(
+            1, (row_count + self.batch_size - 1) // self.batch_size
+        )
+        self._batches = self.db.iter_rows(self.columns, self.batch_size)
+
+        super().__init__(action_count, offload=True)
+
+        # データ並列でないプラグインは1プロセスで順に処理する
+        self.max_in_flight = self._processes * 2 if self.data_parallel else 1
+
+    def _create_executor(self) -> Executor:
+        """
+        ワーカープロセスのプールを生成します。
+
+        Returns:
+            Executor: ワーカープロセスのプール。
+        """
+        self._processes = (
+            self.app_config.get_plugin_processes() if self.data_parallel else 1
+        )
+        return ProcessPoolExecutor(
+            max_workers=self._processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.plugin_dir,),
+        )
+
+    def _submit_item(self, index: int):
+        """
+        次のバッチをワーカープロセスに投入します。
+
+        Args:
+            index (int): バッチの番号。
+        """
+        # キャンセルでプールが破棄された後は投入しない
+        if self._executor is None:
+            return
+        rows = next(self._batches, None)
+        if not rows:
+            self._item_processed.emit(index, [])
+            return
+        self.set_message(f"{self.plugin_name}: {rows[0][0]}")
+        future = self._executor.submit(
+            _process_batch, self.plugin_name, self.entry_class, rows
+        )
+        future.add_done_callback(partial(self._on_batch_done, index))
+
+    def _on_batch_done(self, index: int, future: Future):
+        """
+        バッチの処理結果をシグナルでGUIスレッドへ渡します。
+
+        Args:
+            index (int): バッチの番号。
+            future (Future): バッチの処理結果。
+        """
+        if future.cancelled() or self._finished:
+            return
+        try:
+            result = future.result()
+        except Exception as e:
+            logger.error(
+                f"Error processing batch {index} of {self.plugin_name}: {e}"
+            )
+            result = e
+        self._item_processed.emit(index, result)
+
+    def handle_button_clicked(self, button):
+        super().handle_button_clicked(button)
+        # 実行中のバッチの完了を待たずに終了する
+        if self.was_canceled:
+            self._finish()
+
+    def item_processed(self, index: int, result):
+        for id, values in result:
+            for column, value in values.items():
+                self.cells.append((id, column, value))
+
+    def do_action(self):
+        if self._finished:
+            return
+        # 最後のバッチを処理したら一括で書き込む
+        if self.current_count + 1 >= self.action_count:
+            # 読み出し用の接続を閉じてから書き込む
+            self._batches.close()
+            if not self.was_canceled and not self.failed and self.cells:
+                try:
+                    count = self.db.update_cells(self.cells)
+                    logger.info(f"{self.plugin_name}: updated {count} cells")
+                except (TypeError, ValueError) as e:
+                    logger.error(f"{self.plugin_name}: {e}")
+        super().do_action()
+
+    def _on_item_processed(self, index: int, result):
+        # 失敗したバッチがある場合は書き込まずに終了する
+        if isinstance(result, Exception):
+            self.failed = True
+            self.was_canceled = True
+        super()._on_item_processed(index, result)
+
+    def _close(self):
+        self._batches.close()
+        super()._close()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from concurrent.futures import Executor, ThreadPoolExecutor
+
+from pkg.metadata import IntegrityVerifier
+
+from .base import PirararaBasePlugin
+
+
+class VerifyLibraryPlugin(PirararaBasePlugin):
+    """
+    ライブラリの整合性チェックを進捗ダイアログ付きで実行するプラグイン。
+
+    ファイルの読み込みは `IntegrityVerifier` の設定に従ってワーカースレッドで
+    並列に行い、結果の保存はGUIスレッドで行います。キャンセルした場合は
+    保存済みの結果を残し、次回はその続きからチェックします。
+    """
+
+    def __init__(self, verifier: IntegrityVerifier):
+        """
+        コンストラクタ。
+
+        Args:
+            verifier (IntegrityVerifier): チェックを行うクラスのインスタンス。
+        """
+        if not isinstance(verifier, IntegrityVerifier):
+            raise TypeError("The parameters must be IntegrityVerifier type")
+
+        self.action_counts = len(verifier.records)
+        if self.action_counts == 0:
+            raise ValueError("There are no valid values")
+
+        self.verifier = verifier
+        # チェック結果。完了した場合のみ設定される
+        self.report: dict | None = None
+
+        super().__init__(self.action_counts, offload=True)
+        self.max_in_flight = self.verifier.max_workers
+
+    def _create_executor(self) -> Executor:
+        return ThreadPoolExecutor(max_workers=self.verifier.max_workers)
+
+    def item_started(self, index: int):
+        self.set_message(str(self.verifier.records[index][1][2]))
+
+    def process_item(self, index: int):
+        return self.verifier.verify(index)
+
+    def item_processed(self, index: int, result):
+        self.verifier.record(result)
+
+    def handle_button_clicked(self, button):
+        super().handle_button_clicked(button)
+        if self.was_canceled:
+            self.verifier.cancel()
+
+    def do_action(self):
+        if self.was_canceled:
+            # 途中までの結果を保存して次回に再開する
+            self.verifier.flush()
+        elif self.current_count + 1 >= self.action_count:
+            self.report = self.verifier.finish()
+        super().do_action()
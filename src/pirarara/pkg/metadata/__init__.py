@@ -1,24 +1,83 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
-from .control import set_media_info
+from .control import discard_interrupted_imports, set_media_info
 from .db import MetaDataDB
-from .hash import comp_file_hash, get_file_hash
+from .duplicates import (
+    find_duplicate_groups,
+    find_near_pairs,
+    format_duplicate_report,
+)
+from .ffmpeg_governor import FFmpegGovernor
+from .frame_select import score_frames, select_representative_time
+from .hash import comp_file_hash, get_file_hash, hash_file
+from .image_pack import ImagePack
+from .io_scheduler import IOScheduler
+from .jobs import JobRunner, describe_job, get_retry_delay
 from .media_info import (
     capture_frame,
+    get_media_backend,
     get_media_info,
     get_media_type,
     is_ffmpeg_installed,
+    parse_duration,
+    release_media,
+    set_media_backend,
+)
+from .phash import compute_perceptual_hashes, hamming_distance
+from .proxy import ProxyTranscoder, get_preview_path, get_proxy_path
+from .sprite import create_sprite_sheet, get_sprite_paths, load_sprite_index
+from .verify import (
+    IntegrityVerifier,
+    TokenBucket,
+    format_verify_report,
+    report_verify_scan,
+    verify_file,
 )
 
 __all__ = [
     "MetaDataDB",
+    "ImagePack",
     "set_media_info",
+    "discard_interrupted_imports",
     #
     "get_file_hash",
     "comp_file_hash",
+    "hash_file",
     #
+    "FFmpegGovernor",
     "is_ffmpeg_installed",
     "get_media_type",
     "get_media_info",
     "capture_frame",
+    "select_representative_time",
+    "score_frames",
+    "set_media_backend",
+    "get_media_backend",
+    "release_media",
+    #
+    "compute_perceptual_hashes",
+    "hamming_distance",
+    "parse_duration",
+    "find_near_pairs",
+    "find_duplicate_groups",
+    "format_duplicate_report",
+    #
+    "create_sprite_sheet",
+    "get_sprite_paths",
+    "load_sprite_index",
+    #
+    "ProxyTranscoder",
+    "get_proxy_path",
+    "get_preview_path",
+    #
+    "IOScheduler",
+    "IntegrityVerifier",
+    "TokenBucket",
+    "format_verify_report",
+    "report_verify_scan",
+    "verify_file",
+    #
+    "JobRunner",
+    "describe_job",
+    "get_retry_delay",
 ]
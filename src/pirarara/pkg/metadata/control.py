@@ -3,19 +3,28 @@
 import logging
 import os
 import shutil
+import uuid
 
 from pkg.config import AppConfig
 from .db import MetaDataDB
+from .frame_select import select_representative_time
 from .hash import get_file_hash
+from .phash import compute_perceptual_hashes
 from .media_info import (
     capture_frame,
     get_media_info,
     get_media_type,
     is_ffmpeg_installed,
+    parse_duration,
+    release_media,
 )
 
 logger = logging.getLogger(__name__)
 
+# このプロセスで実行するインポートを識別する値。
+# インポート中のレコードに記録し、以前のセッションで中断したものだけを再開する。
+IMPORT_SESSION = uuid.uuid4().hex
+
 
 def set_media_info(file_path: str) -> int:
     """
@@ -24,12 +33,22 @@ def set_media_info(file_path: str) -> int:
     動画ファイルのハッシュ情報を取得し、データベースに登録します。
     新規のファイルに対して、保存ディレクトリを作成し、静止画をキャプチャする処理を行います。
 
+    レコードの確保はハッシュ値ごとに1つのトランザクションで行うため、同じ内容の
+    ファイルを複数のワーカーで同時にインポートしても1件だけ登録します。
+    保存先の登録を最後に行い、これをインポートの完了とします。以前のセッションで
+    途中で終了したレコードは、同じファイルを再度インポートすると続きから処理します。
+    途中で失敗した場合はレコードと保存先ディレクトリを削除します。
+
     Args:
         file_path (str): メディアファイルのパス。
 
     Returns:
-        int: データベースに保存された新規レコードのID。
-             ファイルが無効、もしくは既存の場合は0を返します。
+        int: データベースに保存されたレコードのID。
+             ファイルが無効、既存、もしくはインポート中の場合は0を返します。
+
+    Raises:
+        RuntimeError: 静止画をキャプチャできなかった場合。
+        OSError: ファイルをコピーできなかった場合。
     """
     # 動画以外は処理しなし
     if get_media_type(file_path) != "movie":
@@ -39,49 +58,102 @@ def set_media_info(file_path: str) -> int:
     if not is_ffmpeg_installed():
         return 0
 
-    # メディア情報を取得
-    file_hash_data = get_file_hash(file_path)
-    media_info = get_media_info(file_path, file_hash_data)
-    # 辞書をリストに変換
-    columns = list(media_info.keys())
-    values = list(media_info.values())
-
     # DBファイル名
     app_config = AppConfig()
     db_file_path = app_config.get_db_path()
     # DBクラスを生成
     db = MetaDataDB(db_file_path)
 
-    # 存在する場合はスキップ
-    if db.exists("file_hash_data", file_hash_data):
-        return 0
-
-    # DBに追加
-    ret_id = db.insert(columns, values)
-    if ret_id is None:
+    # インポートが完了している、または別のワーカーでインポート中の場合はスキップ
+    file_hash_data = get_file_hash(file_path)
+    claim = db.claim_import(file_hash_data, IMPORT_SESSION)
+    if claim is None:
         return 0
+    ret_id, resumed = claim
+    if resumed:
+        logger.info(f"resuming import of {file_path} as id{ret_id}")
 
-    # 保存先ディレクトリ作成
+    # 保存先ディレクトリ
     save_dir = os.path.dirname(db_file_path)
     save_path = os.path.join(save_dir, f"id{ret_id}")
-    os.makedirs(save_path, exist_ok=True)
-
-    # 動画から静止画をキャプチャ
-    capture_file_path = os.path.join(save_path, "capture.jpg")
-    if capture_frame(file_path, capture_file_path):
-        copy_file_to_directory(file_path, save_path)
 
-    # インポートした先のフォルダ、ファイル名をDBに登録
-    update_columns = [
-        "save_dir_path",
-        "file_name",
-    ]
-    update_values = [save_path, os.path.basename(file_path)]
-    db.update(ret_id, update_columns, update_values)
+    try:
+        # メディア情報を取得
+        media_info = get_media_info(file_path, file_hash_data)
+        db.update(ret_id, list(media_info.keys()), list(media_info.values()))
+
+        # 保存先ディレクトリ作成
+        os.makedirs(save_path, exist_ok=True)
+
+        # 代表フレームの選択と知覚ハッシュの計算は、メディア情報の取得で
+        # 開いたファイルをそのまま使用する
+        duration = parse_duration(media_info["duration"])
+        capture_time = select_representative_time(file_path, duration)
+
+        # 重複候補の検出用にフレームの知覚ハッシュを保存
+        hashes = compute_perceptual_hashes(file_path, duration)
+        if hashes:
+            db.set_perceptual_hashes(ret_id, hashes)
+
+        # 選んだ時刻の静止画をキャプチャ
+        capture_file_path = os.path.join(save_path, "capture.jpg")
+        if not capture_frame(
+            file_path, capture_file_path, f"{capture_time:.3f}"
+        ):
+            raise RuntimeError(f"Could not capture a frame of {file_path}")
+        # 途中まで書き込まれたファイルがあっても上書きする
+        if not copy_file_to_directory(file_path, save_path):
+            raise OSError(f"Could not copy {file_path} to {save_path}")
+
+        # インポートした先のフォルダ、ファイル名をDBに登録（インポートの完了）
+        db.finish_import(ret_id, save_path, os.path.basename(file_path))
+    except Exception:
+        # 途中までのレコードを一覧に残さない（再試行では最初から処理する）
+        discard_import(db, ret_id, save_path)
+        raise
+    finally:
+        # キャプチャの前に終了した場合に開いたままのファイルを閉じる
+        release_media()
 
     return ret_id
 
 
+def discard_import(db: MetaDataDB, id: int, save_path: str) -> None:
+    """
+    完了していないインポートのレコードと保存先ディレクトリを削除する。
+
+    Args:
+        db (MetaDataDB): データベースクラスのインスタンス。
+        id (int): レコードのID。
+        save_path (str): 保存先ディレクトリのパス。
+    """
+    try:
+        if os.path.isdir(save_path):
+            shutil.rmtree(save_path)
+    except OSError as e:
+        logger.error(f"Error removing {save_path}: {e}")
+    db.delete(id)
+
+
+def discard_interrupted_imports() -> int:
+    """
+    以前のセッションで中断したインポートのレコードと保存先ディレクトリを削除する。
+
+    再開するインポートのジョブが残っていない場合に呼び出します。
+
+    Returns:
+        int: 削除したレコード数。
+    """
+    db_file_path = AppConfig().get_db_path()
+    db = MetaDataDB(db_file_path)
+    ids = db.get_interrupted_imports(IMPORT_SESSION)
+    for id in ids:
+        discard_import(
+            db, id, os.path.join(os.path.dirname(db_file_path), f"id{id}")
+        )
+    return len(ids)
+
+
 def copy_file_to_directory(src_file_path, dest_directory) -> bool:
     """
     ファイルを指定されたディレクトリにコピーする。
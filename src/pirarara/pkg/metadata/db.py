@@ -1,10 +1,18 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 import gc
+import json
 import os
 import sqlite3
+import threading
+from collections import OrderedDict
 
+from pkg.metrics import instrument
 
+from .slow_query import SlowQueryLog, TracedConnection
+
+
+@instrument("db")
 class MetaDataDB:
     """
     データベースへの接続とメタデータテーブルの操作を管理するクラス。
@@ -17,6 +25,11 @@ class MetaDataDB:
 
     _instance = None
 
+    # 検索結果キャッシュに保持するクエリ数の上限。
+    QUERY_CACHE_SIZE = 64
+    # 検索結果キャッシュに保持するレコード数の上限（全クエリ合計）。
+    QUERY_CACHE_MAX_ROWS = 200000
+
     def __new__(cls, *args, **kwargs):
         """
         シングルトンインスタンスを生成するメソッド。
@@ -46,6 +59,8 @@ class MetaDataDB:
         self.db_file_path = db_file_path
         # テーブル名
         self.table_name = "MetaDataTbl"
+        # 実行に時間がかかったSQL文の記録先（有効な場合のみ）
+        self.slow_query_log: SlowQueryLog | None = None
 
         # テーブルカラム定義
         self.table_columns = {
@@ -92,6 +107,11 @@ class MetaDataDB:
             "file_hash_algorithm": "TEXT",
             "file_hash_data": "TEXT",
             #
+            "proxy_status": "TEXT",
+            "proxy_size": "INTEGER",
+            #
+            "import_session": "TEXT",
+            #
             "updated_at": (
                 "TEXT NOT NULL " "DEFAULT (DATETIME('now', 'localtime'))"
             ),
@@ -100,9 +120,92 @@ class MetaDataDB:
             ),
         }
 
+        # 付属テーブル定義
+        # media_id カラムをもつ付属テーブルのレコードはメタデータと紐付け、
+        # メタデータの削除時に合わせて削除する
+        self.sub_tables = {
+            # フレームごとの知覚ハッシュ（64ビットを符号付き整数で格納）
+            "PerceptualHashTbl": (
+                "media_id INTEGER NOT NULL, "
+                "frame_index INTEGER NOT NULL, "
+                "hash INTEGER NOT NULL, "
+                "PRIMARY KEY (media_id, frame_index)"
+            ),
+            # 整合性チェックの実行履歴
+            "VerifyScanTbl": (
+                "scan_id INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT, "
+                "started_at TEXT NOT NULL "
+                "DEFAULT (DATETIME('now', 'localtime')), "
+                "finished_at TEXT"
+            ),
+            # 整合性チェックの結果（中断した位置から再開するためのチェックポイント）
+            "VerifyResultTbl": (
+                "media_id INTEGER NOT NULL PRIMARY KEY, "
+                "scan_id INTEGER NOT NULL, "
+                "status TEXT NOT NULL, "
+                "checked_at TEXT NOT NULL "
+                "DEFAULT (DATETIME('now', 'localtime'))"
+            ),
+            # パックファイルに格納した画像の位置
+            "ImagePackTbl": (
+                "media_id INTEGER NOT NULL, "
+                "name TEXT NOT NULL, "
+                "pack INTEGER NOT NULL, "
+                "data_offset INTEGER NOT NULL, "
+                "data_length INTEGER NOT NULL, "
+                "mtime REAL NOT NULL, "
+                "PRIMARY KEY (media_id, name)"
+            ),
+            # プロキシ動画の作成待ち（優先度の高い順、同じ場合は登録順に処理）
+            "ProxyJobTbl": (
+                "media_id INTEGER NOT NULL PRIMARY KEY, "
+                "priority INTEGER NOT NULL DEFAULT 0, "
+                "status TEXT NOT NULL, "
+                "queued_at TEXT NOT NULL "
+                "DEFAULT (DATETIME('now', 'localtime'))"
+            ),
+            # 長時間の処理のジョブ（インポート、サムネイル作成、整合性チェック）
+            # `run_after` は再試行を待つ時刻（ユリウス日）
+            "JobTbl": (
+                "job_id INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT, "
+                "job_type TEXT NOT NULL, "
+                "payload TEXT NOT NULL, "
+                "status TEXT NOT NULL DEFAULT 'queued', "
+                "priority INTEGER NOT NULL DEFAULT 0, "
+                "attempts INTEGER NOT NULL DEFAULT 0, "
+                "run_after REAL NOT NULL DEFAULT 0, "
+                "last_error TEXT, "
+                "result TEXT, "
+                "queued_at TEXT NOT NULL "
+                "DEFAULT (DATETIME('now', 'localtime')), "
+                "updated_at TEXT NOT NULL "
+                "DEFAULT (DATETIME('now', 'localtime'))"
+            ),
+        }
+        # 付属テーブルのインデックス定義
+        self.sub_indexes = {
+            "JobTblStatusIdx": "JobTbl (status, priority DESC, job_id)",
+            "JobTblPayloadIdx": "JobTbl (job_type, payload)",
+            # インポート時の重複の確認用
+            "MetaDataTblHashIdx": "MetaDataTbl (file_hash_data)",
+        }
+
         # テーブルが存在しない場合は作成
         if not os.path.exists(self.db_file_path) or not self._table_exists():
             self._create_table()
+        else:
+            self._add_missing_columns()
+        self._create_sub_tables()
+
+        # 検索結果キャッシュ
+        # 書き込みのたびに世代を進め、古い世代のエントリは無効とする
+        self._cache_lock = threading.Lock()
+        self._query_cache: OrderedDict = OrderedDict()
+        self._query_cache_rows = 0
+        self._write_generation = 0
+        # 他プロセスからの書き込み検出用の接続
+        self._monitor_conn: sqlite3.Connection | None = None
+        self._data_version: int | None = None
 
     def _table_exists(self) -> bool:
         """
@@ -112,7 +215,7 @@ class MetaDataDB:
             bool: テーブルが存在する場合はTrue、存在しない場合はFalse。
         """
         sql = "SELECT name FROM sqlite_master WHERE type='table' AND name=?;"
-        with sqlite3.connect(self.db_file_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute(sql, (self.table_name,))
             result = cursor.fetchone()
@@ -137,12 +240,50 @@ class MetaDataDB:
             + "DATETIME('now', 'localtime') WHERE rowid = NEW.rowid; "
             + "END;"
         )
-        with sqlite3.connect(self.db_file_path, isolation_level=None) as conn:
+        with self._connect(isolation_level=None) as conn:
             cursor = conn.cursor()
             cursor.executescript(sql)
 
         gc.collect()
 
+    def _add_missing_columns(self) -> None:
+        """
+        以前のバージョンで作成したテーブルにないカラムを追加するメソッド。
+        """
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"PRAGMA TABLE_INFO({self.table_name});")
+            existing = {row[1] for row in cursor.fetchall()}
+        missing = [
+            (col, attributes)
+            for col, attributes in self.table_columns.items()
+            if col not in existing
+        ]
+        if not missing:
+            return
+        sql = "".join(
+            f"ALTER TABLE {self.table_name} ADD COLUMN {col} {attributes};\n"
+            for col, attributes in missing
+        )
+        with self._connect(isolation_level=None) as conn:
+            cursor = conn.cursor()
+            cursor.executescript(sql)
+
+    def _create_sub_tables(self) -> None:
+        """
+        存在しない付属テーブルとインデックスを生成するメソッド。
+        """
+        sql = "".join(
+            f"CREATE TABLE IF NOT EXISTS {name} ({columns});\n"
+            for name, columns in self.sub_tables.items()
+        ) + "".join(
+            f"CREATE INDEX IF NOT EXISTS {name} ON {columns};\n"
+            for name, columns in self.sub_indexes.items()
+        )
+        with self._connect(isolation_level=None) as conn:
+            cursor = conn.cursor()
+            cursor.executescript(sql)
+
     def get_table_columns(self) -> dict:
         """
         データベースのテーブルカラム情報を返します。
@@ -191,10 +332,12 @@ class MetaDataDB:
             + f"({', '.join(columns)}) VALUES ({sql_values});"
         )
 
-        with sqlite3.connect(self.db_file_path, isolation_level=None) as conn:
+        with self._connect(isolation_level=None) as conn:
             cursor = conn.cursor()
             cursor.execute(sql, tuple(values))
-            return cursor.lastrowid
+            ret_id = cursor.lastrowid
+        self._bump_write_generation()
+        return ret_id
 
     def update(self, id: int, columns: list, values: list) -> None:
         """
@@ -241,9 +384,142 @@ class MetaDataDB:
             + f"SET {','.join(wk_columns)} "
             + "WHERE id=?;"
         )
-        with sqlite3.connect(self.db_file_path, isolation_level=None) as conn:
+        with self._connect(isolation_level=None) as conn:
             cursor = conn.cursor()
             cursor.execute(sql, tuple(wk_values))
+        self._bump_write_generation()
+
+    def update_many(self, columns: list, rows: list) -> int:
+        """
+        複数のレコードの同じカラムを1つのトランザクションで更新します。
+
+        Args:
+            columns (list): 更新するカラムのリスト。
+            rows (list): 更新する行のIDと値のリストの組 `(id, values)` のリスト。
+            各値の型は対応するカラムの型と一致する必要があります。
+
+        Raises:
+            TypeError: `columns` または `rows` がリストでない場合、IDが整数型でない場合、
+            または各値の型がカラムの型と一致しない場合。
+            ValueError: `columns` と値の長さが一致しない場合、
+            または `columns` に無効な値が含まれている場合。
+
+        Returns:
+            int: 更新したレコード数。
+        """
+        if not isinstance(columns, list):
+            raise TypeError("columns must be of type list")
+        if not isinstance(rows, list):
+            raise TypeError("rows must be of type list")
+        if not all(item in self.table_columns for item in columns):
+            raise ValueError("columns contains invalid values")
+
+        params = []
+        for id, values in rows:
+            if not isinstance(id, int):
+                raise TypeError("id must be of type int")
+            if len(columns) != len(values):
+                raise ValueError("columns and number of values do not match")
+            self._check_value_types(columns, values)
+            params.append(tuple(values) + (id,))
+
+        if not columns or not params:
+            return 0
+
+        wk_columns = [f"{c}=?" for c in columns]
+        sql = (
+            f"UPDATE {self.table_name} "
+            + f"SET {','.join(wk_columns)} "
+            + "WHERE id=?;"
+        )
+        return self._execute_many([(sql, params)])
+
+    def update_cells(self, cells: list) -> int:
+        """
+        複数のセルの値を1つのトランザクションで更新します。
+
+        セルはカラムごとにまとめられ、カラムごとに `executemany` で更新されます。
+
+        Args:
+            cells (list): 更新するセルの `(id, column, value)` のリスト。
+            値の型は対応するカラムの型と一致する必要があります。
+
+        Raises:
+            TypeError: `cells` がリストでない場合、IDが整数型でない場合、
+            または値の型がカラムの型と一致しない場合。
+            ValueError: カラムに無効な値が含まれている場合。
+
+        Returns:
+            int: 更新したセル数。
+        """
+        if not isinstance(cells, list):
+            raise TypeError("cells must be of type list")
+
+        # カラムごとにまとめる
+        groups: dict[str, list] = {}
+        for id, column, value in cells:
+            if not isinstance(id, int):
+                raise TypeError("id must be of type int")
+            if column not in self.table_columns:
+                raise ValueError("columns contains invalid values")
+            self._check_value_types([column], [value])
+            groups.setdefault(column, []).append((value, id))
+
+        statements = [
+            (f"UPDATE {self.table_name} SET {column}=? WHERE id=?;", params)
+            for column, params in groups.items()
+        ]
+        return self._execute_many(statements)
+
+    def _check_value_types(self, columns: list, values: list) -> None:
+        """
+        値の型がカラムの型と一致するかを確認します。
+
+        Args:
+            columns (list): カラムのリスト。
+            values (list): 値のリスト。
+
+        Raises:
+            TypeError: 値の型がカラムの型と一致しない場合。
+        """
+        for index, c in enumerate(columns):
+            t = self.table_columns[c]
+            if "INTEGER" in t:
+                if not isinstance(values[index], int):
+                    raise TypeError("values must be of type int")
+            if "TEXT" in t:
+                if not isinstance(values[index], str):
+                    raise TypeError("values must be of type str")
+
+    def _execute_many(self, statements: list) -> int:
+        """
+        複数の `executemany` を1つのトランザクションで実行します。
+
+        いずれかでエラーが発生した場合はロールバックします。
+
+        Args:
+            statements (list): SQL文とパラメータのリストの組のリスト。
+
+        Returns:
+            int: 変更されたレコード数の合計。
+        """
+        if not statements:
+            return 0
+
+        row_count = 0
+        with self._connect(isolation_level=None) as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN;")
+            try:
+                for sql, params in statements:
+                    cursor.executemany(sql, params)
+                    row_count += max(cursor.rowcount, 0)
+                cursor.execute("COMMIT;")
+            except BaseException:
+                cursor.execute("ROLLBACK;")
+                raise
+        self._bump_write_generation()
+        return row_count
 
     def delete(self, id: int) -> None:
         """
@@ -253,7 +529,7 @@ class MetaDataDB:
         Args:
             db_id (int): 対象の一意の識別子。
         """
-        with sqlite3.connect(self.db_file_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 f"SELECT protection FROM {self.table_name} WHERE id=?;", (id,)
@@ -262,17 +538,23 @@ class MetaDataDB:
         if result and result[0] == 1:
             return
 
-        with sqlite3.connect(self.db_file_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute(f"DELETE FROM {self.table_name} WHERE id=?;", (id,))
-
-        with sqlite3.connect(self.db_file_path) as conn:
+            for name, columns in self.sub_tables.items():
+                if columns.startswith("media_id "):
+                    cursor.execute(
+                        f"DELETE FROM {name} WHERE media_id=?;", (id,)
+                    )
+        self._bump_write_generation()
+
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute(f"SELECT COUNT(*) FROM {self.table_name}")
             row_count = cursor.fetchone()[0]
 
         if row_count == 0:
-            with sqlite3.connect(self.db_file_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 cursor.execute(
                     "DELETE FROM sqlite_sequence WHERE name=?;",
@@ -294,7 +576,7 @@ class MetaDataDB:
         取得したデータが存在しない場合はNoneを返します。存在する場合は、テーブルの列名をキーとして
         データを辞書形式で返します。
         """
-        with sqlite3.connect(self.db_file_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute(f"PRAGMA TABLE_INFO ({self.table_name});")
             table_columns = cursor.fetchall()
@@ -326,7 +608,12 @@ class MetaDataDB:
         Raises:
             sqlite3.Error: データベース操作中にエラーが発生した場合。
         """
-        with sqlite3.connect(self.db_file_path) as conn:
+        key = self._cache_key("data")
+        generation, cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute(f"PRAGMA TABLE_INFO ({self.table_name});")
             table_columns = cursor.fetchall()
@@ -336,15 +623,8 @@ class MetaDataDB:
         if data is None:
             return None
 
-        ret_data = []
-        for d in data:
-            dict_data = {}
-            for index, col in enumerate(table_columns):
-                if isinstance(d[index], str):
-                    dict_data[col[1]] = d[index]
-                if isinstance(d[index], int):
-                    dict_data[col[1]] = str(d[index])
-            ret_data.append(dict_data)
+        ret_data = self._to_dict_rows(table_columns, data)
+        self._cache_put(key, generation, ret_data)
         return ret_data
 
     def exists(self, column: str, check_data: str) -> bool:
@@ -361,13 +641,126 @@ class MetaDataDB:
         # 指定のカラムから検索する
         sql = f"SELECT * FROM {self.table_name} " + f"WHERE {column}=?;"
 
-        with sqlite3.connect(self.db_file_path, isolation_level=None) as conn:
+        with self._connect(isolation_level=None) as conn:
             cursor = conn.cursor()
             cursor.execute(sql, (check_data,))
             data = cursor.fetchone()
 
         return data is not None
 
+    def claim_import(self, file_hash_data: str, session: str) -> tuple | None:
+        """
+        インポートするファイルのレコードを確保します。
+
+        ハッシュ値が一致するレコードの確認と追加を1つのトランザクションで行うため、
+        同じ内容のファイルを複数のワーカーで同時にインポートしてもレコードは
+        1件になります。インポート中のレコードには `import_session` にセッションを
+        記録し、以前のセッションで中断したレコードだけを再開の対象とします。
+
+        Args:
+            file_hash_data (str): ファイルのハッシュ値。
+            session (str): インポートを実行するセッションの識別子。
+
+        Returns:
+            tuple | None: `(id, 再開する場合はTrue)`。インポートが完了している
+            場合、または同じセッションでインポート中の場合はNone。
+        """
+        with self._connect(isolation_level=None) as conn:
+            cursor = conn.cursor()
+            # 確認と追加の間に他から追加されないよう書き込みロックを取る
+            cursor.execute("BEGIN IMMEDIATE;")
+            try:
+                cursor.execute(
+                    "SELECT id, save_dir_path, import_session "
+                    f"FROM {self.table_name} WHERE file_hash_data=? "
+                    "ORDER BY (save_dir_path IS NULL OR save_dir_path='') "
+                    "ASC, id ASC LIMIT 1;",
+                    (file_hash_data,),
+                )
+                row = cursor.fetchone()
+                if row is None:
+                    cursor.execute(
+                        f"INSERT INTO {self.table_name} "
+                        "(file_hash_data, import_session) VALUES (?, ?);",
+                        (file_hash_data, session),
+                    )
+                    claim = (cursor.lastrowid, False)
+                elif row[1] or row[2] == session:
+                    claim = None
+                else:
+                    cursor.execute(
+                        f"UPDATE {self.table_name} SET import_session=? "
+                        "WHERE id=?;",
+                        (session, row[0]),
+                    )
+                    claim = (row[0], True)
+                cursor.execute("COMMIT;")
+            except BaseException:
+                cursor.execute("ROLLBACK;")
+                raise
+        if claim is not None:
+            self._bump_write_generation()
+        return claim
+
+    def finish_import(
+        self, id: int, save_dir_path: str, file_name: str
+    ) -> None:
+        """
+        インポートしたファイルの保存先を登録し、インポートを完了にします。
+
+        Args:
+            id (int): 対象の一意の識別子。
+            save_dir_path (str): 保存先ディレクトリ。
+            file_name (str): ファイル名。
+        """
+        with self._connect(isolation_level=None) as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"UPDATE {self.table_name} SET save_dir_path=?, file_name=?, "
+                "import_session=NULL WHERE id=?;",
+                (save_dir_path, file_name, id),
+            )
+        self._bump_write_generation()
+
+    def get_interrupted_imports(self, session: str) -> list:
+        """
+        以前のセッションで中断したインポートのレコードのIDを取得します。
+
+        Args:
+            session (str): 実行中のセッションの識別子。
+
+        Returns:
+            list: IDのリスト。
+        """
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"SELECT id FROM {self.table_name} "
+                "WHERE import_session IS NOT NULL AND import_session != ? "
+                "AND (save_dir_path IS NULL OR save_dir_path='') "
+                "ORDER BY id ASC;",
+                (session,),
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def get_row_count(self, include_deleted: bool = False) -> int:
+        """
+        テーブルのレコード数を取得するメソッド。
+
+        Args:
+            include_deleted (bool): 削除マークが付いたレコードも数える場合はTrue。
+
+        Returns:
+            int: レコード数。
+        """
+        sql = f"SELECT COUNT(*) FROM {self.table_name}"
+        if not include_deleted:
+            sql += " WHERE (deletion_mark IS NULL OR deletion_mark != 1)"
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql + ";")
+            return cursor.fetchone()[0]
+
     def get_count(self, total_text: str, column: str) -> list | None:
         """
         指定されたcolumnに基づいてテーブルからデータ数を取得するメソッド。
@@ -382,6 +775,11 @@ class MetaDataDB:
         2つ目の要素以降にソートされたデータの個数が並ぶ。
         データはすべて文字列型となる。
         """
+        key = self._cache_key("count", column, total_text, f"{column} ASC")
+        generation, cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
         # 各要素の個数を取得
         sql = (
             f"SELECT {column}, COUNT(*) FROM {self.table_name} "
@@ -392,7 +790,7 @@ class MetaDataDB:
         )
 
         data = []
-        with sqlite3.connect(self.db_file_path, isolation_level=None) as conn:
+        with self._connect(isolation_level=None) as conn:
             cursor = conn.cursor()
             cursor.execute(sql)
             data = cursor.fetchall()
@@ -411,8 +809,34 @@ class MetaDataDB:
                     total_count += items[1]
 
         ret_data.insert(0, (total_text, total_count))
+        self._cache_put(key, generation, ret_data)
         return ret_data
 
+    def get_distinct_values(self, column: str) -> list:
+        """
+        指定されたカラムに登録されている値を重複なく取得します。
+
+        Args:
+            column (str): 値を取得するカラム名。
+
+        Raises:
+            ValueError: カラムに無効な値が含まれている場合。
+
+        Returns:
+            list: 空でない値のリスト。
+        """
+        if column not in self.table_columns:
+            raise ValueError("columns contains invalid values")
+        sql = (
+            f"SELECT DISTINCT {column} FROM {self.table_name} "
+            + "WHERE (deletion_mark IS NULL OR deletion_mark != 1) AND "
+            + f"{column} IS NOT NULL AND {column}!='';"
+        )
+        with self._connect(isolation_level=None) as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql)
+            return [row[0] for row in cursor.fetchall()]
+
     def get_all_data_by_column(self, column: str, text: str) -> list | None:
         if not isinstance(column, str):
             raise TypeError("column must be of type str")
@@ -423,9 +847,14 @@ class MetaDataDB:
         if len(text) == 0:
             return None
 
+        key = self._cache_key("data", column, text)
+        generation, cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
         pattern = f"*{text}*"
 
-        with sqlite3.connect(self.db_file_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute(f"PRAGMA TABLE_INFO ({self.table_name});")
             table_columns = cursor.fetchall()
@@ -439,13 +868,1054 @@ class MetaDataDB:
         if data is None:
             return None
 
-        ret_data = []
-        for d in data:
-            dict_data = {}
-            for index, col in enumerate(table_columns):
-                if isinstance(d[index], str):
-                    dict_data[col[1]] = d[index]
-                if isinstance(d[index], int):
-                    dict_data[col[1]] = str(d[index])
-            ret_data.append(dict_data)
+        ret_data = self._to_dict_rows(table_columns, data)
+        self._cache_put(key, generation, ret_data)
         return ret_data
+
+    def connect(self, **kwargs) -> sqlite3.Connection:
+        """
+        データベースへの新しい接続を生成します。
+
+        ワーカースレッドから長時間のクエリを実行し、別スレッドから
+        `sqlite3.Connection.interrupt()` で中断する用途で使用します。
+
+        Args:
+            **kwargs: `sqlite3.connect` に渡す追加の引数。
+
+        Returns:
+            sqlite3.Connection: 生成した接続。
+        """
+        return self._connect(**kwargs)
+
+    def _connect(self, **kwargs) -> sqlite3.Connection:
+        """
+        データベースへの新しい接続を生成します。
+
+        SQL文の記録が有効な場合は、実行したステートメントを記録する接続を返します。
+
+        Args:
+            **kwargs: `sqlite3.connect` に渡す追加の引数。
+
+        Returns:
+            sqlite3.Connection: 生成した接続。
+        """
+        slow_query_log = self.slow_query_log
+        if slow_query_log is None:
+            return sqlite3.connect(self.db_file_path, **kwargs)
+        conn = sqlite3.connect(
+            self.db_file_path, factory=TracedConnection, **kwargs
+        )
+        conn.attach(slow_query_log)
+        return conn
+
+    def enable_slow_query_log(
+        self, threshold_ms: float, log_file_path: str
+    ) -> None:
+        """
+        実行に時間がかかったSQL文の記録を開始します。
+
+        しきい値を超えたステートメントはバインドされた値と実行計画とともに
+        `log_file_path` に出力し、すべてのステートメントの形ごとの集計も行います。
+
+        Args:
+            threshold_ms (float): 記録する所要時間のしきい値（ミリ秒）。
+            log_file_path (str): ログファイルのパス。
+        """
+        self.disable_slow_query_log()
+        self.slow_query_log = SlowQueryLog(
+            self.db_file_path, threshold_ms, log_file_path
+        )
+
+    def disable_slow_query_log(self) -> None:
+        """
+        SQL文の記録を終了し、形ごとの集計結果をログに出力します。
+        """
+        slow_query_log, self.slow_query_log = self.slow_query_log, None
+        if slow_query_log is not None:
+            slow_query_log.write_summary()
+            slow_query_log.close()
+
+    def iter_data_by_column(
+        self,
+        conn: sqlite3.Connection,
+        column: str | None,
+        text: str | None,
+        page_size: int = 500,
+    ):
+        """
+        指定されたカラムの検索結果をページ単位で順次返すジェネレータ。
+
+        `column` または `text` が空の場合は全データを返します。
+        削除マークが付いたレコードは返しません。
+
+        Args:
+            conn (sqlite3.Connection): 検索に使用する接続。
+            column (str | None): 検索対象のカラム名。
+            text (str | None): 検索する文字列。
+            page_size (int): 1ページあたりのレコード数。
+
+        Raises:
+            ValueError: `column` がテーブルに存在しないカラムの場合。
+            sqlite3.OperationalError: `interrupt()` によって中断された場合。
+
+        Yields:
+            list: 各レコードを辞書に変換したリスト。
+        """
+        if column and text and column not in self.table_columns:
+            raise ValueError("column contains invalid values")
+
+        # キャッシュにあればそこからページを返す
+        key = self._cache_key("live", column, text)
+        generation, cached = self._cache_get(key)
+        if cached is not None:
+            for index in range(0, len(cached), page_size):
+                yield cached[index : index + page_size]
+            return
+
+        where = "(deletion_mark IS NULL OR deletion_mark != 1)"
+        params: tuple = ()
+        if column and text:
+            where += f" AND {column} GLOB ?"
+            params = (f"*{text}*",)
+
+        cursor = conn.cursor()
+        cursor.execute(f"PRAGMA TABLE_INFO ({self.table_name});")
+        table_columns = cursor.fetchall()
+        cursor.execute(
+            f"SELECT * FROM {self.table_name} WHERE {where} ORDER BY id ASC;",
+            params,
+        )
+        ret_data: list = []
+        while True:
+            data = cursor.fetchmany(page_size)
+            if not data:
+                break
+            rows = self._to_dict_rows(table_columns, data)
+            ret_data.extend(rows)
+            yield rows
+        # 最後まで取得できた結果のみキャッシュする
+        self._cache_put(key, generation, ret_data)
+
+    def iter_rows(
+        self,
+        columns: list,
+        batch_size: int = 1000,
+        include_deleted: bool = False,
+    ):
+        """
+        指定されたカラムの値をIDとともにバッチ単位で順次返すジェネレータ。
+
+        全件を辞書に変換しないため、大量のレコードを一括処理する用途に使用します。
+
+        Args:
+            columns (list): 取得するカラムのリスト。
+            batch_size (int): 1バッチあたりのレコード数。
+            include_deleted (bool): 削除マークが付いたレコードも返す場合はTrue。
+
+        Raises:
+            TypeError: `columns` がリストでない場合。
+            ValueError: `columns` に無効な値が含まれている場合。
+
+        Yields:
+            list: `(id, 値1, 値2, ...)` のタプルのリスト。
+        """
+        if not isinstance(columns, list):
+            raise TypeError("columns must be of type list")
+        if not all(item in self.table_columns for item in columns):
+            raise ValueError("columns contains invalid values")
+
+        sql = f"SELECT {', '.join(['id'] + columns)} FROM {self.table_name} "
+        if not include_deleted:
+            sql += "WHERE (deletion_mark IS NULL OR deletion_mark != 1) "
+        sql += "ORDER BY id ASC;"
+
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql)
+            while True:
+                data = cursor.fetchmany(batch_size)
+                if not data:
+                    break
+                yield data
+
+    def set_perceptual_hashes(self, id: int, hashes: list) -> None:
+        """
+        指定されたIDのフレームの知覚ハッシュを保存します。既存のハッシュは置き換えます。
+
+        Args:
+            id (int): 対象の一意の識別子。
+            hashes (list): フレームごとの64ビットのハッシュ値のリスト。
+
+        Raises:
+            TypeError: IDが整数型でない場合。
+        """
+        if not isinstance(id, int):
+            raise TypeError("id must be of type int")
+        params = [
+            (id, index, self._to_signed64(h)) for index, h in enumerate(hashes)
+        ]
+        with self._connect(isolation_level=None) as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN;")
+            try:
+                cursor.execute(
+                    "DELETE FROM PerceptualHashTbl WHERE media_id=?;", (id,)
+                )
+                cursor.executemany(
+                    "INSERT INTO PerceptualHashTbl "
+                    "(media_id, frame_index, hash) VALUES (?, ?, ?);",
+                    params,
+                )
+                cursor.execute("COMMIT;")
+            except BaseException:
+                cursor.execute("ROLLBACK;")
+                raise
+
+    def get_perceptual_hashes(self) -> dict:
+        """
+        削除マークが付いていないレコードのフレームの知覚ハッシュを取得します。
+
+        Returns:
+            dict: IDをキー、フレーム順のハッシュ値のリストを値とする辞書。
+        """
+        sql = (
+            "SELECT p.media_id, p.hash FROM PerceptualHashTbl AS p "
+            f"JOIN {self.table_name} AS m ON m.id = p.media_id "
+            "WHERE (m.deletion_mark IS NULL OR m.deletion_mark != 1) "
+            "ORDER BY p.media_id, p.frame_index;"
+        )
+        hashes: dict[int, list] = {}
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            for media_id, h in cursor.execute(sql):
+                hashes.setdefault(media_id, []).append(h & 0xFFFFFFFFFFFFFFFF)
+        return hashes
+
+    def get_rows_without_perceptual_hash(self) -> list:
+        """
+        知覚ハッシュが未計算の動画のレコードを取得します。
+
+        Returns:
+            list: `(id, save_dir_path, file_name, duration)` のタプルのリスト。
+        """
+        sql = (
+            f"SELECT id, save_dir_path, file_name, duration "
+            f"FROM {self.table_name} "
+            "WHERE media_type = 'movie' "
+            "AND (deletion_mark IS NULL OR deletion_mark != 1) "
+            "AND id NOT IN (SELECT media_id FROM PerceptualHashTbl) "
+            "ORDER BY id ASC;"
+        )
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql)
+            return cursor.fetchall()
+
+    def start_verify_scan(self, resume: bool = True) -> int:
+        """
+        整合性チェックを開始し、実行IDを返します。
+
+        Args:
+            resume (bool): Trueの場合、完了していない前回の実行があれば再開する。
+
+        Raises:
+            RuntimeError: 実行IDを取得できなかった場合。
+
+        Returns:
+            int: 実行ID。
+        """
+        if resume:
+            scan_id = self.get_unfinished_verify_scan()
+            if scan_id is not None:
+                return scan_id
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute("INSERT INTO VerifyScanTbl DEFAULT VALUES;")
+            scan_id = cursor.lastrowid
+        if scan_id is None:
+            raise RuntimeError("Failed to start a verify scan")
+        return scan_id
+
+    def get_unfinished_verify_scan(self) -> int | None:
+        """
+        完了していない最新の整合性チェックの実行IDを取得します。
+
+        Returns:
+            int | None: 実行ID。ない場合はNone。
+        """
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT scan_id FROM VerifyScanTbl "
+                "WHERE finished_at IS NULL "
+                "ORDER BY scan_id DESC LIMIT 1;"
+            )
+            row = cursor.fetchone()
+        return None if row is None else row[0]
+
+    def finish_verify_scan(self, scan_id: int) -> None:
+        """
+        整合性チェックの実行を完了にします。
+
+        Args:
+            scan_id (int): 実行ID。
+        """
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "UPDATE VerifyScanTbl SET finished_at = "
+                "DATETIME('now', 'localtime') WHERE scan_id=?;",
+                (scan_id,),
+            )
+
+    def set_verify_results(self, scan_id: int, results: list) -> None:
+        """
+        整合性チェックの結果を1つのトランザクションで保存します。
+
+        Args:
+            scan_id (int): 実行ID。
+            results (list): `(id, status)` のリスト。
+        """
+        if not results:
+            return
+        with self._connect(isolation_level=None) as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN;")
+            try:
+                cursor.executemany(
+                    "INSERT OR REPLACE INTO VerifyResultTbl "
+                    "(media_id, scan_id, status) VALUES (?, ?, ?);",
+                    [(id, scan_id, status) for id, status in results],
+                )
+                cursor.execute("COMMIT;")
+            except BaseException:
+                cursor.execute("ROLLBACK;")
+                raise
+
+    def get_verify_results(self, scan_id: int) -> dict:
+        """
+        整合性チェックの結果を取得します。
+
+        Args:
+            scan_id (int): 実行ID。
+
+        Returns:
+            dict: IDをキー、結果を値とする辞書。
+        """
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT media_id, status FROM VerifyResultTbl "
+                "WHERE scan_id=?;",
+                (scan_id,),
+            )
+            return dict(cursor.fetchall())
+
+    def get_packed_images(self) -> list:
+        """
+        パックファイルに格納した画像の位置をすべて取得します。
+
+        Returns:
+            list: `(media_id, name, pack, data_offset, data_length, mtime)`
+            のタプルをパックファイルと位置の順に並べたリスト。
+        """
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT media_id, name, pack, data_offset, data_length, mtime "
+                "FROM ImagePackTbl ORDER BY pack, data_offset;"
+            )
+            return cursor.fetchall()
+
+    def set_packed_image(
+        self,
+        media_id: int,
+        name: str,
+        pack: int,
+        data_offset: int,
+        data_length: int,
+        mtime: float,
+    ) -> None:
+        """
+        パックファイルに格納した画像の位置を保存します。既存の位置は置き換えます。
+
+        Args:
+            media_id (int): 対象の一意の識別子。
+            name (str): 画像の名前。
+            pack (int): パックファイルの番号。
+            data_offset (int): パックファイル内の位置（バイト）。
+            data_length (int): 画像データの長さ（バイト）。
+            mtime (float): 画像の作成元の更新時刻。
+        """
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "INSERT OR REPLACE INTO ImagePackTbl "
+                "(media_id, name, pack, data_offset, data_length, mtime) "
+                "VALUES (?, ?, ?, ?, ?, ?);",
+                (media_id, name, pack, data_offset, data_length, mtime),
+            )
+
+    def move_packed_images(self, rows: list) -> None:
+        """
+        パックファイルの再構成後の画像の位置を1つのトランザクションで保存します。
+
+        再構成中に削除されたレコードの位置は復活させません。
+
+        Args:
+            rows (list): `(pack, data_offset, media_id, name)` のリスト。
+        """
+        if not rows:
+            return
+        with self._connect(isolation_level=None) as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN;")
+            try:
+                cursor.executemany(
+                    "UPDATE ImagePackTbl SET pack=?, data_offset=? "
+                    "WHERE media_id=? AND name=?;",
+                    rows,
+                )
+                cursor.execute("COMMIT;")
+            except BaseException:
+                cursor.execute("ROLLBACK;")
+                raise
+
+    def add_proxy_jobs(self, ids: list, priority: int = 0) -> None:
+        """
+        プロキシ動画の作成を1つのトランザクションで登録します。
+
+        登録済みの場合は優先度を高い方に更新し、失敗したものは再登録します。
+
+        Args:
+            ids (list): IDのリスト。
+            priority (int, optional): 優先度。大きいほど先に処理する。
+        """
+        if not ids:
+            return
+        with self._connect(isolation_level=None) as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE;")
+            try:
+                cursor.executemany(
+                    "INSERT INTO ProxyJobTbl (media_id, priority, status) "
+                    "VALUES (?, ?, 'queued') "
+                    "ON CONFLICT (media_id) DO UPDATE SET "
+                    "priority=MAX(priority, excluded.priority), "
+                    "status=CASE WHEN status='running' THEN status "
+                    "ELSE 'queued' END;",
+                    [(id, priority) for id in ids],
+                )
+                cursor.executemany(
+                    f"UPDATE {self.table_name} SET proxy_status='queued' "
+                    "WHERE id=? AND IFNULL(proxy_status, '') != 'running';",
+                    [(id,) for id in ids],
+                )
+                cursor.execute("COMMIT;")
+            except BaseException:
+                cursor.execute("ROLLBACK;")
+                raise
+        self._bump_write_generation()
+
+    def take_proxy_job(self) -> int | None:
+        """
+        次に処理するプロキシ動画の作成を取り出し、実行中にします。
+
+        Returns:
+            int | None: ID。作成待ちがない場合はNone。
+        """
+        with self._connect(isolation_level=None) as conn:
+            cursor = conn.cursor()
+            # 取り出しと実行中への変更の間に他から取り出されないよう書き込みロックを取る
+            cursor.execute("BEGIN IMMEDIATE;")
+            try:
+                cursor.execute(
+                    "SELECT media_id FROM ProxyJobTbl WHERE status='queued' "
+                    "ORDER BY priority DESC, queued_at, media_id LIMIT 1;"
+                )
+                row = cursor.fetchone()
+                if row is not None:
+                    cursor.execute(
+                        "UPDATE ProxyJobTbl SET status='running' "
+                        "WHERE media_id=?;",
+                        row,
+                    )
+                    cursor.execute(
+                        f"UPDATE {self.table_name} "
+                        "SET proxy_status='running' WHERE id=?;",
+                        row,
+                    )
+                cursor.execute("COMMIT;")
+            except BaseException:
+                cursor.execute("ROLLBACK;")
+                raise
+        if row is None:
+            return None
+        self._bump_write_generation()
+        return row[0]
+
+    def finish_proxy_job(self, media_id: int, size: int | None) -> None:
+        """
+        プロキシ動画の作成の結果を保存します。
+
+        Args:
+            media_id (int): ID。
+            size (int | None): プロキシ動画のサイズ（バイト）。失敗した場合はNone。
+        """
+        with self._connect(isolation_level=None) as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE;")
+            try:
+                if size is None:
+                    cursor.execute(
+                        "UPDATE ProxyJobTbl SET status='failed' "
+                        "WHERE media_id=?;",
+                        (media_id,),
+                    )
+                    cursor.execute(
+                        f"UPDATE {self.table_name} SET proxy_status='failed', "
+                        "proxy_size=NULL WHERE id=?;",
+                        (media_id,),
+                    )
+                else:
+                    cursor.execute(
+                        "DELETE FROM ProxyJobTbl WHERE media_id=?;",
+                        (media_id,),
+                    )
+                    cursor.execute(
+                        f"UPDATE {self.table_name} SET proxy_status='done', "
+                        "proxy_size=? WHERE id=?;",
+                        (size, media_id),
+                    )
+                cursor.execute("COMMIT;")
+            except BaseException:
+                cursor.execute("ROLLBACK;")
+                raise
+        self._bump_write_generation()
+
+    def reset_proxy_jobs(self, ids: list | None = None) -> int:
+        """
+        実行中のプロキシ動画の作成を作成待ちに戻します。
+
+        前回の終了時や中断時に実行中だったものを再開するために使用します。
+
+        Args:
+            ids (list | None, optional): IDのリスト。指定がない場合はすべて。
+
+        Returns:
+            int: 作成待ちに戻した数。
+        """
+        where = "status='running'"
+        params: tuple = ()
+        if ids is not None:
+            if not ids:
+                return 0
+            where += f" AND media_id IN ({', '.join('?' for _ in ids)})"
+            params = tuple(ids)
+        with self._connect(isolation_level=None) as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE;")
+            try:
+                cursor.execute(
+                    f"UPDATE {self.table_name} SET proxy_status='queued' "
+                    f"WHERE id IN (SELECT media_id FROM ProxyJobTbl "
+                    f"WHERE {where});",
+                    params,
+                )
+                cursor.execute(
+                    f"UPDATE ProxyJobTbl SET status='queued' WHERE {where};",
+                    params,
+                )
+                count = cursor.rowcount
+                cursor.execute("COMMIT;")
+            except BaseException:
+                cursor.execute("ROLLBACK;")
+                raise
+        if count:
+            self._bump_write_generation()
+        return count
+
+    def count_proxy_jobs(self) -> int:
+        """
+        作成待ちと実行中のプロキシ動画の作成の数を取得します。
+
+        Returns:
+            int: 数。
+        """
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT COUNT(*) FROM ProxyJobTbl "
+                "WHERE status IN ('queued', 'running');"
+            )
+            return cursor.fetchone()[0]
+
+    def add_jobs(
+        self, job_type: str, payloads: list, priority: int = 0
+    ) -> int:
+        """
+        ジョブを1つのトランザクションで登録します。
+
+        同じ種類と内容のジョブが作成待ちまたは実行中の場合は登録しません。
+
+        Args:
+            job_type (str): ジョブの種類。
+            payloads (list): ジョブの内容（JSONに変換できる値）のリスト。
+            priority (int, optional): 優先度。大きいほど先に処理する。
+
+        Returns:
+            int: 登録した数。
+        """
+        if not payloads:
+            return 0
+        with self._connect(isolation_level=None) as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE;")
+            try:
+                before = conn.total_changes
+                cursor.executemany(
+                    "INSERT INTO JobTbl (job_type, payload, priority) "
+                    "SELECT ?1, ?2, ?3 WHERE NOT EXISTS ("
+                    "SELECT 1 FROM JobTbl WHERE job_type=?1 AND payload=?2 "
+                    "AND status IN ('queued', 'running'));",
+                    [
+                        (
+                            job_type,
+                            json.dumps(payload, sort_keys=True),
+                            priority,
+                        )
+                        for payload in payloads
+                    ],
+                )
+                count = conn.total_changes - before
+                cursor.execute("COMMIT;")
+            except BaseException:
+                cursor.execute("ROLLBACK;")
+                raise
+        return count
+
+    def claim_job(self) -> tuple | None:
+        """
+        次に処理するジョブを取り出し、実行中にします。
+
+        優先度の高い順、同じ場合は登録順に、再試行の待ち時間が過ぎたものを
+        取り出します。複数のワーカーから同時に呼び出しても同じジョブを
+        二重に取り出しません。
+
+        Returns:
+            tuple | None: `(job_id, job_type, payload, attempts)`。`attempts` は
+            今回を含む実行回数。取り出せるジョブがない場合はNone。
+        """
+        with self._connect(isolation_level=None) as conn:
+            cursor = conn.cursor()
+            # 取り出しと実行中への変更の間に他から取り出されないよう書き込みロックを取る
+            cursor.execute("BEGIN IMMEDIATE;")
+            try:
+                cursor.execute(
+                    "SELECT job_id, job_type, payload, attempts FROM JobTbl "
+                    "WHERE status='queued' AND run_after <= JULIANDAY('now') "
+                    "ORDER BY priority DESC, job_id LIMIT 1;"
+                )
+                row = cursor.fetchone()
+                if row is not None:
+                    cursor.execute(
+                        "UPDATE JobTbl SET status='running', "
+                        "attempts=attempts + 1, "
+                        "updated_at=DATETIME('now', 'localtime') "
+                        "WHERE job_id=?;",
+                        (row[0],),
+                    )
+                cursor.execute("COMMIT;")
+            except BaseException:
+                cursor.execute("ROLLBACK;")
+                raise
+        if row is None:
+            return None
+        job_id, job_type, payload, attempts = row
+        return job_id, job_type, json.loads(payload), attempts + 1
+
+    def complete_job(self, job_id: int, result=None) -> None:
+        """
+        ジョブを完了にします。
+
+        Args:
+            job_id (int): ジョブID。
+            result (Any, optional): 処理結果（JSONに変換できる値）。
+        """
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "UPDATE JobTbl SET status='done', result=?, last_error=NULL, "
+                "updated_at=DATETIME('now', 'localtime') WHERE job_id=?;",
+                (json.dumps(result), job_id),
+            )
+
+    def fail_job(
+        self, job_id: int, error: str, retry_delay: float | None = None
+    ) -> None:
+        """
+        ジョブの失敗を保存します。
+
+        Args:
+            job_id (int): ジョブID。
+            error (str): エラーの内容。
+            retry_delay (float | None, optional): 再試行までの待ち時間（秒）。
+                Noneの場合は再試行せず失敗にする。
+        """
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            if retry_delay is None:
+                cursor.execute(
+                    "UPDATE JobTbl SET status='failed', last_error=?, "
+                    "updated_at=DATETIME('now', 'localtime') "
+                    "WHERE job_id=?;",
+                    (error, job_id),
+                )
+            else:
+                cursor.execute(
+                    "UPDATE JobTbl SET status='queued', last_error=?, "
+                    "run_after=JULIANDAY('now') + ? / 86400.0, "
+                    "updated_at=DATETIME('now', 'localtime') "
+                    "WHERE job_id=?;",
+                    (error, retry_delay, job_id),
+                )
+
+    def release_job(self, job_id: int) -> None:
+        """
+        中断した実行中のジョブを作成待ちに戻します。中断した実行は回数に数えません。
+
+        Args:
+            job_id (int): ジョブID。
+        """
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "UPDATE JobTbl SET status='queued', "
+                "attempts=MAX(attempts - 1, 0), "
+                "updated_at=DATETIME('now', 'localtime') "
+                "WHERE job_id=? AND status='running';",
+                (job_id,),
+            )
+
+    def reset_jobs(self, max_attempts: int) -> int:
+        """
+        前回の終了時に実行中だったジョブを作成待ちに戻します。
+
+        異常終了などで中断した実行も回数に数え、実行回数が上限に達したものは
+        繰り返しアプリケーションを止めないよう失敗にします。
+
+        Args:
+            max_attempts (int): 実行回数の上限。
+
+        Returns:
+            int: 作成待ちに戻した数。
+        """
+        with self._connect(isolation_level=None) as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE;")
+            try:
+                cursor.execute(
+                    "UPDATE JobTbl SET status='failed', "
+                    "last_error='interrupted' "
+                    "WHERE status='running' AND attempts >= ?;",
+                    (max_attempts,),
+                )
+                cursor.execute(
+                    "UPDATE JobTbl SET status='queued' WHERE status='running';"
+                )
+                count = cursor.rowcount
+                cursor.execute("COMMIT;")
+            except BaseException:
+                cursor.execute("ROLLBACK;")
+                raise
+        return count
+
+    def retry_failed_jobs(self) -> int:
+        """
+        失敗したジョブの実行回数を戻して作成待ちにします。
+
+        Returns:
+            int: 作成待ちに戻した数。
+        """
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "UPDATE JobTbl SET status='queued', attempts=0, run_after=0, "
+                "updated_at=DATETIME('now', 'localtime') "
+                "WHERE status='failed';"
+            )
+            return cursor.rowcount
+
+    def cancel_queued_jobs(self) -> int:
+        """
+        作成待ちのジョブを削除します。実行中のジョブはそのまま実行します。
+
+        Returns:
+            int: 削除した数。
+        """
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM JobTbl WHERE status='queued';")
+            return cursor.rowcount
+
+    def delete_finished_jobs(self) -> int:
+        """
+        完了したジョブを削除します。
+
+        Returns:
+            int: 削除した数。
+        """
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM JobTbl WHERE status='done';")
+            return cursor.rowcount
+
+    def count_jobs(self, job_type: str | None = None) -> dict:
+        """
+        状態ごとのジョブの数を取得します。
+
+        Args:
+            job_type (str | None, optional): ジョブの種類。指定がない場合はすべて。
+
+        Returns:
+            dict: 状態をキー、数を値とする辞書。
+        """
+        sql = "SELECT status, COUNT(*) FROM JobTbl "
+        params: tuple = ()
+        if job_type is not None:
+            sql += "WHERE job_type=? "
+            params = (job_type,)
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql + "GROUP BY status;", params)
+            return dict(cursor.fetchall())
+
+    def get_next_job_delay(self) -> float | None:
+        """
+        再試行を待っているジョブを取り出せるようになるまでの時間を取得します。
+
+        Returns:
+            float | None: 時間（秒）。作成待ちのジョブがない場合はNone。
+        """
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT (MIN(run_after) - JULIANDAY('now')) * 86400.0 "
+                "FROM JobTbl WHERE status='queued';"
+            )
+            delay = cursor.fetchone()[0]
+        return None if delay is None else max(0.0, delay)
+
+    def get_jobs(self, limit: int = 200) -> list:
+        """
+        ジョブの一覧を取得します。実行中、作成待ち、失敗、完了の順に並べます。
+
+        Args:
+            limit (int, optional): 取得する数の上限。
+
+        Returns:
+            list: `(job_id, job_type, payload, status, attempts, last_error,
+            updated_at)` のタプルのリスト。
+        """
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT job_id, job_type, payload, status, attempts, "
+                "last_error, updated_at FROM JobTbl "
+                "ORDER BY CASE status WHEN 'running' THEN 0 "
+                "WHEN 'queued' THEN 1 WHEN 'failed' THEN 2 ELSE 3 END, "
+                "CASE WHEN status='done' THEN -job_id ELSE 0 END, "
+                "priority DESC, job_id LIMIT ?;",
+                (limit,),
+            )
+            return [
+                (job_id, job_type, json.loads(payload), *rest)
+                for job_id, job_type, payload, *rest in cursor.fetchall()
+            ]
+
+    def get_all_ids(self) -> set:
+        """
+        削除マークの有無に関わらず、すべてのレコードのIDを取得します。
+
+        Returns:
+            set: IDの集合。
+        """
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT id FROM {self.table_name};")
+            return {row[0] for row in cursor.fetchall()}
+
+    def _to_signed64(self, value: int) -> int:
+        """
+        64ビットの符号なし整数をSQLiteに格納できる符号付き整数に変換します。
+
+        Args:
+            value (int): 符号なし整数。
+
+        Returns:
+            int: 符号付き整数。
+        """
+        value &= 0xFFFFFFFFFFFFFFFF
+        return value - (1 << 64) if value >= 1 << 63 else value
+
+    def _to_dict_rows(self, table_columns: list, data: list) -> list:
+        """
+        取得したレコードを、値を文字列に変換した辞書のリストに変換します。
+
+        Args:
+            table_columns (list): `PRAGMA TABLE_INFO` の結果。
+            data (list): 取得したレコードのリスト。
+
+        Returns:
+            list: 各レコードを辞書に変換したリスト。
+        """
+        ret_data = []
+        for d in data:
+            dict_data = {}
+            for index, col in enumerate(table_columns):
+                if isinstance(d[index], str):
+                    dict_data[col[1]] = d[index]
+                if isinstance(d[index], int):
+                    dict_data[col[1]] = str(d[index])
+            ret_data.append(dict_data)
+        return ret_data
+
+    def _cache_key(
+        self,
+        kind: str,
+        column: str | None = None,
+        keyword: str | None = None,
+        sort: str = "id ASC",
+        page: int | None = None,
+    ) -> tuple:
+        """
+        検索結果キャッシュのキーを生成します。
+
+        カラムまたはキーワードが空の場合は全件検索として同じキーに正規化します。
+
+        Args:
+            kind (str): クエリの種別。
+            column (str | None): 検索対象のカラム名。
+            keyword (str | None): 検索キーワード。
+            sort (str): 並び順。
+            page (int | None): ページ番号。
+
+        Returns:
+            tuple: キャッシュのキー。
+        """
+        column = (column or "").strip().lower()
+        keyword = keyword or ""
+        if kind != "count" and (not column or not keyword):
+            column, keyword = "", ""
+        return (kind, column, keyword, sort, page)
+
+    def _cache_get(self, key: tuple) -> tuple[int, list | None]:
+        """
+        検索結果キャッシュからエントリを取得します。
+
+        Args:
+            key (tuple): キャッシュのキー。
+
+        Returns:
+            tuple[int, list | None]: 現在の書き込み世代と、キャッシュされた結果の複製。
+            有効なエントリが無い場合の結果はNone。
+        """
+        with self._cache_lock:
+            self._check_data_version()
+            generation = self._write_generation
+            entry = self._query_cache.get(key)
+            if entry is None:
+                return generation, None
+            entry_generation, data = entry
+            if entry_generation != generation:
+                self._cache_remove(key)
+                return generation, None
+            self._query_cache.move_to_end(key)
+            return generation, list(data)
+
+    def _cache_put(self, key: tuple, generation: int, data: list) -> None:
+        """
+        検索結果をキャッシュに登録します。
+
+        取得中に書き込みが発生していた場合（世代が異なる場合）は登録しません。
+
+        Args:
+            key (tuple): キャッシュのキー。
+            generation (int): 取得開始時の書き込み世代。
+            data (list): 検索結果。
+
+        Returns:
+            None
+        """
+        if len(data) > self.__class__.QUERY_CACHE_MAX_ROWS:
+            return
+        with self._cache_lock:
+            if generation != self._write_generation:
+                return
+            self._cache_remove(key)
+            self._query_cache[key] = (generation, list(data))
+            self._query_cache_rows += len(data)
+            # 上限を超えた分を古いものから破棄
+            while (
+                len(self._query_cache) > self.__class__.QUERY_CACHE_SIZE
+                or self._query_cache_rows
+                > self.__class__.QUERY_CACHE_MAX_ROWS
+            ):
+                old_key = next(iter(self._query_cache))
+                self._cache_remove(old_key)
+
+    def _cache_remove(self, key: tuple) -> None:
+        """
+        検索結果キャッシュからエントリを削除します。呼び出し側でロックを取得すること。
+
+        Args:
+            key (tuple): キャッシュのキー。
+
+        Returns:
+            None
+        """
+        entry = self._query_cache.pop(key, None)
+        if entry is not None:
+            self._query_cache_rows -= len(entry[1])
+
+    def _bump_write_generation(self) -> None:
+        """
+        書き込み世代を進め、検索結果キャッシュを無効化します。
+
+        Returns:
+            None
+        """
+        with self._cache_lock:
+            self._write_generation += 1
+            self._query_cache.clear()
+            self._query_cache_rows = 0
+
+    def _check_data_version(self) -> None:
+        """
+        `PRAGMA data_version` を確認し、他の接続（他プロセスを含む）による
+        書き込みを検出した場合は書き込み世代を進めます。呼び出し側でロックを取得すること。
+
+        Returns:
+            None
+        """
+        try:
+            if self._monitor_conn is None:
+                self._monitor_conn = sqlite3.connect(
+                    self.db_file_path,
+                    isolation_level=None,
+                    check_same_thread=False,
+                )
+            cursor = self._monitor_conn.execute("PRAGMA data_version;")
+            data_version = cursor.fetchone()[0]
+        except sqlite3.Error:
+            # 確認できない場合はキャッシュを使用しない
+            self._write_generation += 1
+            self._query_cache.clear()
+            self._query_cache_rows = 0
+            return
+
+        if data_version != self._data_version:
+            self._data_version = data_version
+            self._write_generation += 1
+            self._query_cache.clear()
+            self._query_cache_rows = 0
@@ -0,0 +1,196 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from itertools import combinations
+
+import numpy as np
+
+# 近い動画とみなすハッシュのハミング距離の上限。
+DEFAULT_RADIUS = 7
+# 重複候補とみなす一致フレーム数。
+DEFAULT_MIN_MATCHES = 2
+# 1のビット数がこの値以下、または 64 - この値以上のハッシュは
+# 単色の画面などで情報量が少ないため比較に使用しない。
+LOW_INFORMATION_BITS = 4
+# マルチインデックスの分割数（64ビットを16ビットずつに分ける）。
+INDEX_CHUNKS = 4
+
+_CHUNK_BITS = 64 // INDEX_CHUNKS
+# 8ビット値ごとの1のビット数。
+_POPCOUNT8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _popcount64(values: np.ndarray) -> np.ndarray:
+    """
+    uint64配列の各要素の1のビット数を求める関数。
+
+    Args:
+        values (np.ndarray): uint64の配列。
+
+    Returns:
+        np.ndarray: 1のビット数の配列。
+    """
+    return _POPCOUNT8[values.view(np.uint8).reshape(-1, 8)].sum(axis=1)
+
+
+def _flip_masks(radius: int) -> list:
+    """
+    部分値の距離が `radius` 以内となる反転マスクの一覧を求める関数。
+
+    Args:
+        radius (int): 部分値のハミング距離の上限。
+
+    Returns:
+        list: 反転マスクのリスト。
+    """
+    masks = [0]
+    for r in range(1, min(radius, _CHUNK_BITS) + 1):
+        for bits in combinations(range(_CHUNK_BITS), r):
+            masks.append(sum(1 << bit for bit in bits))
+    return masks
+
+
+def find_near_pairs(keys: np.ndarray, radius: int) -> np.ndarray:
+    """
+    ハミング距離が `radius` 以内のハッシュ値の組を求める関数。
+
+    マルチインデックスハッシュの考え方で、ハッシュ値を `INDEX_CHUNKS` 個の部分に
+    分けます。距離が `radius` 以内の2つの値は、鳩の巣原理によりいずれかの部分の
+    距離が `radius // INDEX_CHUNKS` 以内になるため、部分値でソートした配列を
+    二分探索して候補を求めます。全件の総当たりは行いません。
+
+    Args:
+        keys (np.ndarray): uint64のハッシュ値の配列。
+        radius (int): ハミング距離の上限。
+
+    Returns:
+        np.ndarray: `keys` の添字の組 `(i, j)`（i < j）の `(n, 2)` 配列。
+    """
+    keys = np.asarray(keys, dtype=np.uint64)
+    pairs = [np.empty((0, 2), dtype=np.int64)]
+    masks = _flip_masks(radius // INDEX_CHUNKS)
+    chunk_mask = np.uint64((1 << _CHUNK_BITS) - 1)
+    for chunk in range(INDEX_CHUNKS):
+        shift = np.uint64(chunk * _CHUNK_BITS)
+        parts = ((keys >> shift) & chunk_mask).astype(np.int64)
+        order = np.argsort(parts, kind="stable")
+        sorted_parts = parts[order]
+        for mask in masks:
+            query = parts ^ mask
+            left = np.searchsorted(sorted_parts, query, side="left")
+            right = np.searchsorted(sorted_parts, query, side="right")
+            counts = right - left
+            total = int(counts.sum())
+            if total == 0:
+                continue
+            # 問い合わせごとの一致範囲を展開する
+            i = np.repeat(np.arange(len(keys)), counts)
+            offsets = np.arange(total) - np.repeat(
+                np.cumsum(counts) - counts, counts
+            )
+            j = order[np.repeat(left, counts) + offsets]
+            keep = i < j
+            i, j = i[keep], j[keep]
+            near = _popcount64(keys[i] ^ keys[j]) <= radius
+            pairs.append(np.stack((i[near], j[near]), axis=1))
+    return np.unique(np.concatenate(pairs), axis=0)
+
+
+def find_duplicate_groups(
+    hashes: dict,
+    radius: int = DEFAULT_RADIUS,
+    min_matches: int = DEFAULT_MIN_MATCHES,
+) -> list:
+    """
+    フレームの知覚ハッシュから重複候補の動画のグループを求める関数。
+
+    近いフレームの組を `find_near_pairs` で求めるため、動画どうしを総当たりで
+    比較しません。一方の動画で近いフレームをもつフレームが `min_matches` 以上ある
+    動画の組を同じグループとします。再エンコードやコンテナの違いに加えて、
+    一部を切り取った動画もフレーム位置に関係なく検出できます。
+
+    Args:
+        hashes (dict): IDをキー、フレームのハッシュ値のリストを値とする辞書。
+        radius (int, optional): 一致とみなすハミング距離の上限。
+        min_matches (int, optional): 重複候補とみなす一致フレーム数。
+            フレーム数がこれより少ない動画はそのフレーム数とする。
+
+    Returns:
+        list: IDのリスト（昇順）のリスト。大きいグループから順に並べる。
+    """
+    keys: list[int] = []
+    owners: list[int] = []
+    frame_counts: dict[int, int] = {}
+    for media_id, frame_hashes in hashes.items():
+        informative = {
+            h
+            for h in frame_hashes
+            if LOW_INFORMATION_BITS < h.bit_count() < 64 - LOW_INFORMATION_BITS
+        }
+        frame_counts[media_id] = len(informative)
+        keys.extend(informative)
+        owners.extend([media_id] * len(informative))
+    if not keys:
+        return []
+
+    owner_array = np.array(owners, dtype=np.int64)
+    pairs = find_near_pairs(np.array(keys, dtype=np.uint64), radius)
+    # 両方向の (フレーム, 相手の動画) の組を求め、動画の組ごとに数える
+    frames = np.concatenate((pairs[:, 0], pairs[:, 1]))
+    others = owner_array[np.concatenate((pairs[:, 1], pairs[:, 0]))]
+    keep = owner_array[frames] != others
+    frame_other = np.unique(
+        np.stack((frames[keep], others[keep]), axis=1), axis=0
+    )
+    video_pairs, counts = np.unique(
+        np.stack((owner_array[frame_other[:, 0]], frame_other[:, 1]), axis=1),
+        axis=0,
+        return_counts=True,
+    )
+
+    # Union-Findでグループにまとめる
+    parent: dict[int, int] = {}
+
+    def find(x):
+        root = x
+        while parent[root] != root:
+            root = parent[root]
+        while parent[x] != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    for (a, b), count in zip(video_pairs.tolist(), counts.tolist()):
+        required = min(min_matches, frame_counts[a], frame_counts[b])
+        if count < max(required, 1):
+            continue
+        parent.setdefault(a, a)
+        parent.setdefault(b, b)
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    groups: dict[int, list] = {}
+    for media_id in parent:
+        groups.setdefault(find(media_id), []).append(media_id)
+    return sorted(
+        (sorted(ids) for ids in groups.values() if len(ids) > 1),
+        key=lambda ids: (-len(ids), ids[0]),
+    )
+
+
+def format_duplicate_report(groups: list, titles: dict) -> str:
+    """
+    重複候補のグループを一覧形式の文字列にする関数。
+
+    Args:
+        groups (list): `find_duplicate_groups` が返すグループのリスト。
+        titles (dict): IDをキー、タイトルを値とする辞書。
+
+    Returns:
+        str: 一覧形式の文字列。
+    """
+    lines = []
+    for index, ids in enumerate(groups, 1):
+        lines.append(f"#{index}")
+        for media_id in ids:
+            lines.append(f"  id{media_id} {titles.get(media_id, '')}")
+    return "\n".join(lines)
@@ -0,0 +1,297 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import contextlib
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+import ffmpeg
+
+logger = logging.getLogger(__name__)
+
+
+def spawn_process(args: list, nice: int = 0, **kwargs) -> subprocess.Popen:
+    """
+    サブプロセスを低い優先度で起動する関数。
+
+    Args:
+        args (list): コマンドライン。
+        nice (int, optional): nice値の増分。0の場合は優先度を変更しない。
+            Windowsでは0より大きい場合に「通常以下」の優先度にする。
+        **kwargs: `subprocess.Popen` に渡す追加の引数。
+
+    Returns:
+        subprocess.Popen: 起動したプロセス。
+    """
+    # 型チェックでもWindows以外では優先度クラスを参照しないよう判定する
+    if sys.platform == "win32":
+        if nice > 0:
+            kwargs["creationflags"] = subprocess.BELOW_NORMAL_PRIORITY_CLASS
+    process = subprocess.Popen(args, **kwargs)
+    if nice > 0 and hasattr(os, "setpriority"):
+        # スレッドから安全に起動するため `preexec_fn` は使用しない
+        try:
+            os.setpriority(
+                os.PRIO_PROCESS,
+                process.pid,
+                min(os.getpriority(os.PRIO_PROCESS, 0) + nice, 19),
+            )
+        except OSError:
+            pass
+    return process
+
+
+class FFmpegGovernor:
+    """
+    ffmpeg・ffprobeのサブプロセスの同時実行数を調整するクラス。
+
+    このクラスはシングルトンパターンを用いて実装されています。
+    同時実行数はAIMD（加算増加・乗算減少）で調整します。一定時間ごとに
+    処理速度を求め、実行待ちがあり処理速度が向上し続けている間は
+    1つずつ増やし、ロードアベレージや処理時間が上昇した場合は半分に減らします。
+    ffprobeとスプライト画像の作成のように処理時間が大きく異なる処理が
+    混在しても判断を誤らないよう、処理時間は処理の種類ごとの最小値と比較し、
+    処理速度は処理の種類ごとの最小の処理時間を作業量として合計します。
+    サブプロセスはGUIの応答性を保つため低い優先度（nice値）で実行します。
+    調整の内容はログに出力します。
+    """
+
+    _instance = None
+
+    # 同時実行数を見直す間隔（秒）。
+    WINDOW_SECONDS = 5.0
+    # 同時実行数を減らすロードアベレージ（CPUあたり）。
+    LOAD_HIGH = 1.0
+    # 同時実行数を減らす処理時間の上昇率（同じ種類の処理のこれまでの最小値に
+    # 対する倍率）。
+    LATENCY_FACTOR = 2.0
+    # 処理の種類の既定値。
+    DEFAULT_KIND = "ffmpeg"
+    # 同時実行数を増やす処理速度の向上率。
+    IMPROVEMENT = 1.05
+
+    def __new__(cls, *args, **kwargs):
+        """
+        シングルトンインスタンスを生成するメソッド。
+
+        Returns:
+            FFmpegGovernor: FFmpegGovernorクラスの唯一のインスタンス。
+        """
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self, max_jobs: int = 0, nice: int = 10):
+        """
+        コンストラクタ。
+
+        Args:
+            max_jobs (int, optional): 同時実行数の上限。0の場合はCPU数。
+            nice (int, optional): サブプロセスのnice値の増分。0の場合は変更しない。
+        """
+        if not hasattr(self, "_initialized"):
+            self._initialized = True
+        else:
+            return
+
+        self.max_jobs = max_jobs if max_jobs > 0 else os.cpu_count() or 1
+        self.nice = max(0, nice)
+        self.limit = 1
+
+        self._cond = threading.Condition()
+        self._active = 0
+        # 実行待ちが発生したかどうか（同時実行数を増やす意味があるか）
+        self._saturated = False
+        self._window_start = time.monotonic()
+        # 処理の種類ごとの処理時間（見直しの間隔ごとにクリアする）
+        self._latencies: dict[str, list[float]] = {}
+        self._last_throughput = 0.0
+        # 処理の種類ごとのこれまでの処理時間の中央値の最小値
+        self._base_latency: dict[str, float] = {}
+
+    @contextlib.contextmanager
+    def slot(self, kind: str = DEFAULT_KIND):
+        """
+        実行枠を取得します。同時実行数に達している場合は空くまで待機します。
+
+        `with` 文で使用し、ブロックの所要時間を同時実行数の調整に使用します。
+
+        Args:
+            kind (str, optional): 処理の種類。処理時間は同じ種類どうしで比較する。
+        """
+        with self._cond:
+            if self._active >= self.limit:
+                self._saturated = True
+            while self._active >= self.limit:
+                self._cond.wait()
+            self._active += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._cond:
+                self._active -= 1
+                self._observe(kind, elapsed)
+                self._cond.notify_all()
+
+    def _load(self) -> float | None:
+        try:
+            return os.getloadavg()[0] / (os.cpu_count() or 1)
+        except (AttributeError, OSError):
+            # Windowsではロードアベレージを取得できない
+            return None
+
+    def _observe(self, kind: str, elapsed: float) -> None:
+        """
+        処理時間を記録し、一定時間ごとに同時実行数を見直します。
+
+        ロックを取得した状態で呼び出します。
+
+        Args:
+            kind (str): 処理の種類。
+            elapsed (float): 処理時間（秒）。
+        """
+        self._latencies.setdefault(kind, []).append(elapsed)
+        now = time.monotonic()
+        window = now - self._window_start
+        if window < self.__class__.WINDOW_SECONDS:
+            return
+
+        # 処理の種類ごとに、これまでの最小値と比べて処理時間が上昇したか調べる
+        latencies = {}
+        rising = []
+        for k, values in self._latencies.items():
+            latency = statistics.median(values)
+            latencies[k] = latency
+            base = self._base_latency.get(k)
+            if base is None or latency < base:
+                self._base_latency[k] = base = latency
+            if latency > base * self.__class__.LATENCY_FACTOR:
+                rising.append(k)
+        # 1件を最小の処理時間分の作業とみなし、1秒あたりの作業量を処理速度とする
+        throughput = (
+            sum(
+                self._base_latency[k] * len(values)
+                for k, values in self._latencies.items()
+            )
+            / window
+        )
+        load = self._load()
+
+        limit = self.limit
+        if limit > 1 and load is not None and load > self.__class__.LOAD_HIGH:
+            limit, reason = max(1, limit // 2), "load average is high"
+        elif limit > 1 and rising:
+            limit, reason = (
+                max(1, limit // 2),
+                f"latency is rising ({', '.join(sorted(rising))})",
+            )
+        elif (
+            self._saturated
+            and limit < self.max_jobs
+            and throughput > self._last_throughput * self.__class__.IMPROVEMENT
+        ):
+            limit, reason = limit + 1, "throughput is improving"
+        else:
+            reason = "hold"
+
+        p50 = ", ".join(
+            f"{k} {latency * 1e3:.0f} ms"
+            for k, latency in sorted(latencies.items())
+        )
+        message = (
+            f"ffmpeg governor: {throughput:.2f} work/s, "
+            f"p50 {p50}, "
+            f"load {'-' if load is None else f'{load:.2f}'}/cpu, "
+            f"jobs {self.limit} -> {limit} ({reason})"
+        )
+        if limit != self.limit:
+            logger.info(message)
+        else:
+            logger.debug(message)
+
+        self.limit = limit
+        self._last_throughput = throughput
+        self._saturated = False
+        self._latencies = {}
+        self._window_start = now
+
+    def run(
+        self,
+        stream,
+        capture_stdout: bool = False,
+        capture_stderr: bool = False,
+        input: bytes | None = None,
+        overwrite_output: bool = False,
+        kind: str = DEFAULT_KIND,
+    ) -> tuple:
+        """
+        ffmpeg-pythonのストリームを実行します。
+
+        `stream.run()` と同じ引数と戻り値で、実行枠の取得と優先度の変更を行います。
+
+        Args:
+            stream: ffmpeg-pythonのストリーム。
+            capture_stdout (bool, optional): 標準出力を取得する。
+            capture_stderr (bool, optional): 標準エラー出力を取得する。
+            input (bytes | None, optional): 標準入力に渡すデータ。
+            overwrite_output (bool, optional): 出力ファイルを上書きする。
+            kind (str, optional): 処理の種類。処理時間は同じ種類どうしで比較する。
+
+        Returns:
+            tuple: `(標準出力, 標準エラー出力)`。
+
+        Raises:
+            ffmpeg.Error: ffmpegが異常終了した場合。
+        """
+        args = ffmpeg.compile(stream, overwrite_output=overwrite_output)
+        with self.slot(kind):
+            process = spawn_process(
+                args,
+                self.nice,
+                stdin=subprocess.PIPE if input is not None else None,
+                stdout=subprocess.PIPE if capture_stdout else None,
+                stderr=subprocess.PIPE if capture_stderr else None,
+            )
+            out, err = process.communicate(input)
+        if process.returncode != 0:
+            raise ffmpeg.Error("ffmpeg", out, err)
+        return out, err
+
+    def probe(self, file_path: str) -> dict:
+        """
+        ffprobeでメディアファイルの情報を取得します。
+
+        `ffmpeg.probe()` と同じ戻り値で、実行枠の取得と優先度の変更を行います。
+
+        Args:
+            file_path (str): メディアファイルのパス。
+
+        Returns:
+            dict: ffprobeのJSON出力。
+
+        Raises:
+            ffmpeg.Error: ffprobeが異常終了した場合。
+        """
+        args = [
+            "ffprobe",
+            "-show_format",
+            "-show_streams",
+            "-of",
+            "json",
+            file_path,
+        ]
+        with self.slot("probe"):
+            process = spawn_process(
+                args, self.nice, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+            )
+            out, err = process.communicate()
+        if process.returncode != 0:
+            raise ffmpeg.Error("ffprobe", out, err)
+        return json.loads(out.decode("utf-8"))
@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import logging
+import re
+
+import ffmpeg
+import numpy as np
+from pkg.metrics import track
+
+from . import pyav_backend
+from .ffmpeg_governor import FFmpegGovernor
+from .media_info import MEDIA_BACKEND_PYAV, get_media_backend
+
+logger = logging.getLogger(__name__)
+
+# 候補のフレームを評価する縮小画像のサイズ。
+ANALYSIS_WIDTH = 64
+ANALYSIS_HEIGHT = 36
+# 候補のフレーム数。
+DEFAULT_CANDIDATES = 8
+# 候補にする区間（再生時間に対する割合）。先頭のロゴや末尾のクレジットを避ける。
+CANDIDATE_START = 0.1
+CANDIDATE_END = 0.9
+# エントロピーを求めるヒストグラムのビン数。
+HISTOGRAM_BINS = 32
+# 黒画面・白画面とみなす平均輝度。
+DARK_LEVEL = 24
+BRIGHT_LEVEL = 232
+# 候補を選べなかった場合のキャプチャ時刻（秒）。
+FALLBACK_TIME = 1.0
+
+# `showinfo` フィルターの出力からフィルターの番号と時刻を取り出す正規表現。
+_SHOWINFO_PATTERN = re.compile(
+    r"Parsed_showinfo_(\d+) .*? n: *0 .*?pts_time:(-?[\d.]+)"
+)
+
+
+def get_candidate_times(
+    duration: float, candidates: int = DEFAULT_CANDIDATES
+) -> list:
+    """
+    代表フレームの候補の時刻を求める関数。
+
+    Args:
+        duration (float): 再生時間（秒）。
+        candidates (int, optional): 候補のフレーム数。
+
+    Returns:
+        list: 時刻（秒）のリスト。再生時間が不明な場合は空のリスト。
+    """
+    if duration <= 0 or candidates <= 0:
+        return []
+    start = duration * CANDIDATE_START
+    span = duration * (CANDIDATE_END - CANDIDATE_START)
+    return [start + span * (i + 0.5) / candidates for i in range(candidates)]
+
+
+def grab_small_frames(
+    file_path: str,
+    times: list,
+    width: int = ANALYSIS_WIDTH,
+    height: int = ANALYSIS_HEIGHT,
+    kind: str = "frame_select",
+) -> tuple:
+    """
+    指定時刻の直前のキーフレームを縮小したグレースケール画像として取得する関数。
+
+    代表フレームの候補の評価と知覚ハッシュの計算で使用します。
+
+    正確な時刻までデコードせず、シークした位置のキーフレームだけをデコードします。
+    PyAVを使用できる場合はプロセスを起動せずにデコードします。ffmpegの場合は
+    時刻ごとに `-ss` を指定した入力を `concat` フィルターでつなぎ、1回の実行で
+    すべての候補を `rawvideo` としてパイプで受け取ります。キーフレームの時刻は
+    `showinfo` フィルターの出力から求めます。
+
+    Args:
+        file_path (str): 動画ファイルのパス。
+        times (list): 時刻（秒）のリスト。
+        width (int, optional): 縮小後の幅。
+        height (int, optional): 縮小後の高さ。
+        kind (str, optional): `FFmpegGovernor` の処理の種類。
+
+    Returns:
+        tuple: `(キーフレームの時刻のリスト, (フレーム数, height, width) の
+        uint8配列)`。
+    """
+    empty = np.empty((0, height, width), dtype=np.uint8)
+    if not times:
+        return [], empty
+
+    if get_media_backend() == MEDIA_BACKEND_PYAV:
+        try:
+            return pyav_backend.grab_keyframes(file_path, times, width, height)
+        except pyav_backend.PYAV_ERRORS as e:
+            logger.warning(f"PyAV could not decode {file_path}: {e}")
+            pyav_backend.release()
+
+    streams = [
+        ffmpeg.input(
+            file_path, ss=time, skip_frame="nokey", noaccurate_seek=None
+        )
+        .video.filter("scale", width, height, flags="area")
+        .filter("setsar", "1")
+        .filter("trim", end_frame=1)
+        .filter("showinfo")
+        for time in times
+    ]
+    try:
+        with track(f"ffmpeg.grab_frames.{kind}"):
+            out, err = FFmpegGovernor().run(
+                ffmpeg
+                .concat(*streams, v=1, a=0)
+                .output(
+                    "pipe:",
+                    format="rawvideo",
+                    pix_fmt="gray",
+                    fps_mode="passthrough",
+                ),
+                capture_stdout=True,
+                capture_stderr=True,
+                kind=kind,
+            )
+    except ffmpeg.Error as e:
+        logger.error(f"Error grabbing frames: {e}")
+        return [], empty
+
+    # 時刻はシーク位置からの相対時刻で、フィルターの番号は入力の順になる
+    offsets = [
+        float(pts_time)
+        for _, pts_time in sorted(
+            (int(number), pts_time)
+            for number, pts_time in _SHOWINFO_PATTERN.findall(
+                err.decode("utf-8", errors="replace")
+            )
+        )
+    ]
+    frame_size = width * height
+    count = len(out) // frame_size
+    if count != len(times) or len(offsets) != len(times):
+        # 末尾を越えた時刻などフレームがない入力があると対応が分からない
+        logger.debug(f"{len(times) - count} frames were missing: {file_path}")
+        return [], empty
+    frames = np.frombuffer(out, dtype=np.uint8)[: count * frame_size]
+    return [
+        max(0.0, time + offset) for time, offset in zip(times, offsets)
+    ], frames.reshape(count, height, width)
+
+
+def score_frames(frames: np.ndarray) -> np.ndarray:
+    """
+    縮小画像の代表フレームとしての評価値を求める関数。
+
+    すべてのフレームについてまとめて、明るさ（中間の明るさほど高い）、
+    コントラスト（輝度の標準偏差）、エントロピー（輝度のヒストグラムの情報量）を
+    0〜1に正規化して合計します。黒画面や白画面は選ばれないよう減点します。
+
+    Args:
+        frames (np.ndarray): `(フレーム数, 高さ, 幅)` のuint8配列。
+
+    Returns:
+        np.ndarray: フレームごとの評価値。
+    """
+    count = len(frames)
+    if count == 0:
+        return np.empty(0)
+    pixels = frames.reshape(count, -1)
+    mean = pixels.mean(axis=1)
+    std = pixels.std(axis=1)
+
+    # フレームごとのヒストグラムを1回の `bincount` で求める
+    bins = (pixels.astype(np.intp) * HISTOGRAM_BINS) >> 8
+    bins += np.arange(count)[:, None] * HISTOGRAM_BINS
+    histogram = np.bincount(
+        bins.ravel(), minlength=count * HISTOGRAM_BINS
+    ).reshape(count, HISTOGRAM_BINS)
+    p = histogram / pixels.shape[1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        entropy = -np.where(p > 0, p * np.log2(p), 0.0).sum(axis=1)
+
+    brightness = 1.0 - np.abs(mean - 128.0) / 128.0
+    contrast = np.minimum(std / 64.0, 1.0)
+    entropy = entropy / np.log2(HISTOGRAM_BINS)
+    score = brightness + contrast + entropy
+    score[(mean < DARK_LEVEL) | (mean > BRIGHT_LEVEL)] -= 3.0
+    return score
+
+
+def select_representative_time(
+    file_path: str, duration: float, candidates: int = DEFAULT_CANDIDATES
+) -> float:
+    """
+    動画の代表フレームとしてキャプチャする時刻を選ぶ関数。
+
+    候補のフレームを縮小画像で評価し、最も評価の高い時刻を返します。
+    フルサイズのデコードとエンコードは選ばれたフレームだけで行います。
+
+    Args:
+        file_path (str): 動画ファイルのパス。
+        duration (float): 再生時間（秒）。
+        candidates (int, optional): 候補のフレーム数。
+
+    Returns:
+        float: キャプチャする時刻（秒）。候補を取得できない場合は
+        `FALLBACK_TIME`。
+    """
+    times, frames = grab_small_frames(
+        file_path, get_candidate_times(duration, candidates)
+    )
+    if not times:
+        return FALLBACK_TIME
+    scores = score_frames(frames)
+    best = int(np.argmax(scores))
+    logger.debug(
+        f"representative frame of {file_path}: {times[best]:.2f} s "
+        f"(score {scores[best]:.2f})"
+    )
+    return times[best]
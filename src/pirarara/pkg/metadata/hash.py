@@ -1,9 +1,142 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 import hashlib
+import logging
+import mmap
+import os
+import threading
+import time
+from typing import Callable
 
+from pkg.metrics import timed
 
-def get_file_hash(file_path: str, algo: str = "sha256") -> str:
+logger = logging.getLogger(__name__)
+
+# 1回に読み込むバイト数の既定値。
+DEFAULT_BLOCK_SIZE = 1024 * 1024
+# 読み込み済みの範囲をページキャッシュから破棄する間隔（バイト）。
+DROP_CACHE_INTERVAL = 64 * 1024 * 1024
+
+# スレッドごとに再利用する読み込みバッファ
+_buffers = threading.local()
+
+
+def _get_buffer(size: int) -> memoryview:
+    """
+    スレッドごとに再利用する読み込みバッファを取得する関数。
+
+    バッファは無名の `mmap` で確保するため、ページ境界に揃っています。
+
+    Args:
+        size (int): バッファのサイズ（バイト）。
+
+    Returns:
+        memoryview: バッファ。
+    """
+    buffer = getattr(_buffers, "buffer", None)
+    if buffer is None or len(buffer) != size:
+        buffer = mmap.mmap(-1, size)
+        _buffers.buffer = buffer
+    return memoryview(buffer)
+
+
+def _fadvise(fd: int, offset: int, length: int, advice_name: str) -> None:
+    """
+    カーネルにファイルの読み込み方を通知する関数。
+
+    `os.posix_fadvise` がない環境（Windows、macOS）では何もしません。
+
+    Args:
+        fd (int): ファイルディスクリプタ。
+        offset (int): 範囲の先頭（バイト）。
+        length (int): 範囲の長さ（バイト）。0はファイルの末尾まで。
+        advice_name (str): `os` モジュールの `POSIX_FADV_*` の名前。
+    """
+    advice = getattr(os, advice_name, None)
+    if advice is None or not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        os.posix_fadvise(fd, offset, length, advice)
+    except OSError:
+        pass
+
+
+def hash_file(
+    file_path: str,
+    algo: str = "sha256",
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    throttle: Callable[[int], None] | None = None,
+    drop_cache: bool = False,
+) -> dict:
+    """
+    指定されたファイルのハッシュ値を計算し、読み込み速度とあわせて返す関数。
+
+    読み込みは再利用するバッファへの `readinto` で行い、チャンクごとに
+    bytesオブジェクトを生成しません。`posix_fadvise` で順次読み込みを通知します。
+    `drop_cache` を指定した場合は読み込み済みの範囲をページキャッシュから
+    破棄するため、ライブラリ全体を読む整合性チェックでも他のファイルの
+    キャッシュを追い出しません。直後に同じファイルを読み直すインポートでは
+    指定しないこと。
+
+    Args:
+        file_path (str): ハッシュ値を計算するファイルのパス
+        algo (str): 使用するハッシュアルゴリズム（デフォルトは 'sha256'）
+        block_size (int): 1回に読み込むバイト数
+        throttle (Callable[[int], None] | None): 読み込んだバイト数を受け取り、
+            読み込み速度を制限するために待機する関数
+        drop_cache (bool): Trueの場合、読み込み済みの範囲をページキャッシュから
+            破棄する
+
+    Returns:
+        dict: ハッシュ値（`hash`）、読み込んだバイト数（`bytes`）、
+        所要時間（`seconds`）、読み込み速度（`mb_per_s`）。
+
+    Raises:
+        FileNotFoundError: 指定されたファイルが存在しない場合
+    """
+    h_obj = hashlib.new(algo)
+    view = _get_buffer(block_size)
+    total = 0
+    dropped = 0
+
+    start = time.perf_counter()
+    # バッファリングせずにカーネルから直接バッファへ読み込む
+    with open(file_path, "rb", buffering=0) as file:
+        fd = file.fileno()
+        _fadvise(fd, 0, 0, "POSIX_FADV_SEQUENTIAL")
+        while size := file.readinto(view):
+            if throttle is not None:
+                throttle(size)
+            h_obj.update(view[:size])
+            total += size
+            if drop_cache and total - dropped >= DROP_CACHE_INTERVAL:
+                _fadvise(fd, dropped, total - dropped, "POSIX_FADV_DONTNEED")
+                dropped = total
+        if drop_cache:
+            _fadvise(fd, dropped, 0, "POSIX_FADV_DONTNEED")
+    seconds = time.perf_counter() - start
+
+    mb_per_s = total / 1e6 / seconds if seconds > 0 else 0.0
+    logger.debug(
+        f"hashed {file_path}: {total / 1e6:.1f} MB "
+        f"in {seconds:.2f} s ({mb_per_s:.1f} MB/s)"
+    )
+    return {
+        "hash": h_obj.hexdigest(),
+        "bytes": total,
+        "seconds": seconds,
+        "mb_per_s": mb_per_s,
+    }
+
+
+@timed("hash.get_file_hash")
+def get_file_hash(
+    file_path: str,
+    algo: str = "sha256",
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    throttle: Callable[[int], None] | None = None,
+    drop_cache: bool = False,
+) -> str:
     """
     指定されたファイルのハッシュ値を計算して返す関数。
 
@@ -13,6 +146,11 @@ def get_file_hash(file_path: str, algo: str = "sha256") -> str:
     Args:
         file_path (str): ハッシュ値を計算するファイルのパス
         algo (str): 使用するハッシュアルゴリズム（デフォルトは 'sha256'）
+        block_size (int): 1回に読み込むバイト数
+        throttle (Callable[[int], None] | None): 読み込んだバイト数を受け取り、
+            読み込み速度を制限するために待機する関数
+        drop_cache (bool): Trueの場合、読み込み済みの範囲をページキャッシュから
+            破棄する
 
     Returns:
         str: ファイルの内容に基づくハッシュ値（16進数の文字列）
@@ -20,16 +158,17 @@ def get_file_hash(file_path: str, algo: str = "sha256") -> str:
     Raises:
         FileNotFoundError: 指定されたファイルが存在しない場合
     """
-    h_obj = hashlib.new(algo)
-    block_size = 8192
+    return hash_file(file_path, algo, block_size, throttle, drop_cache)["hash"]
 
-    with open(file_path, "rb") as file:
-        while chunk := file.read(block_size):
-            h_obj.update(chunk)
-    return h_obj.hexdigest()
 
-
-def comp_file_hash(file_path: str, hash_code: str) -> bool:
+def comp_file_hash(
+    file_path: str,
+    hash_code: str,
+    algo: str = "sha256",
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    throttle: Callable[[int], None] | None = None,
+    drop_cache: bool = False,
+) -> bool:
     """
     指定されたファイルのハッシュ値が指定されたハッシュコードと一致するかを確認します。
 
@@ -39,9 +178,16 @@ def comp_file_hash(file_path: str, hash_code: str) -> bool:
     Args:
         file_path (str): ハッシュ値を計算して比較するファイルのパス
         hash_code (str): 比較対象のハッシュコード
+        algo (str): 使用するハッシュアルゴリズム（デフォルトは 'sha256'）
+        block_size (int): 1回に読み込むバイト数
+        throttle (Callable[[int], None] | None): 読み込み速度を制限する関数
+        drop_cache (bool): Trueの場合、読み込み済みの範囲をページキャッシュから
+            破棄する
 
     Returns:
         bool: ファイルのハッシュ値が指定されたハッシュコードと一致する場合はTrue、それ以外はFalse
     """
-    file_hash_code = get_file_hash(file_path)
+    file_hash_code = get_file_hash(
+        file_path, algo, block_size, throttle, drop_cache
+    )
     return file_hash_code == hash_code
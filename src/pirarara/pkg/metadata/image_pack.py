@@ -0,0 +1,270 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import glob
+import io
+import logging
+import mmap
+import os
+import re
+import threading
+
+from pkg.metrics import track
+
+from .db import MetaDataDB
+
+logger = logging.getLogger(__name__)
+
+# パックファイル名から番号を取り出す正規表現。
+_PACK_FILE_PATTERN = re.compile(r"images\.(\d+)\.pack$")
+
+
+class ImagePack:
+    """
+    多数の小さな画像を1つのファイルにまとめて格納するクラス。
+
+    画像は追記専用のパックファイルに書き込み、位置はデータベースの
+    `ImagePackTbl` に保存します。読み込みはパックファイルを `mmap` で
+    マップしたメモリの `memoryview` を返すため、画像ごとのファイルの
+    オープンやコピーは発生しません。置き換えや削除で参照されなくなった領域は
+    `compact` で新しい番号のパックファイルに詰め直して回収します。
+    """
+
+    # パックファイル名の書式。番号は再構成のたびに増やす。
+    PACK_FILE_NAME = "images.{}.pack"
+    # 再構成を行う未使用領域の最小サイズ（バイト）。
+    COMPACT_MIN_BYTES = 16 * 1024 * 1024
+    # 再構成を行う未使用領域の割合。
+    COMPACT_RATIO = 0.5
+
+    def __init__(self, pack_dir: str, db: MetaDataDB | None = None):
+        """
+        コンストラクタ。
+
+        Args:
+            pack_dir (str): パックファイルを置くディレクトリ。
+            db (MetaDataDB | None, optional): 位置を保存するデータベース。
+                指定がない場合は生成済みのインスタンスを使用する。
+        """
+        self.pack_dir = pack_dir
+        self.db = db if db is not None else MetaDataDB()
+        os.makedirs(self.pack_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        # (media_id, name) -> (pack, data_offset, data_length, mtime)
+        self._index: dict = {}
+        for media_id, name, *entry in self.db.get_packed_images():
+            self._index[(media_id, name)] = tuple(entry)
+        self.pack = max(
+            (entry[0] for entry in self._index.values()), default=0
+        )
+        self._file: io.FileIO | None = None
+        self._mmap: mmap.mmap | None = None
+        self._remove_unused_packs()
+
+    def _pack_path(self, pack: int) -> str:
+        return os.path.join(
+            self.pack_dir, self.__class__.PACK_FILE_NAME.format(pack)
+        )
+
+    def _remove_unused_packs(self) -> None:
+        # 再構成の途中で終了した場合などに残った古いパックファイルを削除する
+        for path in glob.glob(os.path.join(self.pack_dir, "images.*.pack")):
+            match = _PACK_FILE_PATTERN.search(path)
+            if match and int(match.group(1)) != self.pack:
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    logger.warning(f"Could not remove {path}: {e}")
+
+    def get(
+        self, media_id: int, name: str, min_mtime: float = 0.0
+    ) -> memoryview | None:
+        """
+        画像データを取得します。
+
+        Args:
+            media_id (int): ID。
+            name (str): 画像の名前。
+            min_mtime (float, optional): 作成元の更新時刻がこれより古い画像は
+                取得しない。
+
+        Returns:
+            memoryview | None: パックファイルをマップしたメモリ上の画像データ。
+            画像がない場合はNone。
+        """
+        with self._lock:
+            entry = self._index.get((media_id, name))
+            if entry is None:
+                return None
+            pack, data_offset, data_length, mtime = entry
+            if mtime < min_mtime or pack != self.pack:
+                return None
+            end = data_offset + data_length
+            if self._mmap is None or len(self._mmap) < end:
+                # 追記されたパックファイルをマップし直す
+                self._remap()
+                if self._mmap is None or len(self._mmap) < end:
+                    return None
+            return memoryview(self._mmap)[data_offset:end]
+
+    def put(
+        self, media_id: int, name: str, data: bytes, mtime: float = 0.0
+    ) -> None:
+        """
+        画像データをパックファイルに追記します。
+
+        同じIDと名前の画像がある場合は置き換え、古いデータの領域は未使用になります。
+
+        Args:
+            media_id (int): ID。
+            name (str): 画像の名前。
+            data (bytes): 画像データ。
+            mtime (float, optional): 作成元の更新時刻。
+        """
+        with self._lock:
+            if self._file is None:
+                self._file = open(self._pack_path(self.pack), "ab", 0)
+            data_offset = self._file.seek(0, os.SEEK_END)
+            self._file.write(data)
+            self.db.set_packed_image(
+                media_id, name, self.pack, data_offset, len(data), mtime
+            )
+            self._index[(media_id, name)] = (
+                self.pack,
+                data_offset,
+                len(data),
+                mtime,
+            )
+
+    def _remap(self) -> None:
+        # マップ済みのメモリを参照中の `memoryview` があるため閉じずに手放す
+        self._mmap = None
+        try:
+            with open(self._pack_path(self.pack), "rb") as f:
+                if os.fstat(f.fileno()).st_size > 0:
+                    self._mmap = mmap.mmap(
+                        f.fileno(), 0, access=mmap.ACCESS_READ
+                    )
+        except OSError:
+            pass
+
+    def unused_bytes(self) -> int:
+        """
+        参照されなくなった領域のサイズを求めます。
+
+        Returns:
+            int: 未使用領域のサイズ（バイト）。
+        """
+        try:
+            size = os.path.getsize(self._pack_path(self.pack))
+        except OSError:
+            return 0
+        live = sum(entry[3] for entry in self.db_entries())
+        return max(size - live, 0)
+
+    def db_entries(self) -> list:
+        """
+        データベースに位置が保存されている現在のパックファイルの画像を取得します。
+
+        削除されたレコードの画像は含みません。
+
+        Returns:
+            list: `(media_id, name, data_offset, data_length, mtime)` のリスト。
+        """
+        return [
+            (media_id, name, data_offset, data_length, mtime)
+            for media_id, name, pack, data_offset, data_length, mtime in (
+                self.db.get_packed_images()
+            )
+            if pack == self.pack
+        ]
+
+    def needs_compaction(self) -> bool:
+        """
+        再構成が必要かどうかを判定します。
+
+        Returns:
+            bool: 未使用領域が一定のサイズと割合を超えている場合はTrue。
+        """
+        try:
+            size = os.path.getsize(self._pack_path(self.pack))
+        except OSError:
+            return False
+        unused = self.unused_bytes()
+        return (
+            unused >= self.__class__.COMPACT_MIN_BYTES
+            and unused >= size * self.__class__.COMPACT_RATIO
+        )
+
+    def compact(self) -> int:
+        """
+        参照されている画像だけを新しいパックファイルに詰め直します。
+
+        新しいパックファイルを書き終えてから位置を1つのトランザクションで
+        更新するため、途中で終了しても古いパックファイルの内容は失われません。
+
+        Returns:
+            int: 回収した領域のサイズ（バイト）。
+        """
+        with self._lock, track("image_pack.compact"):
+            old_path = self._pack_path(self.pack)
+            try:
+                old_size = os.path.getsize(old_path)
+            except OSError:
+                return 0
+            new_pack = self.pack + 1
+            new_path = self._pack_path(new_pack)
+
+            moved = []
+            index = {}
+            with open(old_path, "rb") as src, open(new_path, "wb") as dst:
+                for (
+                    media_id,
+                    name,
+                    data_offset,
+                    data_length,
+                    mtime,
+                ) in self.db_entries():
+                    src.seek(data_offset)
+                    data = src.read(data_length)
+                    if len(data) != data_length:
+                        continue
+                    new_offset = dst.tell()
+                    dst.write(data)
+                    moved.append((new_pack, new_offset, media_id, name))
+                    index[(media_id, name)] = (
+                        new_pack,
+                        new_offset,
+                        data_length,
+                        mtime,
+                    )
+                dst.flush()
+                os.fsync(dst.fileno())
+                new_size = dst.tell()
+
+            self.db.move_packed_images(moved)
+
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self._mmap = None
+            self._index = index
+            self.pack = new_pack
+            self._remove_unused_packs()
+
+        reclaimed = old_size - new_size
+        logger.info(
+            f"image pack compacted: {len(moved)} images, "
+            f"{reclaimed} bytes reclaimed"
+        )
+        return reclaimed
+
+    def close(self) -> None:
+        """
+        パックファイルを閉じます。
+        """
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self._mmap = None
@@ -0,0 +1,367 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import logging
+import os
+import platform
+import re
+import sys
+import threading
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+# デバイスの種類。
+DEVICE_HDD = "hdd"
+DEVICE_SSD = "ssd"
+DEVICE_NETWORK = "network"
+DEVICE_UNKNOWN = "unknown"
+
+# デバイスの種類ごとの同時実行数の既定値。
+# HDDはヘッドのシークを避けるため1、SSDは並列に読むほど速いため多めにする。
+DEFAULT_WORKERS = {
+    DEVICE_HDD: 1,
+    DEVICE_SSD: 4,
+    DEVICE_NETWORK: 2,
+    DEVICE_UNKNOWN: 2,
+}
+
+# ネットワークファイルシステムの種類。
+NETWORK_FS_TYPES = {
+    "9p",
+    "afs",
+    "ceph",
+    "cifs",
+    "davfs",
+    "fuse.rclone",
+    "fuse.sshfs",
+    "glusterfs",
+    "nfs",
+    "nfs4",
+    "smb3",
+    "smbfs",
+    "sshfs",
+}
+
+# メモリ上のファイルシステムの種類（SSDと同様に扱う）。
+MEMORY_FS_TYPES = {"ramfs", "tmpfs"}
+
+# マウント情報の8進数のエスケープ（空白など）。
+_MOUNT_ESCAPE = re.compile(r"\\([0-7]{3})")
+
+# デバイス番号を取得できないファイル（存在しないファイルなど）のデバイス番号。
+UNKNOWN_DEVICE = -1
+
+
+def _read_text(path: str) -> str | None:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _mount_fstype(path: str) -> str | None:
+    """
+    パスを含むマウントポイントのファイルシステムの種類を取得する関数（Linux）。
+
+    Args:
+        path (str): パス。
+
+    Returns:
+        str | None: ファイルシステムの種類。取得できない場合はNone。
+    """
+    text = _read_text("/proc/self/mounts")
+    if text is None:
+        return None
+    path = os.path.realpath(path)
+    best, fstype = "", None
+    for line in text.splitlines():
+        fields = line.split()
+        if len(fields) < 3:
+            continue
+        # 空白などは8進数でエスケープされている
+        mount_point = _MOUNT_ESCAPE.sub(
+            lambda m: chr(int(m.group(1), 8)), fields[1]
+        )
+        if (
+            path == mount_point
+            or path.startswith(mount_point.rstrip("/") + "/")
+        ) and len(mount_point) > len(best):
+            best, fstype = mount_point, fields[2]
+    return fstype
+
+
+def _is_rotational(device: int) -> bool | None:
+    """
+    ブロックデバイスが回転式（HDD）かどうかをsysfsから判定する関数（Linux）。
+
+    パーティションは親のディスクを、device-mapperやRAIDは構成するデバイスを
+    調べます。
+
+    Args:
+        device (int): デバイス番号（`st_dev`）。
+
+    Returns:
+        bool | None: 回転式の場合はTrue。判定できない場合はNone。
+    """
+    sys_path = os.path.realpath(
+        f"/sys/dev/block/{os.major(device)}:{os.minor(device)}"
+    )
+    if not os.path.isdir(sys_path):
+        return None
+
+    def rotational(block_dir: str) -> bool | None:
+        for d in (block_dir, os.path.dirname(block_dir)):
+            value = _read_text(os.path.join(d, "queue", "rotational"))
+            if value is not None:
+                slaves_dir = os.path.join(d, "slaves")
+                slaves = (
+                    os.listdir(slaves_dir) if os.path.isdir(slaves_dir) else []
+                )
+                if slaves:
+                    # 構成するデバイスのどれかが回転式であれば回転式とする
+                    results = [
+                        rotational(
+                            os.path.realpath(
+                                os.path.join("/sys/class/block", slave)
+                            )
+                        )
+                        for slave in slaves
+                    ]
+                    if any(results):
+                        return True
+                    if all(r is False for r in results):
+                        return False
+                return value == "1"
+        return None
+
+    return rotational(sys_path)
+
+
+def _is_windows_network_drive(path: str) -> bool:
+    """
+    パスがWindowsのネットワークドライブかどうかを判定する関数。
+
+    Args:
+        path (str): パス。
+
+    Returns:
+        bool: ネットワークドライブまたはUNCパスの場合はTrue。
+    """
+    path = os.path.abspath(path)
+    if path.startswith("\\\\"):
+        return True
+    # 型チェックでもWindows以外では `ctypes.windll` を参照しないよう判定する
+    if sys.platform != "win32":
+        return False
+    try:
+        import ctypes
+
+        # DRIVE_REMOTE = 4
+        return ctypes.windll.kernel32.GetDriveTypeW(path[:3]) == 4
+    except (AttributeError, OSError):
+        return False
+
+
+def detect_device_kind(path: str, device: int) -> str:
+    """
+    パスを含むデバイスの種類を判定する関数。
+
+    Args:
+        path (str): パス。
+        device (int): デバイス番号（`st_dev`）。
+
+    Returns:
+        str: `hdd`、`ssd`、`network`、`unknown` のいずれか。
+    """
+    if device == UNKNOWN_DEVICE:
+        return DEVICE_UNKNOWN
+    os_type = platform.system()
+    if os_type == "Windows":
+        # Windowsでは回転式かどうかを判定しない
+        if _is_windows_network_drive(path):
+            return DEVICE_NETWORK
+        return DEVICE_UNKNOWN
+    if os_type == "Linux":
+        fstype = _mount_fstype(path)
+        if fstype in NETWORK_FS_TYPES:
+            return DEVICE_NETWORK
+        if fstype in MEMORY_FS_TYPES:
+            return DEVICE_SSD
+        rotational = _is_rotational(device)
+        if rotational is not None:
+            return DEVICE_HDD if rotational else DEVICE_SSD
+    return DEVICE_UNKNOWN
+
+
+class IOScheduler:
+    """
+    ファイルの読み込みをデバイスごとに並列化するスケジューラクラス。
+
+    このクラスはシングルトンパターンを用いて実装されています。インポート、
+    知覚ハッシュの計算、整合性チェックで同じインスタンスを共有するため、
+    同時に実行してもデバイスごとの同時実行数の上限を超えません。
+
+    ファイルは `st_dev` でデバイスごとにまとめ、デバイス内ではiノード番号
+    （同じ場合はパス）の順に並べて、シークの少ない順次読み込みにします。
+    デバイスの種類（HDD、SSD、ネットワーク）は自動で判定し、種類ごとの
+    同時実行数を適用します。特定のデバイスの同時実行数は設定で上書きできます。
+    """
+
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        """
+        シングルトンインスタンスを生成するメソッド。
+
+        Returns:
+            IOScheduler: IOSchedulerクラスの唯一のインスタンス。
+        """
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(
+        self,
+        workers: dict | None = None,
+        device_workers: dict | None = None,
+    ):
+        """
+        コンストラクタ。
+
+        Args:
+            workers (dict | None, optional): デバイスの種類ごとの同時実行数。
+                指定がない種類は既定値を使用する。
+            device_workers (dict | None, optional): パスをキー、そのパスを含む
+                デバイスの同時実行数を値とする辞書。
+        """
+        if not hasattr(self, "_initialized"):
+            self._initialized = True
+        else:
+            return
+
+        self.workers = {**DEFAULT_WORKERS, **(workers or {})}
+        self._lock = threading.Lock()
+        # デバイス番号 -> 種類
+        self._kinds: dict[int, str] = {}
+        # デバイス番号 -> 同時実行数
+        self._limits: dict[int, int] = {}
+        self._semaphores: dict[int, threading.Semaphore] = {}
+        for path, limit in (device_workers or {}).items():
+            try:
+                self._limits[os.stat(path).st_dev] = max(1, int(limit))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Invalid device setting {path}: {e}")
+
+    def kind(self, device: int, path: str = "") -> str:
+        """
+        デバイスの種類を取得します。初回はパスから判定します。
+
+        Args:
+            device (int): デバイス番号。
+            path (str, optional): デバイス上のパス。
+
+        Returns:
+            str: デバイスの種類。
+        """
+        with self._lock:
+            kind = self._kinds.get(device)
+        if kind is None:
+            if not path:
+                return DEVICE_UNKNOWN
+            kind = detect_device_kind(path, device)
+            logger.info(f"device {device} ({path}): {kind}")
+            with self._lock:
+                kind = self._kinds.setdefault(device, kind)
+        return kind
+
+    def limit(self, device: int) -> int:
+        """
+        デバイスの同時実行数を取得します。
+
+        Args:
+            device (int): デバイス番号。
+
+        Returns:
+            int: 同時実行数。
+        """
+        with self._lock:
+            limit = self._limits.get(device)
+        if limit is not None:
+            return limit
+        return max(1, self.workers.get(self.kind(device), 1))
+
+    def plan(self, items: list, path_of: Callable | None = None) -> list:
+        """
+        項目をデバイスごとにまとめ、読み込む順に並べます。
+
+        デバイス内はiノード番号とパスの順に並べ、デバイスが交互になるように
+        並べるため、先頭から順に同時実行数まで実行すると各デバイスが並列に
+        使用されます。
+
+        Args:
+            items (list): 項目のリスト。
+            path_of (Callable | None, optional): 項目からファイルのパスを
+                求める関数。指定がない場合は項目をパスとする。
+
+        Returns:
+            list: `(デバイス番号, 項目)` のリスト。
+        """
+        groups: dict[int, list] = {}
+        for item in items:
+            path = path_of(item) if path_of is not None else item
+            try:
+                st = os.stat(path) if path else None
+            except OSError:
+                st = None
+            if st is None:
+                device, inode = UNKNOWN_DEVICE, 0
+            else:
+                device, inode = st.st_dev, st.st_ino
+                # 種類を判定しておく
+                self.kind(device, path)
+            groups.setdefault(device, []).append((inode, path or "", item))
+
+        queues = []
+        for device, group in groups.items():
+            group.sort(key=lambda entry: (entry[0], entry[1]))
+            queues.append((device, [entry[2] for entry in group]))
+
+        ordered = []
+        index = 0
+        while queues:
+            queues = [(d, q) for d, q in queues if index < len(q)]
+            for device, queue in queues:
+                ordered.append((device, queue[index]))
+            index += 1
+        return ordered
+
+    def max_workers(self, devices) -> int:
+        """
+        複数のデバイスを並列に使用する場合の同時実行数の合計を求めます。
+
+        Args:
+            devices (Iterable[int]): デバイス番号。
+
+        Returns:
+            int: 同時実行数の合計。
+        """
+        return max(1, sum(self.limit(device) for device in set(devices)))
+
+    def slot(self, device: int) -> threading.Semaphore:
+        """
+        デバイスの実行枠を取得します。`with` 文で使用します。
+
+        Args:
+            device (int): デバイス番号。
+
+        Returns:
+            threading.Semaphore: 実行枠。
+        """
+        with self._lock:
+            semaphore = self._semaphores.get(device)
+        if semaphore is None:
+            semaphore = threading.Semaphore(self.limit(device))
+            with self._lock:
+                semaphore = self._semaphores.setdefault(device, semaphore)
+        return semaphore
@@ -0,0 +1,248 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import logging
+import os
+import threading
+
+from .control import set_media_info
+from .db import MetaDataDB
+from .frame_select import select_representative_time
+from .io_scheduler import UNKNOWN_DEVICE, IOScheduler
+from .media_info import capture_frame, parse_duration
+from .verify import (
+    STATUS_MISSING,
+    IntegrityVerifier,
+    TokenBucket,
+    report_verify_scan,
+    verify_file,
+)
+
+logger = logging.getLogger(__name__)
+
+# ジョブの種類。
+JOB_IMPORT = "import"
+JOB_THUMBNAIL = "thumbnail"
+JOB_VERIFY = "verify"
+
+# ジョブの状態（`JobTbl.status`）。
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+# 再試行までの待ち時間（秒）。失敗するたびに2倍にする。
+RETRY_BASE_DELAY = 5.0
+RETRY_MAX_DELAY = 300.0
+
+
+def get_retry_delay(attempts: int) -> float:
+    """
+    失敗したジョブを再試行するまでの待ち時間を求める関数。
+
+    Args:
+        attempts (int): 失敗した実行を含む実行回数。
+
+    Returns:
+        float: 待ち時間（秒）。
+    """
+    return min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** max(0, attempts - 1))
+
+
+def describe_job(job_type: str, payload: dict) -> str:
+    """
+    ジョブの対象を表示用の文字列にする関数。
+
+    Args:
+        job_type (str): ジョブの種類。
+        payload (dict): ジョブの内容。
+
+    Returns:
+        str: インポートの場合はファイル名、それ以外はID。
+    """
+    if job_type == JOB_IMPORT:
+        return os.path.basename(payload.get("path", ""))
+    return f"id{payload.get('media_id', '')}"
+
+
+class JobRunner:
+    """
+    ジョブの種類ごとの処理を実行するクラス。
+
+    ワーカースレッドから同時に呼び出せます。ファイルの読み込みは `IOScheduler`
+    でデバイスごとに同時実行数を制限し、整合性チェックは読み込み帯域の上限を
+    適用します。
+    """
+
+    def __init__(
+        self,
+        db: MetaDataDB,
+        scheduler: IOScheduler | None = None,
+        verify_bandwidth: int = 0,
+    ):
+        """
+        コンストラクタ。
+
+        Args:
+            db (MetaDataDB): データベースクラスのインスタンス。
+            scheduler (IOScheduler | None, optional): 読み込みのスケジューラ。
+                指定がない場合は共有のインスタンスを使用する。
+            verify_bandwidth (int, optional): 整合性チェックの読み込み帯域の
+                上限（バイト/秒）。0の場合は上限なし。
+        """
+        self.db = db
+        self.scheduler = scheduler if scheduler is not None else IOScheduler()
+        self.bucket = (
+            TokenBucket(verify_bandwidth) if verify_bandwidth > 0 else None
+        )
+        self._canceled = threading.Event()
+        self._handlers = {
+            JOB_IMPORT: self._run_import,
+            JOB_THUMBNAIL: self._run_thumbnail,
+            JOB_VERIFY: self._run_verify,
+        }
+
+    def cancel(self) -> None:
+        """
+        実行中のジョブを中断します。中断できるのは整合性チェックの読み込みです。
+        """
+        self._canceled.set()
+
+    def import_payloads(self, files: list) -> list:
+        """
+        インポートのジョブの内容をデバイスごとに読み込む順に並べて作成します。
+
+        Args:
+            files (list): ファイルのパスのリスト。
+
+        Returns:
+            list: ジョブの内容のリスト。
+        """
+        return [{"path": file} for _, file in self.scheduler.plan(files)]
+
+    def verify_payloads(self, resume: bool = True) -> tuple:
+        """
+        整合性チェックを開始し、チェックが済んでいないレコードのジョブの内容を
+        デバイスごとに読み込む順に並べて作成します。
+
+        Args:
+            resume (bool, optional): Trueの場合、完了していない前回の実行を
+                再開する。
+
+        Returns:
+            tuple: `(実行ID, ジョブの内容のリスト)`。
+        """
+        scan_id = self.db.start_verify_scan(resume)
+        checked = self.db.get_verify_results(scan_id)
+        records = [
+            row
+            for rows in self.db.iter_rows(["save_dir_path", "file_name"])
+            for row in rows
+            if row[0] not in checked
+        ]
+        return scan_id, [
+            {"scan_id": scan_id, "media_id": id}
+            for _, (id, _, _) in self.scheduler.plan(records, self._file_path)
+        ]
+
+    def finish_verify(self, scan_id: int) -> dict:
+        """
+        整合性チェックを完了し、結果をまとめます。
+
+        Args:
+            scan_id (int): 実行ID。
+
+        Returns:
+            dict: `IntegrityVerifier.finish` と同じ形式の辞書。
+        """
+        return report_verify_scan(self.db, scan_id)
+
+    def run(self, job_type: str, payload: dict):
+        """
+        ジョブを実行します。
+
+        Args:
+            job_type (str): ジョブの種類。
+            payload (dict): ジョブの内容。
+
+        Returns:
+            Any: 処理結果（JSONに変換できる値）。
+
+        Raises:
+            ValueError: ジョブの種類が不明な場合。
+            InterruptedError: `cancel` で中断された場合。
+        """
+        handler = self._handlers.get(job_type)
+        if handler is None:
+            raise ValueError(f"Unknown job type: {job_type}")
+        if self._canceled.is_set():
+            raise InterruptedError("job canceled")
+        return handler(payload)
+
+    def _file_path(self, record: tuple) -> str:
+        _, save_dir_path, file_name = record
+        if not save_dir_path or not file_name:
+            return ""
+        return os.path.join(save_dir_path, file_name)
+
+    def _device(self, file_path: str) -> int:
+        try:
+            return os.stat(file_path).st_dev
+        except OSError:
+            return UNKNOWN_DEVICE
+
+    def _run_import(self, payload: dict) -> dict:
+        file_path = payload["path"]
+        with self.scheduler.slot(self._device(file_path)):
+            return {"media_id": set_media_info(file_path)}
+
+    def _run_thumbnail(self, payload: dict) -> dict | None:
+        media_id = payload["media_id"]
+        data = self.db.get_data(media_id)
+        if data is None or not data.get("save_dir_path"):
+            return None
+        save_dir_path = data["save_dir_path"]
+        file_path = os.path.join(save_dir_path, data.get("file_name") or "")
+        if not os.path.isfile(file_path):
+            raise FileNotFoundError(f"No such file: {file_path}")
+
+        # 黒画面やロゴを避けて代表フレームを選ぶ
+        capture_time = select_representative_time(
+            file_path, parse_duration(data.get("duration") or "")
+        )
+        # 表示中のキャプチャ画像を壊さないよう一時ファイルに書き出してから置き換える
+        capture_path = os.path.join(save_dir_path, "capture.jpg")
+        tmp_path = f"{capture_path}.tmp.jpg"
+        if not capture_frame(file_path, tmp_path, f"{capture_time:.3f}"):
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise RuntimeError(f"Could not capture a frame of {file_path}")
+        os.replace(tmp_path, capture_path)
+        return {"media_id": media_id, "time": round(capture_time, 3)}
+
+    def _run_verify(self, payload: dict) -> dict | None:
+        scan_id, media_id = payload["scan_id"], payload["media_id"]
+        data = self.db.get_data(media_id)
+        if data is None:
+            # チェックまでの間に削除された
+            return None
+        file_path = self._file_path(
+            (media_id, data.get("save_dir_path"), data.get("file_name"))
+        )
+        if not file_path:
+            status = STATUS_MISSING
+        else:
+            with self.scheduler.slot(self._device(file_path)):
+                status = verify_file(
+                    file_path,
+                    data.get("file_hash_data") or "",
+                    block_size=IntegrityVerifier.BLOCK_SIZE,
+                    throttle=self._throttle,
+                )
+        self.db.set_verify_results(scan_id, [(media_id, status)])
+        return {"status": status}
+
+    def _throttle(self, size: int) -> None:
+        if self._canceled.is_set():
+            raise InterruptedError("verification canceled")
+        if self.bucket is not None:
+            self.bucket.consume(size)
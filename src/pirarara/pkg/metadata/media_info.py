@@ -5,10 +5,67 @@ import os
 import subprocess
 
 import ffmpeg
+from pkg.metrics import timed, track
+
+from . import pyav_backend
+from .ffmpeg_governor import FFmpegGovernor
 
 logger = logging.getLogger(__name__)
 
+# メディア情報の取得とフレームのキャプチャに使用するバックエンド。
+# `auto` はPyAVがあれば使用し、失敗した場合はffmpegの実行に切り替える。
+MEDIA_BACKEND_AUTO = "auto"
+MEDIA_BACKEND_PYAV = "pyav"
+MEDIA_BACKEND_FFMPEG = "ffmpeg"
+MEDIA_BACKENDS = (MEDIA_BACKEND_AUTO, MEDIA_BACKEND_PYAV, MEDIA_BACKEND_FFMPEG)
+
+_media_backend = MEDIA_BACKEND_AUTO
+
+
+def set_media_backend(backend: str) -> None:
+    """
+    メディア情報の取得とフレームのキャプチャに使用するバックエンドを設定する関数。
+
+    Args:
+        backend (str): `auto`、`pyav`、`ffmpeg` のいずれか。
+
+    Raises:
+        ValueError: 不明なバックエンドが指定された場合。
+    """
+    global _media_backend
+    if backend not in MEDIA_BACKENDS:
+        raise ValueError(f"Unknown media backend: {backend}")
+    if backend == MEDIA_BACKEND_PYAV and not pyav_backend.is_pyav_available():
+        logger.warning("PyAV is not installed, falling back to ffmpeg.")
+    _media_backend = backend
+    logger.info(f"media backend: {get_media_backend()}")
+
+
+def release_media() -> None:
+    """
+    メディア情報の取得で開いたままのファイルを閉じる関数。
+
+    PyAVではメディア情報の取得で開いたファイルをキャプチャで再利用するため、
+    キャプチャを行わない場合に呼び出します。
+    """
+    pyav_backend.release()
+
+
+def get_media_backend() -> str:
+    """
+    実際に使用するバックエンドを取得する関数。
+
+    Returns:
+        str: `pyav` または `ffmpeg`。
+    """
+    if _media_backend != MEDIA_BACKEND_FFMPEG and (
+        pyav_backend.is_pyav_available()
+    ):
+        return MEDIA_BACKEND_PYAV
+    return MEDIA_BACKEND_FFMPEG
+
 
+@timed("ffmpeg.version")
 def is_ffmpeg_installed():
     """
     "ffmpeg"がインストールされているかどうかを確認する関数。
@@ -29,6 +86,25 @@ def is_ffmpeg_installed():
         return False
 
 
+def parse_duration(duration: str) -> float:
+    """
+    "HH:MM:SS" 形式の再生時間を秒数に変換する関数。
+
+    Args:
+        duration (str): 再生時間。
+
+    Returns:
+        float: 秒数。変換できない場合は0。
+    """
+    seconds = 0.0
+    try:
+        for part in duration.split(":"):
+            seconds = seconds * 60 + float(part)
+    except (AttributeError, ValueError):
+        return 0.0
+    return seconds
+
+
 def get_media_type(file_path: str) -> str:
     """
     メディアファイルの種類を取得する。
@@ -113,8 +189,18 @@ def get_media_info(file_path: str, file_hash_data: str) -> dict:
     if info["media_type"] != "movie":
         return info
 
+    probe = None
+    if get_media_backend() == MEDIA_BACKEND_PYAV:
+        try:
+            probe = pyav_backend.probe(file_path)
+        except pyav_backend.PYAV_ERRORS as e:
+            logger.warning(f"PyAV could not probe {file_path}: {e}")
+            pyav_backend.release()
+
     try:
-        probe = ffmpeg.probe(file_path)
+        if probe is None:
+            with track("ffprobe.probe"):
+                probe = FFmpegGovernor().probe(file_path)
         video_stream = next(
             (
                 stream
@@ -168,6 +254,7 @@ def get_media_info(file_path: str, file_hash_data: str) -> dict:
     return info
 
 
+@timed("ffmpeg.capture_frame")
 def capture_frame(file_path, output_image_path, time="00:00:01") -> bool:
     """
     動画ファイルの特定時刻のフレームをキャプチャして画像として保存する。
@@ -193,15 +280,27 @@ def capture_frame(file_path, output_image_path, time="00:00:01") -> bool:
         False
 
     Note:
-        この関数は、`ffmpeg` パッケージがインストールされている必要があります。
-        キャプチャが失敗した場合、エラーログが記録されます。
+        PyAVがある場合はプロセスを起動せずにデコードし、失敗した場合は
+        `ffmpeg` を実行します。キャプチャが失敗した場合、エラーログが記録されます。
     """
+    if get_media_backend() == MEDIA_BACKEND_PYAV:
+        try:
+            data = pyav_backend.capture_jpeg(file_path, parse_duration(time))
+        except pyav_backend.PYAV_ERRORS as e:
+            logger.warning(f"PyAV could not capture {file_path}: {e}")
+            data = None
+        if data:
+            with open(output_image_path, "wb") as f:
+                f.write(data)
+            return True
+
     try:
-        (
+        FFmpegGovernor().run(
             ffmpeg
             .input(file_path, ss=time)
-            .output(output_image_path, vframes=1)
-            .run(overwrite_output=True)
+            .output(output_image_path, vframes=1),
+            overwrite_output=True,
+            kind="capture",
         )
         return True
     except ffmpeg.Error as e:
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import logging
+
+import numpy as np
+
+from .frame_select import grab_small_frames
+
+logger = logging.getLogger(__name__)
+
+# dHashを計算する縮小画像のサイズ（横は差分を取るため1画素多い）。
+HASH_WIDTH = 9
+HASH_HEIGHT = 8
+# 1動画あたりのハッシュを計算するフレーム数。
+DEFAULT_FRAMES = 5
+
+
+def get_frame_times(duration: float, frames: int = DEFAULT_FRAMES) -> list:
+    """
+    ハッシュを計算するフレームの時刻を求める関数。
+
+    先頭と末尾の黒画面やクレジットを避けるため、再生時間を等分した位置とします。
+
+    Args:
+        duration (float): 再生時間（秒）。
+        frames (int, optional): フレーム数。
+
+    Returns:
+        list: 時刻（秒）のリスト。
+    """
+    if duration <= 0:
+        return [0.0]
+    return [duration * (i + 1) / (frames + 1) for i in range(frames)]
+
+
+def grab_gray_frames(file_path: str, times: list) -> np.ndarray:
+    """
+    指定時刻の直前のキーフレームをハッシュ用に縮小したグレースケール画像として
+    取得する関数。
+
+    代表フレームの選択と同じく `grab_small_frames` で取得するため、PyAVを
+    使用できる場合はプロセスを起動せず、ffmpegの場合も1回の実行で済みます。
+    同じ内容の動画であれば同じキーフレームが選ばれます。
+
+    Args:
+        file_path (str): 動画ファイルのパス。
+        times (list): 時刻（秒）のリスト。
+
+    Returns:
+        np.ndarray: `(フレーム数, HASH_HEIGHT, HASH_WIDTH)` のuint8配列。
+        取得できなかったフレームは含みません。
+    """
+    _, frames = grab_small_frames(
+        file_path, times, HASH_WIDTH, HASH_HEIGHT, kind="phash"
+    )
+    return frames
+
+
+def dhash(frames: np.ndarray) -> list:
+    """
+    縮小画像からdHash（64ビットの差分ハッシュ）を計算する関数。
+
+    隣り合う画素の明暗の比較をすべてのフレームについてまとめて行います。
+
+    Args:
+        frames (np.ndarray): `(フレーム数, HASH_HEIGHT, HASH_WIDTH)` の配列。
+
+    Returns:
+        list: フレームごとのハッシュ値（int）のリスト。
+    """
+    if len(frames) == 0:
+        return []
+    bits = frames[:, :, 1:] > frames[:, :, :-1]
+    packed = np.packbits(bits.reshape(len(frames), -1), axis=1)
+    return [int(value) for value in packed.view(">u8").ravel()]
+
+
+def compute_perceptual_hashes(
+    file_path: str, duration: float, frames: int = DEFAULT_FRAMES
+) -> list:
+    """
+    動画ファイルの複数のフレームの知覚ハッシュを計算する関数。
+
+    Args:
+        file_path (str): 動画ファイルのパス。
+        duration (float): 再生時間（秒）。
+        frames (int, optional): ハッシュを計算するフレーム数。
+
+    Returns:
+        list: フレームごとのハッシュ値のリスト。
+    """
+    times = get_frame_times(duration, frames)
+    return dhash(grab_gray_frames(file_path, times))
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """
+    2つのハッシュ値のハミング距離を求める関数。
+
+    Args:
+        a (int): ハッシュ値。
+        b (int): ハッシュ値。
+
+    Returns:
+        int: 異なるビットの数。
+    """
+    return (a ^ b).bit_count()
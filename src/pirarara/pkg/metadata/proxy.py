@@ -0,0 +1,235 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import logging
+import os
+import signal
+import subprocess
+import sys
+import threading
+
+import ffmpeg
+from pkg.metrics import track
+
+from .ffmpeg_governor import spawn_process
+
+logger = logging.getLogger(__name__)
+
+# プロキシ動画を保存するディレクトリ名（保存先ディレクトリの中に作成する）。
+# 元の動画と同じディレクトリに置くと、元の動画と名前が重なった場合に
+# 上書きしてしまい、未登録のファイルとしても検出されるため分ける。
+PROXY_DIR_NAME = ".proxy"
+# プロキシ動画のファイル名。
+PROXY_FILE_NAME = "proxy.mp4"
+
+# プロキシ動画の作成状況（`MetaDataTbl.proxy_status`）。
+PROXY_QUEUED = "queued"
+PROXY_RUNNING = "running"
+PROXY_DONE = "done"
+PROXY_FAILED = "failed"
+
+# プロキシ動画の既定の高さ（ピクセル）とビットレート（kbps）。
+DEFAULT_HEIGHT = 480
+DEFAULT_VIDEO_BITRATE_K = 800
+DEFAULT_AUDIO_BITRATE_K = 96
+
+
+def get_proxy_path(save_dir_path: str) -> str:
+    """
+    プロキシ動画のパスを求める関数。
+
+    Args:
+        save_dir_path (str): 保存先ディレクトリ。
+
+    Returns:
+        str: プロキシ動画のパス。
+    """
+    return os.path.join(save_dir_path, PROXY_DIR_NAME, PROXY_FILE_NAME)
+
+
+def get_preview_path(save_dir_path: str, file_name: str) -> str:
+    """
+    プレビューに使用する動画のパスを求める関数。
+
+    プロキシ動画がある場合はプロキシ動画、ない場合は元の動画とします。
+
+    Args:
+        save_dir_path (str): 保存先ディレクトリ。
+        file_name (str): 元の動画のファイル名。
+
+    Returns:
+        str: 動画のパス。
+    """
+    proxy_path = get_proxy_path(save_dir_path)
+    if os.path.exists(proxy_path):
+        return proxy_path
+    return os.path.join(save_dir_path, file_name)
+
+
+def _suspend(process: subprocess.Popen, suspend: bool) -> None:
+    """
+    プロセスを一時停止または再開する関数。
+
+    Args:
+        process (subprocess.Popen): プロセス。
+        suspend (bool): Trueの場合は一時停止、Falseの場合は再開する。
+    """
+    if sys.platform == "win32":
+        import ctypes
+
+        # PROCESS_SUSPEND_RESUME = 0x0800
+        handle = ctypes.windll.kernel32.OpenProcess(0x0800, False, process.pid)
+        if not handle:
+            return
+        try:
+            if suspend:
+                ctypes.windll.ntdll.NtSuspendProcess(handle)
+            else:
+                ctypes.windll.ntdll.NtResumeProcess(handle)
+        finally:
+            ctypes.windll.kernel32.CloseHandle(handle)
+    else:
+        os.kill(process.pid, signal.SIGSTOP if suspend else signal.SIGCONT)
+
+
+class ProxyTranscoder:
+    """
+    プレビュー用の低ビットレートのプロキシ動画を作成するクラス。
+
+    ffmpegはスレッド数を制限し、低い優先度（nice値）で実行します。
+    実行中のffmpegは `pause` で一時停止、`resume` で再開、`cancel` で中断できます。
+    """
+
+    def __init__(
+        self,
+        height: int = DEFAULT_HEIGHT,
+        video_bitrate_k: int = DEFAULT_VIDEO_BITRATE_K,
+        threads: int = 2,
+        nice: int = 15,
+    ):
+        """
+        コンストラクタ。
+
+        Args:
+            height (int, optional): プロキシ動画の高さ。元の動画より大きくはしない。
+            video_bitrate_k (int, optional): 映像のビットレート（kbps）。
+            threads (int, optional): ffmpegのスレッド数。0の場合は制限しない。
+            nice (int, optional): ffmpegのnice値の増分。
+        """
+        self.height = height
+        self.video_bitrate_k = video_bitrate_k
+        self.threads = threads
+        self.nice = nice
+
+        self._lock = threading.Lock()
+        self._process: subprocess.Popen | None = None
+        self._paused = False
+        self._canceled = False
+
+    def transcode(
+        self, file_path: str, save_dir_path: str, source_height: int = 0
+    ) -> int | None:
+        """
+        プロキシ動画を作成します。
+
+        一時ファイルに書き出してから置き換えるため、中断しても不完全な
+        プロキシ動画は残りません。
+
+        Args:
+            file_path (str): 元の動画のパス。
+            save_dir_path (str): 保存先ディレクトリ。
+            source_height (int, optional): 元の動画の高さ。不明な場合は0。
+
+        Returns:
+            int | None: プロキシ動画のサイズ（バイト）。作成できなかった場合、
+            または中断した場合はNone。
+        """
+        height = self.height
+        if 0 < source_height < height:
+            height = source_height
+        # H.264の4:2:0は幅と高さが偶数である必要がある
+        height -= height % 2
+        proxy_path = get_proxy_path(save_dir_path)
+        tmp_path = f"{proxy_path}.tmp.mp4"
+        os.makedirs(os.path.dirname(proxy_path), exist_ok=True)
+
+        source = ffmpeg.input(file_path, threads=self.threads)
+        args = ffmpeg.compile(
+            ffmpeg.output(
+                source.video.filter("scale", -2, height).filter("setsar", "1"),
+                source["a:0?"],
+                tmp_path,
+                vcodec="libx264",
+                preset="veryfast",
+                pix_fmt="yuv420p",
+                video_bitrate=f"{self.video_bitrate_k}k",
+                maxrate=f"{self.video_bitrate_k * 3 // 2}k",
+                bufsize=f"{self.video_bitrate_k * 2}k",
+                acodec="aac",
+                audio_bitrate=f"{DEFAULT_AUDIO_BITRATE_K}k",
+                ac=2,
+                movflags="+faststart",
+                threads=self.threads,
+                sn=None,
+            ).global_args("-nostdin", "-loglevel", "error"),
+            overwrite_output=True,
+        )
+
+        with track("ffmpeg.proxy"):
+            with self._lock:
+                if self._canceled:
+                    return None
+                self._process = spawn_process(
+                    args,
+                    self.nice,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.PIPE,
+                )
+                if self._paused:
+                    _suspend(self._process, True)
+            _, err = self._process.communicate()
+            with self._lock:
+                returncode = self._process.returncode
+                self._process = None
+                canceled = self._canceled
+
+        if returncode != 0 or canceled:
+            if not canceled:
+                logger.error(
+                    f"Error creating proxy of {file_path}: "
+                    f"{err.decode('utf-8', errors='replace').strip()}"
+                )
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return None
+        os.replace(tmp_path, proxy_path)
+        return os.path.getsize(proxy_path)
+
+    def pause(self) -> None:
+        """
+        実行中のffmpegを一時停止します。以降に開始するffmpegも一時停止します。
+        """
+        with self._lock:
+            self._paused = True
+            if self._process is not None:
+                _suspend(self._process, True)
+
+    def resume(self) -> None:
+        """
+        一時停止したffmpegを再開します。
+        """
+        with self._lock:
+            self._paused = False
+            if self._process is not None:
+                _suspend(self._process, False)
+
+    def cancel(self) -> None:
+        """
+        実行中のffmpegを中断します。以降の `transcode` は何もしません。
+        """
+        with self._lock:
+            self._canceled = True
+            if self._process is not None:
+                if self._paused:
+                    _suspend(self._process, False)
+                # 一時ファイルは削除するため、終了処理を待たずに強制終了する
+                self._process.kill()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import logging
+import threading
+
+import numpy as np
+from pkg.metrics import track
+
+try:
+    import av
+except ImportError:
+    av = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+# PyAVの例外（PyAVがない場合は発生しない）。
+PYAV_ERRORS: tuple = (OSError, ValueError)
+if av is not None:
+    PYAV_ERRORS = (av.FFmpegError, OSError, ValueError)
+
+# キャプチャ画像のJPEGの品質（ffmpegの `-q:v` と同じ 2〜31 で小さいほど高画質）。
+JPEG_QUALITY = 2
+
+# スレッドごとに直前に開いたコンテナを保持する。
+_local = threading.local()
+
+
+def is_pyav_available() -> bool:
+    """
+    PyAVが使用できるかどうかを確認する関数。
+
+    Returns:
+        bool: PyAVがインストールされている場合はTrue。
+    """
+    return av is not None
+
+
+def _open(file_path: str):
+    """
+    コンテナを開く関数。
+
+    メディア情報の取得とフレームのキャプチャで同じファイルを2回開かないよう、
+    直前に同じスレッドで開いたコンテナがあれば再利用します。
+
+    Args:
+        file_path (str): メディアファイルのパス。
+
+    Returns:
+        av.container.InputContainer: コンテナ。
+    """
+    cached = getattr(_local, "container", None)
+    if cached is not None:
+        if cached[0] == file_path:
+            return cached[1]
+        release()
+    container = av.open(file_path)
+    # デコーダーを開く前に設定する必要がある
+    for stream in container.streams.video:
+        stream.thread_type = "AUTO"
+    _local.container = (file_path, container)
+    return container
+
+
+def release() -> None:
+    """
+    このスレッドで開いているコンテナを閉じる関数。
+    """
+    cached = getattr(_local, "container", None)
+    _local.container = None
+    if cached is not None:
+        cached[1].close()
+
+
+def probe(file_path: str) -> dict:
+    """
+    PyAVでメディアファイルの情報を取得する関数。
+
+    ffprobeを起動せずにコンテナのヘッダーを読み込み、`ffmpeg.probe()` の
+    JSON出力のうち使用する項目と同じ形式で返します。
+
+    Args:
+        file_path (str): メディアファイルのパス。
+
+    Returns:
+        dict: `format` と `streams` を持つ辞書。
+
+    Raises:
+        av.FFmpegError: ファイルを開けない場合。
+    """
+    with track("pyav.probe"):
+        container = _open(file_path)
+        streams = []
+        for stream in container.streams:
+            codec = stream.codec_context
+            info = {
+                "codec_type": stream.type,
+                "codec_name": codec.name if codec is not None else "",
+            }
+            if stream.type == "video":
+                info.update({"width": codec.width, "height": codec.height})
+            elif stream.type == "audio":
+                # ffprobeと同じく文字列にする
+                info["sample_rate"] = str(codec.sample_rate)
+            streams.append(info)
+
+        duration = 0.0
+        if container.duration is not None:
+            duration = container.duration / av.time_base
+        return {
+            "format": {"duration": str(duration)},
+            "streams": streams,
+        }
+
+
+def capture_jpeg(file_path: str, seconds: float) -> bytes | None:
+    """
+    PyAVで動画の指定時刻のフレームをデコードし、JPEGに変換する関数。
+
+    指定時刻の直前のキーフレームにシークしてからデコードし、一時ファイルを
+    使わずにメモリ上でJPEGにエンコードします。キャプチャ後はコンテナを閉じます。
+
+    Args:
+        file_path (str): 動画ファイルのパス。
+        seconds (float): キャプチャする時刻（秒）。
+
+    Returns:
+        bytes | None: JPEGのデータ。動画のストリームがない場合はNone。
+
+    Raises:
+        av.FFmpegError: デコードに失敗した場合。
+    """
+    try:
+        with track("pyav.capture_frame"):
+            container = _open(file_path)
+            if not container.streams.video:
+                return None
+            stream = container.streams.video[0]
+            if seconds > 0 and stream.time_base:
+                container.seek(int(seconds / stream.time_base), stream=stream)
+
+            frame = None
+            for frame in container.decode(stream):
+                if frame.time is None or frame.time >= seconds:
+                    break
+            if frame is None:
+                return None
+
+            encoder = av.CodecContext.create("mjpeg", "w")
+            encoder.width = frame.width
+            encoder.height = frame.height
+            encoder.pix_fmt = "yuvj420p"
+            encoder.time_base = stream.time_base
+            encoder.options = {
+                "qmin": str(JPEG_QUALITY),
+                "qmax": str(JPEG_QUALITY),
+            }
+            packets = encoder.encode(frame.reformat(format="yuvj420p"))
+            packets += encoder.encode(None)
+            return b"".join(bytes(packet) for packet in packets)
+    finally:
+        release()
+
+
+def grab_keyframes(
+    file_path: str, times: list, width: int, height: int
+) -> tuple:
+    """
+    PyAVで複数の時刻の直前のキーフレームを縮小したグレースケール画像として
+    取得する関数。
+
+    コンテナを1回だけ開き、時刻ごとにシークしてキーフレームだけをデコードします。
+    コンテナは続けて行うキャプチャで再利用するため閉じません。
+
+    Args:
+        file_path (str): 動画ファイルのパス。
+        times (list): 時刻（秒）のリスト。
+        width (int): 縮小後の幅。
+        height (int): 縮小後の高さ。
+
+    Returns:
+        tuple: `(キーフレームの時刻のリスト, (フレーム数, height, width) の
+        uint8配列)`。
+
+    Raises:
+        av.FFmpegError: デコードに失敗した場合。
+    """
+    found_times: list[float] = []
+    frames = []
+    with track("pyav.grab_keyframes"):
+        container = _open(file_path)
+        if not container.streams.video:
+            return found_times, np.empty((0, height, width), dtype=np.uint8)
+        stream = container.streams.video[0]
+        stream.codec_context.skip_frame = "NONKEY"
+        try:
+            for seconds in times:
+                container.seek(int(seconds / stream.time_base), stream=stream)
+                frame = next(container.decode(stream), None)
+                if frame is None or frame.time is None:
+                    continue
+                # ffmpegの `scale` フィルターと同じ縮小方法にする
+                image = frame.reformat(
+                    width, height, format="gray", interpolation="AREA"
+                )
+                found_times.append(frame.time)
+                frames.append(image.to_ndarray()[:height, :width])
+        finally:
+            stream.codec_context.skip_frame = "DEFAULT"
+    if not frames:
+        return found_times, np.empty((0, height, width), dtype=np.uint8)
+    return found_times, np.stack(frames)
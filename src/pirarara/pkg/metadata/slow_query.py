@@ -0,0 +1,326 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import logging
+import re
+import sqlite3
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+from typing import cast
+
+# 実行計画を取得するステートメントの先頭のキーワード。
+_EXPLAIN_KEYWORDS = ("SELECT", "WITH", "UPDATE", "DELETE", "INSERT")
+# ステートメントの形を求めるための正規表現。
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    SQLのリテラルを `?` に置き換え、ステートメントの形を求める関数。
+
+    値だけが異なるステートメントを同じ形として集計するために使用します。
+
+    Args:
+        sql (str): SQL文。
+
+    Returns:
+        str: ステートメントの形。
+    """
+    shape = _STRING_LITERAL.sub("?", sql)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _PLACEHOLDER_LIST.sub("(?, ...)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class SlowQueryLog:
+    """
+    実行に時間がかかったSQL文を記録するクラス。
+
+    しきい値を超えたステートメントは、バインドされた値と `EXPLAIN QUERY PLAN` の
+    結果とともに専用のローテーティングログに出力します。すべてのステートメントについて
+    形ごとの実行回数と所要時間を集計し、`write_summary` でログに出力します。
+    """
+
+    # ログファイルの最大サイズ（バイト）。
+    LOG_MAX_BYTES = 10 * 1024 * 1024
+    # ログファイルのバックアップ数。
+    LOG_BACKUP_COUNT = 3
+
+    def __init__(
+        self, db_file_path: str, threshold_ms: float, log_file_path: str
+    ):
+        """
+        コンストラクタ。
+
+        Args:
+            db_file_path (str): 実行計画を取得するデータベースファイルのパス。
+            threshold_ms (float): 記録する所要時間のしきい値（ミリ秒）。
+            log_file_path (str): ログファイルのパス。
+        """
+        self.db_file_path = db_file_path
+        self.threshold = threshold_ms / 1e3
+        self._aggregates: dict[str, list] = {}
+        self._plans: dict[str, list] = {}
+        self._lock = threading.Lock()
+
+        # 通常のログとは別のファイルに出力する
+        self.logger = logging.getLogger(f"{__name__}.{id(self)}")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        self._handler = RotatingFileHandler(
+            log_file_path,
+            maxBytes=self.__class__.LOG_MAX_BYTES,
+            backupCount=self.__class__.LOG_BACKUP_COUNT,
+            encoding="utf-8",
+        )
+        self._handler.setFormatter(
+            logging.Formatter("%(asctime)s : %(message)s")
+        )
+        self.logger.addHandler(self._handler)
+
+    def observe(
+        self,
+        sql: str,
+        parameters,
+        seconds: float,
+        expanded_sql: str | None = None,
+    ) -> None:
+        """
+        ステートメントの所要時間を記録します。
+
+        Args:
+            sql (str): 実行したSQL文。
+            parameters: バインドした値（`executemany` の場合は先頭の値）。
+            seconds (float): 所要時間（秒）。
+            expanded_sql (str | None, optional): 値を展開したSQL文。
+        """
+        shape = normalize_sql(sql)
+        slow = seconds >= self.threshold
+        with self._lock:
+            aggregate = self._aggregates.get(shape)
+            if aggregate is None:
+                # [実行回数, 合計時間, 最大時間, しきい値を超えた回数]
+                aggregate = self._aggregates[shape] = [0, 0.0, 0.0, 0]
+            aggregate[0] += 1
+            aggregate[1] += seconds
+            aggregate[2] = max(aggregate[2], seconds)
+            if slow:
+                aggregate[3] += 1
+        if not slow:
+            return
+
+        lines = [
+            f"slow query {seconds * 1e3:.1f} ms: {shape}",
+            f"  parameters: {parameters!r}",
+        ]
+        if expanded_sql and expanded_sql != sql:
+            lines.append(f"  expanded: {_WHITESPACE.sub(' ', expanded_sql)}")
+        lines.extend(
+            f"  plan: {row}" for row in self._explain(shape, sql, parameters)
+        )
+        self.logger.info("\n".join(lines))
+
+    def _explain(self, shape: str, sql: str, parameters) -> list:
+        """
+        ステートメントの実行計画を取得します。形ごとに一度だけ取得します。
+
+        Args:
+            shape (str): ステートメントの形。
+            sql (str): SQL文。
+            parameters: バインドした値。
+
+        Returns:
+            list: 実行計画の行（文字列）のリスト。
+        """
+        with self._lock:
+            plan = self._plans.get(shape)
+        if plan is not None:
+            return plan
+        if not sql.lstrip().upper().startswith(_EXPLAIN_KEYWORDS):
+            return []
+
+        plan = []
+        try:
+            with sqlite3.connect(self.db_file_path) as conn:
+                cursor = conn.execute(
+                    f"EXPLAIN QUERY PLAN {sql}", parameters or ()
+                )
+                # (id, parent, notused, detail)
+                depth = {0: 0}
+                for id, parent, _, detail in cursor.fetchall():
+                    depth[id] = depth.get(parent, 0) + 1
+                    plan.append("  " * (depth[id] - 1) + detail)
+        except sqlite3.Error as e:
+            plan = [f"(EXPLAIN failed: {e})"]
+        with self._lock:
+            self._plans[shape] = plan
+        return plan
+
+    def summary(self) -> list:
+        """
+        ステートメントの形ごとの集計結果を取得します。
+
+        Returns:
+            list: 合計時間の長い順に並べた辞書のリスト。
+        """
+        with self._lock:
+            items = list(self._aggregates.items())
+        items.sort(key=lambda item: item[1][1], reverse=True)
+        return [
+            {
+                "shape": shape,
+                "count": count,
+                "total_ms": round(total * 1e3, 3),
+                "max_ms": round(max_seconds * 1e3, 3),
+                "slow_count": slow_count,
+            }
+            for shape, (count, total, max_seconds, slow_count) in items
+        ]
+
+    def write_summary(self) -> None:
+        """
+        集計結果をログに出力します。
+        """
+        lines = ["statement summary (count, total ms, max ms, slow, shape):"]
+        for item in self.summary():
+            lines.append(
+                f"  {item['count']:8d} {item['total_ms']:12.1f} "
+                f"{item['max_ms']:10.1f} {item['slow_count']:6d}  "
+                f"{item['shape']}"
+            )
+        self.logger.info("\n".join(lines))
+
+    def close(self) -> None:
+        """
+        ログファイルを閉じます。
+        """
+        self.logger.removeHandler(self._handler)
+        self._handler.close()
+
+
+class TracedCursor(sqlite3.Cursor):
+    """
+    ステートメントの実行と結果の取得にかかった時間を計測するカーソル。
+
+    計測した時間はステートメントの完了時（結果の全件取得、次の実行、
+    カーソルの破棄）に `SlowQueryLog` に渡します。
+    """
+
+    def __init__(self, connection):
+        super().__init__(connection)
+        self._sql: str | None = None
+        self._parameters = None
+        self._expanded_sql: str | None = None
+        self._elapsed = 0.0
+
+    @property
+    def _traced_connection(self) -> "TracedConnection":
+        # `TracedConnection.cursor` からのみ生成される
+        return cast("TracedConnection", self.connection)
+
+    def _begin(self, sql: str, parameters, elapsed: float) -> None:
+        self._sql = sql
+        self._parameters = parameters
+        # 値を展開したSQL文は実行直後のトレースコールバックで受け取っている
+        self._expanded_sql = self._traced_connection.last_statement
+        self._elapsed = elapsed
+
+    def _finish(self) -> None:
+        if self._sql is None:
+            return
+        sql, self._sql = self._sql, None
+        self._traced_connection.slow_query_log.observe(
+            sql, self._parameters, self._elapsed, self._expanded_sql
+        )
+
+    def _timed(self, func, *args):
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            self._elapsed += time.perf_counter() - start
+
+    def execute(self, sql, parameters=(), /):
+        self._finish()
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._begin(sql, parameters, time.perf_counter() - start)
+
+    def executemany(self, sql, seq_of_parameters, /):
+        self._finish()
+        rows = list(seq_of_parameters)
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, rows)
+        finally:
+            # 実行計画の取得には先頭の値を使用する
+            self._begin(
+                sql, rows[0] if rows else (), time.perf_counter() - start
+            )
+
+    def fetchone(self):
+        return self._timed(super().fetchone)
+
+    def fetchmany(self, size=None):
+        if size is None:
+            return self._timed(super().fetchmany)
+        return self._timed(super().fetchmany, size)
+
+    def fetchall(self):
+        try:
+            return self._timed(super().fetchall)
+        finally:
+            self._finish()
+
+    def __next__(self):
+        try:
+            return self._timed(super().__next__)
+        except StopIteration:
+            self._finish()
+            raise
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+
+class TracedConnection(sqlite3.Connection):
+    """
+    `TracedCursor` を使用し、実行したステートメントを `SlowQueryLog` に記録する接続。
+
+    `sqlite3.connect` の `factory` に指定し、生成後に `attach` を呼び出します。
+    """
+
+    # 記録先（`attach` で設定する）
+    slow_query_log: SlowQueryLog
+    # 最後に実行されたステートメント（値を展開したSQL文）
+    last_statement: str | None
+
+    def attach(self, slow_query_log: SlowQueryLog) -> None:
+        """
+        記録先を設定し、トレースコールバックを登録します。
+
+        Args:
+            slow_query_log (SlowQueryLog): 記録先。
+        """
+        self.slow_query_log = slow_query_log
+        self.last_statement = None
+        self.set_trace_callback(self._trace)
+
+    def _trace(self, statement: str) -> None:
+        # 値を展開したSQL文を受け取る
+        self.last_statement = statement
+
+    def cursor(self, factory=TracedCursor):
+        return super().cursor(factory)
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import json
+import logging
+import math
+import os
+
+import ffmpeg
+from pkg.metrics import track
+
+from .ffmpeg_governor import FFmpegGovernor
+
+logger = logging.getLogger(__name__)
+
+# スプライトシートのファイル名。
+SPRITE_FILE_NAME = "sprite.jpg"
+# スプライトシートのインデックスのファイル名。
+SPRITE_INDEX_FILE_NAME = "sprite.json"
+# 1動画あたりのフレーム数。
+DEFAULT_FRAMES = 25
+# 1行あたりのフレーム数。
+DEFAULT_COLUMNS = 5
+# 1フレームのサイズ（ピクセル）。アスペクト比が異なる場合は余白を付ける。
+TILE_WIDTH = 160
+TILE_HEIGHT = 90
+
+
+def get_sprite_paths(save_dir_path: str) -> tuple:
+    """
+    スプライトシートとインデックスのパスを求める関数。
+
+    Args:
+        save_dir_path (str): 保存先ディレクトリ。
+
+    Returns:
+        tuple: `(スプライトシートのパス, インデックスのパス)`。
+    """
+    return (
+        os.path.join(save_dir_path, SPRITE_FILE_NAME),
+        os.path.join(save_dir_path, SPRITE_INDEX_FILE_NAME),
+    )
+
+
+def load_sprite_index(save_dir_path: str) -> dict | None:
+    """
+    スプライトシートのインデックスを読み込む関数。
+
+    Args:
+        save_dir_path (str): 保存先ディレクトリ。
+
+    Returns:
+        dict | None: インデックス。スプライトシートがない場合はNone。
+    """
+    sprite_path, index_path = get_sprite_paths(save_dir_path)
+    if not os.path.exists(sprite_path):
+        return None
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def create_sprite_sheet(
+    file_path: str,
+    duration: float,
+    save_dir_path: str,
+    frames: int = DEFAULT_FRAMES,
+    columns: int = DEFAULT_COLUMNS,
+) -> dict | None:
+    """
+    動画の等間隔のフレームを並べたスプライトシートを作成する関数。
+
+    ffmpegの `fps`、`scale`、`tile` フィルターで、1回の実行で1枚のJPEGに
+    まとめます。各フレームは再生時間を等分した区間の中央の時刻とし、
+    縮小したフレームの位置と時刻をインデックスとしてJSONに保存します。
+
+    Args:
+        file_path (str): 動画ファイルのパス。
+        duration (float): 再生時間（秒）。
+        save_dir_path (str): 保存先ディレクトリ。
+        frames (int, optional): フレーム数。
+        columns (int, optional): 1行あたりのフレーム数。
+
+    Returns:
+        dict | None: インデックス。作成できなかった場合はNone。
+    """
+    if duration <= 0 or frames <= 0:
+        return None
+    columns = min(columns, frames)
+    rows = math.ceil(frames / columns)
+    interval = duration / frames
+    sprite_path, index_path = get_sprite_paths(save_dir_path)
+    tmp_path = f"{sprite_path}.tmp.jpg"
+
+    try:
+        with track("ffmpeg.sprite_sheet"):
+            FFmpegGovernor().run(
+                ffmpeg
+                .input(file_path, ss=interval / 2)
+                .filter("fps", fps=f"{1 / interval:.6f}")
+                .filter(
+                    "scale",
+                    TILE_WIDTH,
+                    TILE_HEIGHT,
+                    force_original_aspect_ratio="decrease",
+                )
+                .filter(
+                    "pad", TILE_WIDTH, TILE_HEIGHT, "(ow-iw)/2", "(oh-ih)/2"
+                )
+                .filter("tile", f"{columns}x{rows}")
+                .output(tmp_path, vframes=1, an=None, sn=None, qscale=5),
+                overwrite_output=True,
+                capture_stdout=True,
+                capture_stderr=True,
+                kind="sprite",
+            )
+    except ffmpeg.Error as e:
+        logger.error(f"Error creating sprite sheet: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return None
+    if not os.path.exists(tmp_path):
+        return None
+
+    index = {
+        "frames": frames,
+        "columns": columns,
+        "rows": rows,
+        "tile_width": TILE_WIDTH,
+        "tile_height": TILE_HEIGHT,
+        "times": [round(interval * (i + 0.5), 3) for i in range(frames)],
+    }
+    # インデックスを先に書き、スプライトシートの有無で完成を判定できるようにする
+    with open(index_path, "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    os.replace(tmp_path, sprite_path)
+    return index
@@ -0,0 +1,374 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any
+
+from .db import MetaDataDB
+from .hash import comp_file_hash
+from .io_scheduler import IOScheduler
+from .media_info import get_media_type
+from .proxy import PROXY_DIR_NAME
+from .sprite import SPRITE_FILE_NAME, SPRITE_INDEX_FILE_NAME
+
+logger = logging.getLogger(__name__)
+
+# 整合性チェックの結果。
+STATUS_OK = "ok"
+STATUS_CORRUPTED = "corrupted"
+STATUS_MISSING = "missing"
+STATUS_UNREADABLE = "unreadable"
+
+# 保存先ディレクトリにアプリケーションが作成するファイルとディレクトリ。
+# 未登録のファイルの検出では対象外とする。
+DERIVED_FILE_NAMES = frozenset(
+    {
+        "capture.jpg",
+        SPRITE_FILE_NAME,
+        SPRITE_INDEX_FILE_NAME,
+        PROXY_DIR_NAME,
+    }
+)
+
+
+class TokenBucket:
+    """
+    読み込み帯域を制限するためのトークンバケット。
+
+    複数のスレッドから共有して使用できます。
+    """
+
+    def __init__(self, rate: int, capacity: int | None = None):
+        """
+        コンストラクタ。
+
+        Args:
+            rate (int): 1秒あたりに補充するトークン数（バイト/秒）。
+            capacity (int | None, optional): バケットの容量。
+                指定がない場合は `rate` と同じ（1秒分）。
+        """
+        self.rate = rate
+        self.capacity = capacity or rate
+        self._tokens = float(self.capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, amount: int) -> None:
+        """
+        トークンを消費します。不足している場合は補充されるまで待機します。
+
+        Args:
+            amount (int): 消費するトークン数（バイト数）。
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._last) * self.rate
+            )
+            self._last = now
+            # 先に消費して不足分だけ待つ（待機中はロックを保持しない）
+            self._tokens -= amount
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+
+class IntegrityVerifier:
+    """
+    ライブラリに保存したファイルの整合性をチェックするクラス。
+
+    保存先のファイルのハッシュ値をデータベースの `file_hash_data` と比較し、
+    破損したファイルと存在しないファイルを検出します。ファイルは `IOScheduler` で
+    デバイスごとに同時実行数を制限しながら並列に読み込み、読み込み帯域の上限も
+    設定できます。
+    結果は一定間隔でデータベースに保存するため、中断した場合は次回その続きから
+    再開します。完了時にはどのレコードにも属さないファイルも検出します。
+    """
+
+    # 結果をデータベースに保存する件数。
+    CHECKPOINT_SIZE = 100
+    # 結果をデータベースに保存する間隔（秒）。
+    CHECKPOINT_INTERVAL = 2.0
+    # ファイルを読み込む単位（バイト）。
+    BLOCK_SIZE = 1024 * 1024
+
+    def __init__(
+        self,
+        db: MetaDataDB,
+        scheduler: IOScheduler | None = None,
+        bandwidth: int = 0,
+        resume: bool = True,
+    ):
+        """
+        コンストラクタ。
+
+        Args:
+            db (MetaDataDB): データベースクラスのインスタンス。
+            scheduler (IOScheduler | None, optional): 読み込みのスケジューラ。
+                指定がない場合は共有のインスタンスを使用する。
+            bandwidth (int, optional): 読み込み帯域の上限（バイト/秒）。0の場合は上限なし。
+            resume (bool, optional): Trueの場合、完了していない前回の実行を再開する。
+        """
+        self.db = db
+        self.scheduler = scheduler if scheduler is not None else IOScheduler()
+        self.bucket = TokenBucket(bandwidth) if bandwidth > 0 else None
+        self.scan_id = db.start_verify_scan(resume)
+
+        # チェック済みのレコードを除いて、デバイスごとに読み込む順に並べる
+        checked = db.get_verify_results(self.scan_id)
+        records = [
+            row
+            for rows in db.iter_rows(
+                ["save_dir_path", "file_name", "file_hash_data"]
+            )
+            for row in rows
+            if row[0] not in checked
+        ]
+        self.records = self.scheduler.plan(records, self._file_path)
+
+        # 同時に読み込むファイル数の合計
+        self.max_workers = self.scheduler.max_workers(
+            device for device, _ in self.records
+        )
+
+        self._pending: list = []
+        self._last_checkpoint = time.monotonic()
+        self._canceled = threading.Event()
+
+    def _file_path(self, record: tuple) -> str:
+        _, save_dir_path, file_name, _ = record
+        if not save_dir_path or not file_name:
+            return ""
+        return os.path.join(save_dir_path, file_name)
+
+    def cancel(self) -> None:
+        """
+        チェックを中断します。読み込み中のファイルも途中で打ち切ります。
+        """
+        self._canceled.set()
+
+    def verify(self, index: int) -> tuple | None:
+        """
+        1件のレコードをチェックします。ワーカースレッドから呼び出せます。
+
+        Args:
+            index (int): `records` の番号。
+
+        Returns:
+            tuple | None: `(id, 結果)`。中断された場合はNone。
+        """
+        device, (id, save_dir_path, file_name, hash_data) = self.records[index]
+        if self._canceled.is_set():
+            return None
+        if not save_dir_path or not file_name:
+            return id, STATUS_MISSING
+        file_path = os.path.join(save_dir_path, file_name)
+
+        with self.scheduler.slot(device):
+            if self._canceled.is_set():
+                return None
+            try:
+                status = verify_file(
+                    file_path,
+                    hash_data or "",
+                    block_size=self.__class__.BLOCK_SIZE,
+                    throttle=self._throttle,
+                )
+            except InterruptedError:
+                return None
+        return id, status
+
+    def _throttle(self, size: int) -> None:
+        if self._canceled.is_set():
+            raise InterruptedError("verification canceled")
+        if self.bucket is not None:
+            self.bucket.consume(size)
+
+    def record(self, result: tuple | None) -> None:
+        """
+        チェック結果を記録し、一定件数または一定時間ごとにデータベースへ保存します。
+
+        Args:
+            result (tuple | None): `verify` の戻り値。
+        """
+        if result is None:
+            return
+        self._pending.append(result)
+        if (
+            len(self._pending) >= self.__class__.CHECKPOINT_SIZE
+            or time.monotonic() - self._last_checkpoint
+            >= self.__class__.CHECKPOINT_INTERVAL
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        記録済みの結果をデータベースに保存します。
+        """
+        self.db.set_verify_results(self.scan_id, self._pending)
+        self._pending = []
+        self._last_checkpoint = time.monotonic()
+
+    def finish(self) -> dict:
+        """
+        チェックを完了し、結果をまとめます。
+
+        Returns:
+            dict: `corrupted`、`missing`、`unreadable` のIDのリスト、
+            `orphaned` のパスのリスト、`checked` のチェック件数をもつ辞書。
+        """
+        self.flush()
+        return report_verify_scan(self.db, self.scan_id)
+
+    def find_orphans(self) -> list:
+        """
+        どのレコードにも属さない保存先のディレクトリとメディアファイルを検出します。
+
+        Returns:
+            list: パスのリスト。
+        """
+        return find_orphans(self.db)
+
+
+def verify_file(
+    file_path: str,
+    hash_data: str,
+    block_size: int = IntegrityVerifier.BLOCK_SIZE,
+    throttle=None,
+) -> str:
+    """
+    ファイルのハッシュ値を比較して整合性をチェックする関数。
+
+    Args:
+        file_path (str): ファイルのパス。
+        hash_data (str): 保存されているハッシュ値。
+        block_size (int, optional): 読み込む単位（バイト）。
+        throttle (Callable | None, optional): ブロックを読み込むたびに
+            読み込んだバイト数を渡して呼び出す関数。
+
+    Returns:
+        str: チェック結果。
+
+    Raises:
+        InterruptedError: `throttle` で中断された場合。
+    """
+    try:
+        # ライブラリ全体を読むため、読み終えた範囲はキャッシュに残さない
+        matched = comp_file_hash(
+            file_path,
+            hash_data,
+            block_size=block_size,
+            throttle=throttle,
+            drop_cache=True,
+        )
+    except FileNotFoundError:
+        return STATUS_MISSING
+    except InterruptedError:
+        raise
+    except OSError as e:
+        logger.error(f"Error reading {file_path}: {e}")
+        return STATUS_UNREADABLE
+    return STATUS_OK if matched else STATUS_CORRUPTED
+
+
+def report_verify_scan(db: MetaDataDB, scan_id: int) -> dict:
+    """
+    整合性チェックの実行を完了にし、結果をまとめる関数。
+
+    Args:
+        db (MetaDataDB): データベースクラスのインスタンス。
+        scan_id (int): 実行ID。
+
+    Returns:
+        dict: `corrupted`、`missing`、`unreadable` のIDのリスト、
+        `orphaned` のパスのリスト、`checked` のチェック件数をもつ辞書。
+    """
+    results = db.get_verify_results(scan_id)
+    db.finish_verify_scan(scan_id)
+
+    report: dict[str, Any] = {
+        STATUS_CORRUPTED: [],
+        STATUS_MISSING: [],
+        STATUS_UNREADABLE: [],
+        "orphaned": find_orphans(db),
+        "checked": len(results),
+    }
+    for id, status in sorted(results.items()):
+        if status in report:
+            report[status].append(id)
+    return report
+
+
+def find_orphans(db: MetaDataDB) -> list:
+    """
+    どのレコードにも属さない保存先のディレクトリとメディアファイルを検出する関数。
+
+    Args:
+        db (MetaDataDB): データベースクラスのインスタンス。
+
+    Returns:
+        list: パスのリスト。
+    """
+    library_dir = os.path.dirname(db.db_file_path)
+    ids = db.get_all_ids()
+    file_names: dict[str, set] = {}
+    for rows in db.iter_rows(
+        ["save_dir_path", "file_name"], include_deleted=True
+    ):
+        for _, save_dir_path, file_name in rows:
+            if save_dir_path:
+                file_names.setdefault(
+                    os.path.normcase(os.path.abspath(save_dir_path)),
+                    set(),
+                ).add(file_name)
+
+    orphans: list[str] = []
+    id_dir = re.compile(r"^id(\d+)$")
+    try:
+        entries = sorted(os.scandir(library_dir), key=lambda e: e.name)
+    except OSError as e:
+        logger.error(f"Error scanning {library_dir}: {e}")
+        return orphans
+    for entry in entries:
+        match = id_dir.match(entry.name)
+        if match is None or not entry.is_dir():
+            continue
+        if int(match.group(1)) not in ids:
+            orphans.append(entry.path)
+            continue
+        known = file_names.get(
+            os.path.normcase(os.path.abspath(entry.path)), set()
+        )
+        for name in sorted(os.listdir(entry.path)):
+            # アプリケーションが作成したファイルは対象外とする
+            if name in DERIVED_FILE_NAMES:
+                continue
+            if name not in known and get_media_type(name):
+                orphans.append(os.path.join(entry.path, name))
+    return orphans
+
+
+def format_verify_report(report: dict, titles: dict) -> str:
+    """
+    整合性チェックの結果を一覧形式の文字列にする関数。
+
+    Args:
+        report (dict): `IntegrityVerifier.finish` が返す辞書。
+        titles (dict): IDをキー、タイトルを値とする辞書。
+
+    Returns:
+        str: 一覧形式の文字列。
+    """
+    lines = []
+    for status in (STATUS_CORRUPTED, STATUS_MISSING, STATUS_UNREADABLE):
+        if report[status]:
+            lines.append(f"[{status}]")
+            for id in report[status]:
+                lines.append(f"  id{id} {titles.get(id, '')}")
+    if report["orphaned"]:
+        lines.append("[orphaned]")
+        lines.extend(f"  {path}" for path in report["orphaned"])
+    return "\n".join(lines)
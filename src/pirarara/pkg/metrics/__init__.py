@@ -0,0 +1,11 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from .metrics import LatencyHistogram, Metrics, instrument, timed, track
+
+__all__ = [
+    "Metrics",
+    "LatencyHistogram",
+    "instrument",
+    "timed",
+    "track",
+]
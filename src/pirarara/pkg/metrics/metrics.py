@@ -0,0 +1,296 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import contextlib
+import datetime
+import functools
+import inspect
+import json
+import math
+import os
+import threading
+import time
+
+# 計測が有効かどうか。無効の場合の負荷を抑えるためモジュール変数で判定する。
+_enabled = False
+# 計測しない場合に返すコンテキストマネージャ。
+_NULL_CONTEXT = contextlib.nullcontext()
+
+
+class LatencyHistogram:
+    """
+    所要時間の分布を記録するヒストグラム。
+
+    バケットはマイクロ秒の対数（1オクターブを `BUCKETS_PER_OCTAVE` 分割）で区切るため、
+    記録件数に関係なく一定のメモリでパーセンタイルを概算できます。
+    """
+
+    # 1オクターブ（2倍）あたりのバケット数。誤差は約19%以内。
+    BUCKETS_PER_OCTAVE = 4
+
+    def __init__(self):
+        """
+        コンストラクタ。
+        """
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self._buckets: dict[int, int] = {}
+
+    def add(self, seconds: float) -> None:
+        """
+        所要時間を記録します。
+
+        Args:
+            seconds (float): 所要時間（秒）。
+        """
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+        us = seconds * 1e6
+        index = (
+            math.ceil(math.log2(us) * self.__class__.BUCKETS_PER_OCTAVE)
+            if us > 1
+            else 0
+        )
+        self._buckets[index] = self._buckets.get(index, 0) + 1
+
+    def percentile(self, q: float) -> float:
+        """
+        パーセンタイルを概算します。
+
+        Args:
+            q (float): パーセンタイル（0〜100）。
+
+        Returns:
+            float: 所要時間（秒）。記録がない場合は0。
+        """
+        if self.count == 0:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if seen >= rank:
+                upper = 2 ** (index / self.__class__.BUCKETS_PER_OCTAVE) / 1e6
+                return min(max(upper, self.min), self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+        """
+        集計結果を辞書にします。所要時間の単位はミリ秒です。
+
+        Returns:
+            dict: 件数、合計、平均、p50、p95、p99、最小、最大をもつ辞書。
+        """
+        if self.count == 0:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "total_ms": round(self.total * 1e3, 3),
+            "mean_ms": round(self.total / self.count * 1e3, 3),
+            "p50_ms": round(self.percentile(50) * 1e3, 3),
+            "p95_ms": round(self.percentile(95) * 1e3, 3),
+            "p99_ms": round(self.percentile(99) * 1e3, 3),
+            "min_ms": round(self.min * 1e3, 3),
+            "max_ms": round(self.max * 1e3, 3),
+        }
+
+
+class Metrics:
+    """
+    処理ごとの呼び出し回数と所要時間を集計するクラス。
+
+    このクラスはシングルトンパターンを用いて実装されています。
+    計測は `timed` デコレータ、`instrument` クラスデコレータ、
+    `track` コンテキストマネージャから行い、無効の場合は何も記録しません。
+    """
+
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        """
+        クラスの唯一のインスタンスを生成または取得します。
+
+        Returns:
+            Metrics: クラスの唯一のインスタンス。
+        """
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        """
+        Metricsオブジェクトを初期化します。
+        """
+        if not hasattr(self, "_initialized"):
+            self._initialized = True
+        else:
+            return
+
+        self._histograms: dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """
+        計測が有効かどうか。
+        """
+        return _enabled
+
+    def enable(self, enabled: bool = True) -> None:
+        """
+        計測を有効または無効にします。
+
+        Args:
+            enabled (bool, optional): 有効にする場合はTrue。
+        """
+        global _enabled
+        _enabled = enabled
+
+    def record(self, name: str, seconds: float) -> None:
+        """
+        所要時間を記録します。
+
+        Args:
+            name (str): 処理の名前。
+            seconds (float): 所要時間（秒）。
+        """
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = LatencyHistogram()
+            histogram.add(seconds)
+
+    def snapshot(self) -> dict:
+        """
+        現在の集計結果を取得します。
+
+        Returns:
+            dict: 処理の名前をキー、`LatencyHistogram.to_dict` の結果を値とする辞書。
+        """
+        with self._lock:
+            return {
+                name: histogram.to_dict()
+                for name, histogram in sorted(self._histograms.items())
+            }
+
+    def reset(self) -> None:
+        """
+        集計結果を破棄します。
+        """
+        with self._lock:
+            self._histograms.clear()
+
+    def dump(self, dir_path: str) -> str:
+        """
+        集計結果をJSONファイルに保存します。
+
+        Args:
+            dir_path (str): 保存先のディレクトリ。
+
+        Returns:
+            str: 保存したファイルのパス。
+        """
+        now = datetime.datetime.now()
+        file_path = os.path.join(
+            dir_path, f"metrics-{now.strftime('%Y%m%d-%H%M%S')}.json"
+        )
+        data = {
+            "timestamp": now.isoformat(timespec="seconds"),
+            "metrics": self.snapshot(),
+        }
+        os.makedirs(dir_path, exist_ok=True)
+        with open(file_path, "w", encoding="utf-8") as file:
+            json.dump(data, file, indent=4)
+        return file_path
+
+
+class _Timer:
+    """
+    `track` が返す計測用のコンテキストマネージャ。
+    """
+
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        Metrics().record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+def track(name: str):
+    """
+    `with` ブロックの所要時間を記録するコンテキストマネージャを返す関数。
+
+    Args:
+        name (str): 処理の名前。
+
+    Returns:
+        コンテキストマネージャ。計測が無効の場合は何もしない。
+    """
+    if not _enabled:
+        return _NULL_CONTEXT
+    return _Timer(name)
+
+
+def timed(name: str):
+    """
+    関数の呼び出しごとの所要時間を記録するデコレータ。
+
+    Args:
+        name (str): 処理の名前。
+
+    Returns:
+        デコレータ。
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                Metrics().record(name, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+def instrument(prefix: str):
+    """
+    クラスのパブリックメソッドすべてに `timed` を適用するクラスデコレータ。
+
+    処理の名前は `<prefix>.<メソッド名>` となります。
+    ジェネレータは呼び出し時に処理が行われないため対象外です。
+
+    Args:
+        prefix (str): 処理の名前の接頭辞。
+
+    Returns:
+        クラスデコレータ。
+    """
+
+    def decorator(cls):
+        for attr, value in list(vars(cls).items()):
+            if (
+                attr.startswith("_")
+                or not inspect.isfunction(value)
+                or inspect.isgeneratorfunction(value)
+            ):
+                continue
+            setattr(cls, attr, timed(f"{prefix}.{attr}")(value))
+        return cls
+
+    return decorator
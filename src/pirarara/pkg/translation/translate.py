@@ -2,8 +2,12 @@
 # -*- coding: utf-8 -*-
 import glob
 import json
+import logging
+import marshal
 import os
 
+logger = logging.getLogger(__name__)
+
 
 class Translate:
     """
@@ -14,7 +18,8 @@ class Translate:
         select_language (str): 現在選択されている言語のコード。
         language_files (list): 言語ファイルのリスト。
         language_lists (list): 言語コードのリスト。
-        translate_dic (dict): 翻訳データを格納する辞書。
+        compiled_dic (dict): セクションごとに、大文字小文字を区別しないかどうかと
+            検索用の辞書を格納する辞書。
 
     Methods:
         get_language_lists() -> list: 利用可能な言語リストを取得する。
@@ -24,6 +29,11 @@ class Translate:
 
     _instance = None
 
+    # 大文字小文字を区別しないセクションを示すキー。
+    CASE_INSENSITIVE_KEY = "#case_insensitive#"
+    # キャッシュファイルの形式バージョン。形式を変更した場合は値を上げること。
+    CACHE_FORMAT_VERSION = 1
+
     def __new__(cls, *args, **kwargs):
         """
         Singletonのインスタンスを作成するメソッド。
@@ -39,6 +49,7 @@ class Translate:
         self,
         locale_path: str | None = None,
         language: str = "ja_JP",
+        cache_dir: str | None = None,
     ):
         """
         Translateクラスの初期化メソッド。
@@ -46,6 +57,8 @@ class Translate:
         Args:
             locale_path (str | None): 翻訳ファイルが格納されているディレクトリのパス。
             language (str): 現在選択されている言語のコード。デフォルトは"ja_JP"。
+            cache_dir (str | None): コンパイル済み翻訳データのキャッシュを保存する
+                ディレクトリのパス。Noneの場合はキャッシュしない。
         """
         if not hasattr(self, "_initialized"):
             if locale_path is None:
@@ -57,6 +70,9 @@ class Translate:
         # 選択中の言語
         self._select_language = language
 
+        # コンパイル済み翻訳データのキャッシュディレクトリ
+        self._cache_dir = cache_dir
+
         # 言語ファイルリスト
         self._full_path_language_files = glob.glob(
             os.path.join(locale_path, "*.json")
@@ -72,16 +88,9 @@ class Translate:
         for lang in self._language_files:
             self._language_lists.append(lang.replace(".json", ""))
 
-        # 選択中の言語に対応するものがあるか？
-        self._translate_dic = {}
-        if language in self._language_lists:
-            index = self._language_lists.index(language)
-            # 存在すれば翻訳データを読み込む
-            with open(
-                self._full_path_language_files[index], "r", encoding="utf-8"
-            ) as file:
-                json_data = file.read()
-            self._translate_dic = json.loads(json_data)
+        # 選択中の言語の翻訳データを読み込む
+        self._compiled_dic: dict[str, tuple[bool, dict]] = {}
+        self._load_language(language)
 
     def get_language_lists(self) -> list:
         """
@@ -102,15 +111,123 @@ class Translate:
         Args:
             language (str): 設定する新しい言語のコード。
         """
-        self._translate_dic = {}
-        if language in self._language_lists:
-            index = self._language_lists.index(language)
-            # 存在すれば翻訳データを読み込む
-            with open(
-                self._full_path_language_files[index], "r", encoding="utf-8"
-            ) as file:
-                json_data = file.read()
-            self._translate_dic = json.loads(json_data)
+        self._select_language = language
+        self._load_language(language)
+
+    def _load_language(self, language: str) -> None:
+        """
+        言語ファイルを読み込み、検索用の辞書にコンパイルするメソッド。
+
+        言語ファイルの更新時刻とサイズが一致するキャッシュがあればそれを使用します。
+
+        Args:
+            language (str): 読み込む言語のコード。
+        """
+        self._compiled_dic = {}
+        # 選択中の言語に対応するものがあるか？
+        if language not in self._language_lists:
+            return
+        index = self._language_lists.index(language)
+        json_path = self._full_path_language_files[index]
+        stat = os.stat(json_path)
+        stamp = (
+            self.__class__.CACHE_FORMAT_VERSION,
+            stat.st_mtime_ns,
+            stat.st_size,
+        )
+
+        # キャッシュが有効であればそれを使用する
+        cache_path = None
+        if self._cache_dir:
+            cache_path = os.path.join(self._cache_dir, f"{language}.lang.bin")
+            compiled_dic = self._read_cache(cache_path, stamp)
+            if compiled_dic is not None:
+                self._compiled_dic = compiled_dic
+                return
+
+        # 存在すれば翻訳データを読み込む
+        with open(json_path, "r", encoding="utf-8") as file:
+            json_data = file.read()
+        self._compiled_dic = self._compile(json.loads(json_data))
+
+        if cache_path is not None:
+            self._write_cache(cache_path, stamp, self._compiled_dic)
+
+    def _compile(self, translate_dic: dict) -> dict[str, tuple[bool, dict]]:
+        """
+        翻訳データをセクションごとの検索用の辞書にコンパイルするメソッド。
+
+        大文字小文字を区別しないセクションはキーをcasefoldした辞書にします。
+
+        Args:
+            translate_dic (dict): 言語ファイルから読み込んだ翻訳データ。
+
+        Returns:
+            dict[str, tuple[bool, dict]]: セクション名をキーとし、大文字小文字を
+            区別しないかどうかと検索用の辞書を値とする辞書。
+        """
+        ci_key = self.__class__.CASE_INSENSITIVE_KEY
+        compiled_dic = {}
+        for section, section_dic in translate_dic.items():
+            if not isinstance(section_dic, dict):
+                continue
+            case_insensitive = bool(section_dic.get(ci_key, 0))
+            if case_insensitive:
+                table = {
+                    k.casefold(): v
+                    for k, v in section_dic.items()
+                    if k != ci_key
+                }
+            else:
+                table = dict(section_dic)
+            compiled_dic[section] = (case_insensitive, table)
+        return compiled_dic
+
+    def _read_cache(
+        self, cache_path: str, stamp: tuple
+    ) -> dict[str, tuple[bool, dict]] | None:
+        """
+        コンパイル済み翻訳データをキャッシュファイルから読み込むメソッド。
+
+        Args:
+            cache_path (str): キャッシュファイルのパス。
+            stamp (tuple): 形式バージョン、言語ファイルの更新時刻とサイズ。
+
+        Returns:
+            dict[str, tuple[bool, dict]] | None: コンパイル済み翻訳データ。
+            キャッシュが無いまたは古い場合はNone。
+        """
+        try:
+            with open(cache_path, "rb") as file:
+                cache_stamp, compiled_dic = marshal.loads(file.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if cache_stamp != stamp or not isinstance(compiled_dic, dict):
+            return None
+        return compiled_dic
+
+    def _write_cache(
+        self,
+        cache_path: str,
+        stamp: tuple,
+        compiled_dic: dict[str, tuple[bool, dict]],
+    ) -> None:
+        """
+        コンパイル済み翻訳データをキャッシュファイルに書き込むメソッド。
+
+        Args:
+            cache_path (str): キャッシュファイルのパス。
+            stamp (tuple): 形式バージョン、言語ファイルの更新時刻とサイズ。
+            compiled_dic (dict[str, tuple[bool, dict]]): コンパイル済み翻訳データ。
+        """
+        tmp_path = cache_path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            with open(tmp_path, "wb") as file:
+                file.write(marshal.dumps((stamp, compiled_dic)))
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.warning(f"Failed to write translation cache: {e}")
 
     def trans(self, selected_section: str, text: str) -> str:
         """
@@ -125,26 +242,19 @@ class Translate:
         """
         if not selected_section:
             return text
-        # パラメータが無効または有効なデータが読み出せていない場合
-        if not text or not self._translate_dic:
+        # パラメータが無効な場合
+        if not text:
             return text
-        try:
-            section_dic = self._translate_dic[selected_section]
-            case_insensitive = section_dic.get("#case_insensitive#", 0)
-
-            if case_insensitive:
-                text = text.lower()
-                section_dic = {
-                    k.lower(): v
-                    for k, v in section_dic.items()
-                    if k != "#case_insensitive#"
-                }
-
-            return section_dic.get(text, text)
-
-        except KeyError:
+        # 有効なデータが読み出せていない場合
+        entry = self._compiled_dic.get(selected_section)
+        if entry is None:
             return text
 
+        case_insensitive, table = entry
+        if case_insensitive:
+            return table.get(text.casefold(), text)
+        return table.get(text, text)
+
     def tr(self, selected_section: str, text: str) -> str:
         """
         与えられたテキストを翻訳するメソッド。(短縮版)